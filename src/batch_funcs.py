@@ -0,0 +1,182 @@
+# Packages
+import glob
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+# Project imports
+import instrument_funcs
+import log_funcs
+from c_benchmark import Benchmark
+from congestion_funcs import CongestionEstimator, CongestionAnalyzer, CongestionPyramid, CongestionVisualizer
+from log_funcs import design_context, get_logger
+
+logger = get_logger(__name__)
+
+
+def expand_designs(patterns):
+    """
+    Expand benchmark folder paths and glob patterns into a sorted list of folders.
+    Args:
+        patterns (list): Folder paths or glob patterns.
+    Returns:
+        list: Unique benchmark folders, in the order given.
+    """
+    designs = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            path = path.rstrip('/')
+            if os.path.isdir(path) and path not in designs:
+                designs.append(path)
+    return designs
+
+
+def run_job(path: str, grid_size, accumulation='difference', cache=None, tile_workers=1, pyramid=False,
+            render_dir=None, formats=('png',), instrument=None, scratch_dir=None, memory_budget=256 << 20,
+            demand='bins'):
+    """
+    Estimate and analyze congestion for one (design, grid size) job.
+    Runs in a worker process; returns only small, picklable records.
+    Args:
+        path (str): Benchmark folder.
+        grid_size: Grid cell size in microns, or a list of grid sizes for a pyramid job.
+        accumulation (str): CongestionEstimator accumulation mode.
+        cache (bool or str): DesignCache setting passed to Benchmark.generate_benchmark.
+        tile_workers (int): CongestionEstimator worker processes.
+        pyramid (bool): Derive all grid sizes from one CongestionPyramid pass.
+        render_dir (str): Save a headless 4-way heatmap per grid size here.
+        formats (tuple): Heatmap file formats.
+        instrument (str): Record per-stage instrumentation, 'time' or 'memory' (time and memory).
+        scratch_dir (str): CongestionEstimator out-of-core scratch directory.
+        memory_budget (int): CongestionEstimator out-of-core tile budget in bytes.
+        demand (str): CongestionEstimator demand mode ('bins' or 'area').
+    Returns:
+        dict: Design name, per-level grid size and per-method metric records, job runtime
+            and the job's instrumentation records.
+    """
+    start_time = time.perf_counter()
+    if instrument:
+        instrument_funcs.enable(memory=instrument == 'memory')
+    instrument_funcs.reset()
+
+    d = Benchmark(path)
+    with design_context(d.name):
+        # The streaming estimator reads the nets itself, so only the cells are parsed
+        d.generate_benchmark(columnar=True, cache=cache, nets=accumulation != 'stream')
+
+        if pyramid:
+            pyramid = CongestionPyramid(d, grid_size, accumulation, tile_workers, scratch_dir, memory_budget, demand)
+            reports = pyramid.generate_comparison_reports()
+            levels = pyramid.levels
+        else:
+            estimator = CongestionEstimator(d, grid_size=grid_size, accumulation=accumulation, workers=tile_workers,
+                                            scratch_dir=scratch_dir, memory_budget=memory_budget, demand=demand)
+            congestion_maps = estimator.generate_all_congestion_maps()
+            analyzer = CongestionAnalyzer(congestion_maps, estimator.runtimes, estimator.profile)
+            reports = {grid_size: analyzer.generate_comparison_report()}
+            levels = {grid_size: congestion_maps}
+
+        if render_dir is not None:
+            visualizer = CongestionVisualizer(d, output_dir=render_dir, formats=formats)
+            for congestion_maps in levels.values():
+                visualizer.plot_4way_comparison(congestion_maps)
+
+        records = []
+        for level_size, report in reports.items():
+            # One record per method, carrying its row of the correlation table
+            correlation = report['correlation'].add_prefix('Corr ')
+            metrics = report['metrics'].set_index('Method').join(correlation).reset_index()
+            records.append({'grid_size': level_size, 'metrics': metrics.to_dict('records')})
+
+        result = {
+            'design': d.name,
+            'levels': records,
+            'runtime': time.perf_counter() - start_time,
+            'profile': instrument_funcs.records()
+        }
+        # Structured record of the whole job, for the design's JSON log
+        logger.info(f"Done {d.name} (grid {grid_size}) in {result['runtime']:.2f}s",
+                    extra={'data': {'grid_size': grid_size, 'runtime': result['runtime'], 'levels': records,
+                                    'profile': result['profile']}})
+    return result
+
+
+def run_batch(designs, grid_sizes, workers=None, log_dir="logs", accumulation='difference', cache=None,
+              tile_workers=1, pyramid=False, render_dir=None, formats=('png',), instrument=None, scratch_dir=None,
+              memory_budget=256 << 20, demand='bins'):
+    """
+    Run every (design, grid size) job across a process pool and write one consolidated CSV.
+    Args:
+        designs (list): Benchmark folders.
+        grid_sizes (list): Grid cell sizes in microns.
+        workers (int): Number of worker processes; defaults to the CPU count.
+        log_dir (str): Directory of the consolidated CSV.
+        accumulation (str): CongestionEstimator accumulation mode.
+        cache (bool or str): DesignCache setting for every job.
+        tile_workers (int): CongestionEstimator worker processes of every job.
+        pyramid (bool): Run one CongestionPyramid job per design covering all grid sizes.
+        render_dir (str): Save headless heatmaps of every job here.
+        formats (tuple): Heatmap file formats.
+        instrument (str): Record per-stage instrumentation in every job ('time' or 'memory')
+            and save it as batch_profile_<timestamp>.csv/.json next to the metrics.
+        scratch_dir (str): Out-of-core scratch directory of every job.
+        memory_budget (int): Out-of-core tile budget of every job in bytes; each worker uses its own.
+        demand (str): Demand mode of every job ('bins' or 'area').
+    Returns:
+        tuple: (consolidated metrics DataFrame, list of (design, grid size, error) failures).
+    """
+    if pyramid:
+        jobs = [(path, list(grid_sizes)) for path in designs]
+    else:
+        jobs = [(path, grid_size) for path in designs for grid_size in grid_sizes]
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    logger.info(f"Running {len(jobs)} jobs on {workers} workers...")
+
+    records = []
+    profile = []
+    failures = []
+    # Workers log through the parent's queue, so their records reach the same files
+    initializer, initargs = log_funcs.worker_initializer()
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        futures = {pool.submit(run_job, path, grid_size, accumulation, cache, tile_workers, pyramid,
+                               render_dir, formats, instrument, scratch_dir, memory_budget, demand): (path, grid_size)
+                   for path, grid_size in jobs}
+        for future in as_completed(futures):
+            path, grid_size = futures[future]
+            try:
+                result = future.result()
+            except (Exception, SystemExit):  # FParser exits on malformed benchmarks
+                failures.append((path, grid_size, traceback.format_exc()))
+                logger.error(f"FAILED {path} (grid {grid_size}):\n{failures[-1][2]}",
+                             extra={'design': os.path.basename(path)})
+                continue
+
+            for level in result['levels']:
+                for row in level['metrics']:
+                    records.append({'Design': result['design'], 'Grid Size': level['grid_size'],
+                                    **row, 'Job Runtime (s)': result['runtime']})
+            for record in result['profile']:
+                profile.append({'design': result['design'], 'grid_size': grid_size, **record})
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    df = pd.DataFrame(records)
+    if not df.empty:
+        df = df.sort_values(['Design', 'Grid Size'], kind='stable').reset_index(drop=True)
+        os.makedirs(log_dir, exist_ok=True)
+        csv_file = f"{log_dir}/batch_metrics_{timestamp}.csv"
+        df.to_csv(csv_file, index=False)
+        logger.info(f"Consolidated metrics saved to: {csv_file}")
+
+    if profile:
+        table = instrument_funcs.to_dataframe(profile)
+        table.insert(0, 'Grid Size', [str(record['grid_size']) for record in profile])
+        table.insert(0, 'Design', [record['design'] for record in profile])
+        table.to_csv(f"{log_dir}/batch_profile_{timestamp}.csv", index=False)
+        instrument_funcs.export_json(f"{log_dir}/batch_profile_{timestamp}.json", profile)
+        logger.info(f"Stage profile saved to: {log_dir}/batch_profile_{timestamp}.csv")
+    return df, failures
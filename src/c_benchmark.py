@@ -1,25 +1,30 @@
+import numpy as np
+
 from c_file_parser import FParser
 from c_row import Row
 from c_cell import Cell
 from c_net import Net
+from c_design_arrays import DesignArrays
+from c_design_cache import DesignCache
+from instrument_funcs import instrumented
+from log_funcs import get_logger
+
+logger = get_logger(__name__)
 
 
 class Benchmark:
     """
     Represents a parsed VLSI benchmark design, including cells, nets, rows, and macros.
     Provides methods to generate and analyze the design from Bookshelf-format data.
+    Cell, Net and Row IDs are allocated per benchmark, densely from 0, and index
+    cells_by_id, nets_by_id and rows.
     """
-    counter = -1
-
     def __init__(self, folder_path: str):
         """
         Initialize the Benchmark object.
         Args:
             folder_path (str): Path to the benchmark folder containing Bookshelf files.
         """
-        Benchmark.counter += 1
-        self.id = Benchmark.counter
-
         self.fp = FParser(folder_path)
         self.folder_path = folder_path
         self.name = self.folder_path.split('/')[-1]
@@ -34,11 +39,90 @@ class Benchmark:
         self.area = None
         self.hpwl = 0.0
 
-        self.cells = {}
-        self.pins = {}
-        self.macros = {}
-        self.nets = {}
-        self.rows = []
+        self._cells = {}
+        self._pins = {}
+        self._macros = {}
+        self._nets = {}
+        self._rows = []
+        self.cells_by_id = []
+        self.nets_by_id = []
+
+        # Names of cells the row assignment could not place exactly
+        self.off_row_cells = []
+        self.multirow_cells = []
+
+        # Columnar view; when built first, the object view above is materialized on demand
+        self.arrays = None
+        self._objects_pending = False
+
+    def new_cell(self):
+        """
+        Returns:
+            Cell: A new cell of this benchmark, with the next cell ID.
+        """
+        cell = Cell(self, len(self.cells_by_id))
+        self.cells_by_id.append(cell)
+        return cell
+
+    def new_net(self):
+        """
+        Returns:
+            Net: A new net of this benchmark, with the next net ID.
+        """
+        net = Net(self, len(self.nets_by_id))
+        self.nets_by_id.append(net)
+        return net
+
+    def new_row(self):
+        """
+        Returns:
+            Row: A new row of this benchmark, with the next row ID, appended to rows.
+        """
+        row = Row(self, len(self._rows))
+        self._rows.append(row)
+        return row
+
+    @property
+    def cells(self):
+        if self._objects_pending:
+            self.materialize_objects()
+        return self._cells
+
+    @property
+    def pins(self):
+        if self._objects_pending:
+            self.materialize_objects()
+        return self._pins
+
+    @property
+    def macros(self):
+        if self._objects_pending:
+            self.materialize_objects()
+        return self._macros
+
+    @property
+    def nets(self):
+        if self._objects_pending:
+            self.materialize_objects()
+        return self._nets
+
+    @property
+    def rows(self):
+        if self._objects_pending:
+            self.materialize_objects()
+        return self._rows
+
+    def counts(self):
+        """
+        Size of the design, from whichever view is built, without building the other.
+        Returns:
+            dict: Number of cells (including macros and pins), nets and net pins.
+        """
+        if self.arrays is not None:
+            return {'cells': len(self.arrays.lx), 'nets': len(self.arrays.net_ptr) - 1,
+                    'pins': len(self.arrays.net_cells)}
+        return {'cells': len(self._cells), 'nets': len(self._nets),
+                'pins': sum(len(net.cell_ids) for net in self._nets.values())}
 
     def __str__(self):
         """
@@ -52,18 +136,172 @@ class Benchmark:
         print(f'HWPL:{self.hpwl}')
         return ""
 
-    def generate_benchmark(self):
+    @instrumented('Benchmark.generate_benchmark', counts=lambda _, self, *args, **kwargs: self.counts())
+    def generate_benchmark(self, columnar=False, cache=None, nets=True):
         """
         Generate the benchmark by parsing cells, rows, and nets, and calculating attributes.
         Populates the Benchmark object with all design data.
+        Args:
+            columnar (bool): Build only the columnar DesignArrays; Cell/Net/Row objects
+                are materialized the first time they are accessed.
+            cache (bool or str): Load the parsed design from a DesignCache (True for the
+                default location, or a cache directory), rebuilding it if stale.
+            nets (bool): Parse the netlist. Without it only the cell and row arrays are built
+                (no cache, no HPWL), for CongestionEstimator's 'stream' mode, which reads
+                the .nets file itself chunk by chunk.
         """
+        if not nets:
+            self.generate_arrays(nets=False)
+            return
+        if columnar or cache:
+            self.generate_arrays(cache)
+            if not columnar:
+                self.materialize_objects()
+            return
+
         self.generate_cells()
         self.generate_rows()
         self.generate_nets()
         self.calculate_benchmark_attributes()
         self.categorize_cells()
         self.calculate_cells_to_pins_connections()
-        # self.calculate_cells_levels()
+        self.calculate_cells_levels()
+
+    @instrumented('Benchmark.generate_arrays')
+    def generate_arrays(self, cache=None, nets=True):
+        """
+        Parse the benchmark straight into DesignArrays with the fast parser and calculate
+        the design attributes from them, without creating any Cell, Net or Row objects.
+        Args:
+            cache (bool or str): Use a DesignCache (True for the default location, or a cache directory).
+            nets (bool): Parse the netlist; without it the arrays hold no nets and hpwl is None.
+        """
+        design_cache = None
+        if cache:
+            design_cache = DesignCache(self.fp, None if cache is True else cache)
+            cached = design_cache.load()
+            if cached is not None:
+                self.arrays, attributes = cached
+                for key, value in attributes.items():
+                    setattr(self, key, value)
+                self._objects_pending = True
+                return
+            sources = design_cache.fingerprint()
+
+        arrays = self.fp.read_arrays(nets=nets)
+
+        self.lx, self.rx, self.ly, self.hy = (float(v) for v in arrays.die_area())
+        self.w = self.rx - self.lx
+        self.h = self.hy - self.ly
+
+        off_row, multirow = arrays.row_report()
+        self.report_row_assignment([arrays.cell_name(i) for i in np.flatnonzero(off_row)],
+                                   [arrays.cell_name(i) for i in np.flatnonzero(multirow)])
+
+        arrays.categorize_cells(self.lx, self.rx, self.ly, self.hy)
+        arrays.calculate_pin_counters()
+        arrays.calculate_net_bboxes()
+        if nets:
+            arrays.calculate_levels()
+        self.density = float(arrays.row_densities().mean())
+        self.hpwl = float(arrays.net_hpwl.sum()) if nets else None
+
+        self.arrays = arrays
+        self._objects_pending = True
+
+        if design_cache is not None:
+            design_cache.store(arrays, {key: getattr(self, key) for key in
+                                        ('lx', 'rx', 'ly', 'hy', 'w', 'h', 'density', 'hpwl')}, sources)
+
+    def get_arrays(self):
+        """
+        Columnar view of the design, built from the object view if needed.
+        Returns:
+            DesignArrays: The columnar design.
+        """
+        if self.arrays is None:
+            self.arrays = DesignArrays.from_benchmark(self)
+        return self.arrays
+
+    def move_cells(self, moves: dict):
+        """
+        Move cells to new positions and update the bounding boxes and HPWL of the nets
+        connected to them, in the columnar view and, if built, the Cell/Net objects.
+        Row assignment and row density are not updated.
+        Args:
+            moves (dict): Cell name -> new (lx, ly) lower-left corner.
+        Returns:
+            tuple: (cells, nets) - indices of the moved cells and of their nets.
+        """
+        arrays = self.get_arrays()
+        cells = np.fromiter((arrays.index_of(name) for name in moves), dtype=np.int64, count=len(moves))
+        nets = arrays.nets_of_cells(cells)
+        old_hpwl = arrays.net_hpwl[nets].sum()
+
+        positions = np.array(list(moves.values()), dtype=np.float64).reshape(-1, 2)
+        arrays.lx[cells] = positions[:, 0]
+        arrays.ly[cells] = positions[:, 1]
+        arrays.calculate_net_bboxes(nets)
+        self.hpwl += float(arrays.net_hpwl[nets].sum() - old_hpwl)
+
+        if not self._objects_pending:
+            touched = {}
+            for cell_name, (lx, ly) in moves.items():
+                cell = self._cells[cell_name]
+                cell.lx, cell.ly = lx, ly
+                touched.update(cell.nets)
+            for net in touched.values():
+                net.calculate_hpwl()
+
+        return cells, nets
+
+    @instrumented('Benchmark.materialize_objects')
+    def materialize_objects(self):
+        """
+        Create the Cell, Net and Row objects from the columnar arrays.
+        """
+        self._objects_pending = False
+        arrays = self.arrays
+
+        lx, ly, w, h = arrays.lx.tolist(), arrays.ly.tolist(), arrays.w.tolist(), arrays.h.tolist()
+        flags = arrays.flags.tolist()
+        pin_counter = arrays.pin_counter.tolist()
+        levels = arrays.cell_level.tolist() if arrays.cell_level is not None else None
+        names = [name.decode() for name in arrays.names]
+        for i, cell_name in enumerate(names):
+            fl = [lx[i], ly[i], arrays.orientation[i].decode() or None, w[i], h[i]]
+            if flags[i] & DesignArrays.TERMINAL:
+                fl.append("terminal")
+            cell = self.new_cell()
+            cell.generate_cell(cell_name, fl)
+            cell.macro = bool(flags[i] & DesignArrays.MACRO)
+            cell.pin = bool(flags[i] & DesignArrays.PIN)
+            cell.pin_counter = int(pin_counter[i])
+            if levels is not None and levels[i] >= 0:
+                cell.lvl = levels[i]
+            self._cells[cell_name] = cell
+            if cell.macro:
+                self._macros[cell_name] = cell
+            elif cell.pin:
+                self._pins[cell_name] = cell
+
+        # Nets keep their pins (and offsets) when the arrays have them, else their distinct cells
+        if arrays.pin_ptr is not None:
+            net_ptr, net_cells = arrays.pin_ptr.tolist(), arrays.pin_cells.tolist()
+            offsets = list(zip(arrays.pin_dx.tolist(), arrays.pin_dy.tolist()))
+        else:
+            net_ptr, net_cells = arrays.net_ptr.tolist(), arrays.net_cells.tolist()
+            offsets = None
+        for i in range(arrays.num_nets):
+            net = self.new_net()
+            net_name = arrays.net_name(i)
+            start, end = net_ptr[i], net_ptr[i + 1]
+            net.generate_net(net_name, [names[c] for c in net_cells[start:end]], self._cells,
+                             offsets[start:end] if offsets is not None else None)
+            self._nets[net_name] = net
+        self.link_cell_nets()
+
+        self.generate_rows(report=False)
 
     def calculate_benchmark_attributes(self):
         """
@@ -103,7 +341,7 @@ class Benchmark:
         """
         cells = self.fp.read_cells()
         for cell_name in cells.keys():
-            cell = Cell()
+            cell = self.new_cell()
             cell.generate_cell(cell_name, cells[cell_name])
             self.cells[cell_name] = cell
         del cells
@@ -127,60 +365,99 @@ class Benchmark:
 
     def calculate_cells_levels(self):
         """
-        Calculate the level (distance from pin) for each cell using BFS traversal.
-        Sets the lvl attribute for each cell.
+        Calculate the level (distance from pin) for each cell with a multi-source BFS over
+        the star-expanded netlist (see DesignArrays.calculate_levels).
+        Sets the lvl attribute for each cell; cells that reach no pin keep None.
         """
-        queue = []
-        # Pins = lvl 0
-        for pin in self.pins.values():
-            pin.lvl = 0
-            queue.append(pin)
+        arrays = self.get_arrays()
+        if arrays.cell_level is None:
+            arrays.calculate_levels()
+        for cell, level in zip(self.cells.values(), arrays.cell_level.tolist()):
+            cell.lvl = level if level >= 0 else None
 
-        # BFS
-        while queue:
-            curr_cell = queue.pop(0)
-            curr_lvl = curr_cell.lvl
-
-            for net in curr_cell.nets.values():
-                for cell in net.cells.values():
-                    if cell.lvl is None:
-                        cell.lvl = curr_lvl + 1
-                        queue.append(cell)
-
-    def generate_rows(self):
+    def generate_rows(self, report=True):
         """
         Parse and generate all row objects from the benchmark data.
+        Cells are grouped by their ly once, so every row receives its cells directly
+        instead of scanning the whole design.
         Populates the self.rows list.
+        Args:
+            report (bool): Report cells that are off a row boundary or span several rows.
         """
+        cells_by_y = {}
+        for cell in self.cells.values():
+            cells_by_y.setdefault(cell.ly, []).append(cell)
+        for row_cells in cells_by_y.values():
+            # Keep them sorted in ascending left x
+            row_cells.sort(key=lambda c: c.lx)
+
         rows = self.fp.read_rows()
+        row_heights = {}
         for row_name in rows.keys():
-            row = Row()
-            row.generate_row(rows[row_name], list(self.cells.values()))
-            self.rows.append(row)
+            row = self.new_row()
+            row.generate_row(rows[row_name], cells_by_y.get(rows[row_name][0], []), grouped=True)
+            row_heights[row.ly] = max(row.h, row_heights.get(row.ly, row.h))
         del rows
 
+        if report:
+            off_row = [cell.name for cell in self.cells.values()
+                       if cell.ly not in row_heights and cell.movetype != "terminal"]
+            multirow = [cell.name for cell in self.cells.values()
+                        if cell.ly in row_heights and cell.h > row_heights[cell.ly] and cell.movetype != "terminal"]
+            self.report_row_assignment(off_row, multirow)
+
+    def report_row_assignment(self, off_row: list, multirow: list):
+        """
+        Record and report cells that the row assignment cannot place exactly.
+        Off-row cells belong to no row and do not count towards any row density; multi-row
+        cells are counted in full in the row they start on.
+        Args:
+            off_row (list): Names of movable cells whose ly is not on any row.
+            multirow (list): Names of movable cells taller than the row they start on.
+        """
+        self.off_row_cells = off_row
+        self.multirow_cells = multirow
+        if off_row:
+            logger.warning(f"Warning: {len(off_row)} movable cells sit off a row boundary, e.g. {off_row[:5]}")
+        if multirow:
+            logger.warning(f"Warning: {len(multirow)} cells span several rows, e.g. {multirow[:5]}")
+
     def generate_nets(self):
         """
         Parse and generate all net objects from the benchmark data.
         Populates the self.nets dictionary.
         """
-        nets = self.fp.read_nets()
+        nets, offsets = self.fp.read_nets(offsets=True)
         for net_name in nets.keys():
-            net = Net()
-            net.generate_net(net_name, nets[net_name], self.cells)
+            net = self.new_net()
+            net.generate_net(net_name, nets[net_name], self.cells, offsets[net_name] if offsets else None)
             self.nets[net_name] = net
-        del nets
+        del nets, offsets
+        self.link_cell_nets()
+
+    def link_cell_nets(self):
+        """
+        Set every cell's net IDs from the generated nets, in one pass: the IDs are collected
+        in per-cell lists (linear in a cell's fanout) and stored as tuples.
+        """
+        cell_nets = [[] for _ in self.cells_by_id]
+        for net in self.nets_by_id:
+            for i in net.cell_ids:
+                cell_nets[i].append(net.id)
+        for cell, net_ids in zip(self.cells_by_id, cell_nets):
+            cell.net_ids = tuple(net_ids)
 
     def calculate_cells_to_pins_connections(self):
         """
         For each net, count the number of pin cells and update pin_counter for non-pin cells.
         """
+        cells = self.cells_by_id
         for net in self.nets.values():
             pin_counter = 0
-            for cell in net.cells.values():
-                if cell.pin:
+            for i in net.cell_ids:
+                if cells[i].pin:
                     pin_counter += 1
-            for cell in net.cells.values():
-                if cell.pin:
+            for i in net.cell_ids:
+                if cells[i].pin:
                     continue
-                cell.pin_counter += pin_counter
\ No newline at end of file
+                cells[i].pin_counter += pin_counter
\ No newline at end of file
@@ -2,15 +2,21 @@ class Cell:
     """
     Represents a cell (standard cell, macro, or pin) in a VLSI design.
     Stores attributes parsed from benchmark files and calculated properties.
+    Cells are created by their Benchmark (see Benchmark.new_cell), which allocates
+    their IDs; connected nets are kept as net IDs into that Benchmark.
     """
-    counter = -1
+    __slots__ = ('id', 'design', 'name', 'ly', 'lx', 'w', 'h', 'movetype', 'orientation',
+                 'pin', 'macro', 'lvl', 'net_ids', 'pin_counter')
 
-    def __init__(self):
+    def __init__(self, design=None, id: int = None):
         """
         Initialize a Cell object with default attributes.
+        Args:
+            design (Benchmark): Benchmark the cell belongs to.
+            id (int): Cell ID, dense within the benchmark.
         """
-        Cell.counter += 1
-        self.id = Cell.counter
+        self.id = id
+        self.design = design
 
         # Input file attributes
         self.name = None
@@ -22,15 +28,30 @@ class Cell:
         self.orientation = None
 
         # Calculated attributes
-        self.hy = None
-        self.rx = None
         self.pin = False
         self.macro = False
         self.lvl = None  # Connection based attribute
-        self.nets = {}
+        self.net_ids = ()
 
         self.pin_counter = 0
 
+    @property
+    def rx(self):
+        return self.lx + self.w
+
+    @property
+    def hy(self):
+        return self.ly + self.h
+
+    @property
+    def nets(self):
+        """
+        Returns:
+            dict: Net name -> Net of the nets connected to the cell.
+        """
+        nets = self.design.nets_by_id
+        return {nets[i].name: nets[i] for i in self.net_ids}
+
     def __str__(self):
         """
         String representation of the Cell object, showing key attributes.
@@ -60,6 +81,3 @@ class Cell:
         self.h = fl[4]
         if len(fl) > 5:
             self.movetype = fl[5]
-
-        self.hy = self.ly + self.h
-        self.rx = self.lx + self.w
\ No newline at end of file
@@ -0,0 +1,526 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+
+
+class DesignArrays:
+    """
+    Columnar (structure-of-arrays) view of a VLSI design.
+    Stores cell geometry and flags as NumPy arrays and the netlist as CSR-style
+    net->cell and cell->net incidence arrays, so estimators can work on whole
+    designs without a Cell/Net object graph. When the netlist gives pin offsets,
+    a per-pin CSR layout (pin_ptr, pin_cells, pin_dx, pin_dy) is kept as well and
+    net boxes are taken over the pins.
+    """
+    # Cell flag bits
+    TERMINAL = 1
+    MACRO = 2
+    PIN = 4
+
+    # Pin offset transform (a, b, c, d) of each orientation, DEF convention: a pin given at
+    # (dx, dy) for N sits at (a * dx + b * dy, c * dx + d * dy) from the cell center
+    ORIENTATIONS = {'N': (1, 0, 0, 1), 'S': (-1, 0, 0, -1), 'W': (0, -1, 1, 0), 'E': (0, 1, -1, 0),
+                    'FN': (-1, 0, 0, 1), 'FS': (1, 0, 0, -1), 'FW': (0, 1, 1, 0), 'FE': (0, -1, -1, 0)}
+
+    # Array attributes that make up the design, in storage order
+    FIELDS = ('names', 'lx', 'ly', 'w', 'h', 'flags', 'orientation', 'net_ptr', 'net_cells', 'rows',
+              'pin_ptr', 'pin_cells', 'pin_dx', 'pin_dy',
+              'cell_ptr', 'cell_nets', 'pin_counter', 'net_lx', 'net_rx', 'net_ly', 'net_hy', 'net_hpwl',
+              'cell_level', 'cell_source', 'cell_component')
+
+    def __init__(self, names, lx, ly, w, h, flags, orientation, net_ptr, net_cells, rows, pins=None):
+        """
+        Initialize the DesignArrays object.
+        Args:
+            names (np.ndarray): Cell names as a bytes array.
+            lx, ly, w, h (np.ndarray): Cell lower-left corners and dimensions.
+            flags (np.ndarray): Cell flag bits (TERMINAL, MACRO, PIN).
+            orientation (np.ndarray): Cell orientations as a bytes array.
+            net_ptr (np.ndarray): CSR offsets of each net into net_cells (num_nets + 1).
+            net_cells (np.ndarray): Cell indices of every net, unique within a net.
+            rows (np.ndarray): (num_rows, 5) row attributes [ly, h, sitespacing, lx, numsites].
+            pins (tuple): Optional per-pin layout (pin_ptr, pin_cells, pin_dx, pin_dy): CSR offsets
+                of each net, the cell index of every pin in file order and its offset from the
+                cell center (NaN for pins without one).
+        """
+        self.names = names
+        self.lx = np.ascontiguousarray(lx, dtype=np.float64)
+        self.ly = np.ascontiguousarray(ly, dtype=np.float64)
+        self.w = np.ascontiguousarray(w, dtype=np.float64)
+        self.h = np.ascontiguousarray(h, dtype=np.float64)
+        self.flags = np.ascontiguousarray(flags, dtype=np.uint8)
+        self.orientation = orientation
+        self.net_ptr = np.ascontiguousarray(net_ptr, dtype=np.int64)
+        self.net_cells = np.ascontiguousarray(net_cells, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.float64).reshape(-1, 5)
+        self.pin_ptr = self.pin_cells = self.pin_dx = self.pin_dy = None
+        if pins is not None:
+            self.pin_ptr = np.ascontiguousarray(pins[0], dtype=np.int64)
+            self.pin_cells = np.ascontiguousarray(pins[1], dtype=np.int64)
+            self.pin_dx = np.ascontiguousarray(pins[2], dtype=np.float64)
+            self.pin_dy = np.ascontiguousarray(pins[3], dtype=np.float64)
+
+        self.cell_ptr = None
+        self.cell_nets = None
+        self.pin_counter = None
+        self.net_lx = None
+        self.net_rx = None
+        self.net_ly = None
+        self.net_hy = None
+        self.net_hpwl = None
+        self.cell_level = None
+        self.cell_source = None
+        self.cell_component = None
+        self._cell_index = None
+        self._pin_transform = None
+
+        self.build_cell_nets()
+
+    @classmethod
+    def from_parsed(cls, cells: dict, nets: dict, rows: dict, offsets: dict = None):
+        """
+        Build the arrays from FParser output without creating Cell or Net objects.
+        Args:
+            cells (dict): FParser.read_cells() output.
+            nets (dict): FParser.read_nets() output.
+            rows (dict): FParser.read_rows() output.
+            offsets (dict): Pin offsets from FParser.read_nets(offsets=True), if any.
+        Returns:
+            DesignArrays: The columnar design.
+        """
+        count = len(cells)
+        names = np.array([name.encode() for name in cells.keys()], dtype=np.bytes_)
+        attrs = list(cells.values())
+        lx = np.fromiter((fl[0] for fl in attrs), dtype=np.float64, count=count)
+        ly = np.fromiter((fl[1] for fl in attrs), dtype=np.float64, count=count)
+        w = np.fromiter((fl[3] for fl in attrs), dtype=np.float64, count=count)
+        h = np.fromiter((fl[4] for fl in attrs), dtype=np.float64, count=count)
+        flags = np.fromiter((cls.TERMINAL if len(fl) > 5 else 0 for fl in attrs), dtype=np.uint8, count=count)
+        orientation = np.array([(fl[2] or '').encode() for fl in attrs], dtype=np.bytes_)
+        del attrs
+
+        index = {name: i for i, name in enumerate(cells.keys())}
+        degrees = np.fromiter((len(net) for net in nets.values()), dtype=np.int64, count=len(nets))
+        pins = np.fromiter((index[cname] for net in nets.values() for cname in net), dtype=np.int64,
+                           count=int(degrees.sum()))
+        net_ptr, net_cells = cls.unique_incidence(degrees, pins, count)
+
+        pin_layout = None
+        if offsets is not None:
+            dx, dy = np.array([offset for net in nets for offset in offsets[net]], dtype=np.float64).reshape(-1, 2).T
+            pin_layout = (np.concatenate(([0], np.cumsum(degrees))), pins, dx, dy)
+
+        return cls(names, lx, ly, w, h, flags, orientation, net_ptr, net_cells, list(rows.values()), pin_layout)
+
+    @classmethod
+    def from_benchmark(cls, bench):
+        """
+        Build the arrays from an object-based Benchmark.
+        Args:
+            bench (Benchmark): Benchmark with generated cells, nets and rows.
+        Returns:
+            DesignArrays: The columnar design.
+        """
+        cells = list(bench.cells.values())
+        count = len(cells)
+        names = np.array([cell.name.encode() for cell in cells], dtype=np.bytes_)
+        lx = np.fromiter((cell.lx for cell in cells), dtype=np.float64, count=count)
+        ly = np.fromiter((cell.ly for cell in cells), dtype=np.float64, count=count)
+        w = np.fromiter((cell.w for cell in cells), dtype=np.float64, count=count)
+        h = np.fromiter((cell.h for cell in cells), dtype=np.float64, count=count)
+        flags = np.fromiter(((cls.TERMINAL if cell.movetype == "terminal" else 0) |
+                             (cls.MACRO if cell.macro else 0) |
+                             (cls.PIN if cell.pin else 0) for cell in cells), dtype=np.uint8, count=count)
+        orientation = np.array([(cell.orientation or '').encode() for cell in cells], dtype=np.bytes_)
+
+        # Cell IDs are dense and in creation order, so they are the cell indices
+        nets = list(bench.nets.values())
+        degrees = np.fromiter((len(net.cell_ids) for net in nets), dtype=np.int64, count=len(nets))
+        net_cells = np.fromiter((i for net in nets for i in net.cell_ids), dtype=np.int64,
+                                count=int(degrees.sum()))
+        net_ptr = np.concatenate(([0], np.cumsum(degrees)))
+
+        pin_layout = None
+        if any(net.pin_ids is not None for net in nets):
+            pins = [net.pin_ids or net.cell_ids for net in nets]
+            pin_degrees = np.fromiter(map(len, pins), dtype=np.int64, count=len(pins))
+            pin_cells = np.fromiter((i for net in pins for i in net), dtype=np.int64, count=int(pin_degrees.sum()))
+            offsets = np.concatenate([np.frombuffer(net.pin_offsets, dtype=np.float64) if net.pin_ids is not None
+                                      else np.full(2 * len(net.cell_ids), np.nan) for net in nets])
+            dx, dy = offsets.reshape(-1, 2).T
+            pin_layout = (np.concatenate(([0], np.cumsum(pin_degrees))), pin_cells, dx, dy)
+
+        rows = [[row.ly, row.h, row.sitespacing, row.lx, row.numsites] for row in bench.rows]
+        arrays = cls(names, lx, ly, w, h, flags, orientation, net_ptr, net_cells, rows, pin_layout)
+        arrays.pin_counter = np.fromiter((cell.pin_counter for cell in cells), dtype=np.float64, count=count)
+        arrays.calculate_net_bboxes()
+        return arrays
+
+    @classmethod
+    def from_columns(cls, columns: dict):
+        """
+        Rebuild the design from stored arrays without recomputing anything.
+        The arrays are used as given, so memory-mapped arrays stay zero-copy.
+        Args:
+            columns (dict): Field name -> array, as returned by to_columns().
+        Returns:
+            DesignArrays: The columnar design.
+        """
+        arrays = cls.__new__(cls)
+        for field in cls.FIELDS:
+            setattr(arrays, field, columns.get(field))
+        arrays._cell_index = None
+        arrays._pin_transform = None
+        return arrays
+
+    def to_columns(self):
+        """
+        Returns:
+            dict: Field name -> array for every computed field in FIELDS.
+        """
+        return {field: getattr(self, field) for field in self.FIELDS if getattr(self, field) is not None}
+
+    @staticmethod
+    def unique_incidence(degrees, pins, num_cells: int):
+        """
+        Build CSR net->cell incidence, keeping each cell once per net like Net.cells does.
+        Args:
+            degrees (np.ndarray): Number of pins of each net.
+            pins (np.ndarray): Cell index of every pin, grouped by net.
+            num_cells (int): Total number of cells.
+        Returns:
+            tuple: (net_ptr, net_cells) arrays.
+        """
+        num_nets = len(degrees)
+        pin_nets = np.repeat(np.arange(num_nets, dtype=np.int64), degrees)
+        keys = pin_nets * num_cells + pins
+        keys.sort()
+        if len(keys) > 1:
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        net_ptr = np.zeros(num_nets + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // num_cells, minlength=num_nets), out=net_ptr[1:])
+        return net_ptr, keys % num_cells
+
+    @property
+    def num_cells(self):
+        return len(self.lx)
+
+    @property
+    def num_nets(self):
+        return len(self.net_ptr) - 1
+
+    @property
+    def rx(self):
+        return self.lx + self.w
+
+    @property
+    def hy(self):
+        return self.ly + self.h
+
+    @property
+    def net_degree(self):
+        """
+        Returns:
+            np.ndarray: Number of distinct cells on each net.
+        """
+        return np.diff(self.net_ptr)
+
+    @property
+    def cell_fanout(self):
+        """
+        Returns:
+            np.ndarray: Number of nets connected to each cell.
+        """
+        return np.diff(self.cell_ptr)
+
+    def net_of_pins(self):
+        """
+        Returns:
+            np.ndarray: Net index of every entry of net_cells.
+        """
+        return np.repeat(np.arange(self.num_nets, dtype=np.int64), self.net_degree)
+
+    def cell_name(self, i: int):
+        return self.names[i].decode()
+
+    @staticmethod
+    def net_name(i: int):
+        # Same naming scheme as FParser.read_nets()
+        return f"n{i}"
+
+    def index_of(self, name: str):
+        """
+        Index of a cell by name.
+        Args:
+            name (str): Cell name.
+        Returns:
+            int: Cell index.
+        """
+        if self._cell_index is None:
+            self._cell_index = {n.decode(): i for i, n in enumerate(self.names)}
+        return self._cell_index[name]
+
+    @staticmethod
+    def csr_positions(ptr, rows):
+        """
+        Positions of the CSR segments of some rows.
+        Args:
+            ptr (np.ndarray): CSR offsets.
+            rows (np.ndarray): Rows to gather.
+        Returns:
+            tuple: (positions of the rows' values, offset of each row's segment within them).
+        """
+        lengths = ptr[rows + 1] - ptr[rows]
+        starts = np.zeros(len(rows), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        positions = np.arange(int(lengths.sum()), dtype=np.int64) + np.repeat(ptr[rows] - starts, lengths)
+        return positions, starts
+
+    @classmethod
+    def csr_gather(cls, ptr, values, rows):
+        """
+        Concatenate the CSR segments of some rows.
+        Args:
+            ptr (np.ndarray): CSR offsets.
+            values (np.ndarray): CSR values.
+            rows (np.ndarray): Rows to gather.
+        Returns:
+            tuple: (gathered values, offset of each row's segment within them).
+        """
+        positions, starts = cls.csr_positions(ptr, rows)
+        return values[positions], starts
+
+    def nets_of_cells(self, cells):
+        """
+        Args:
+            cells (np.ndarray): Cell indices.
+        Returns:
+            np.ndarray: Sorted indices of the nets connected to any of the cells.
+        """
+        nets, _ = self.csr_gather(self.cell_ptr, self.cell_nets, np.asarray(cells, dtype=np.int64))
+        return np.unique(nets)
+
+    def build_cell_nets(self):
+        """
+        Build the CSR cell->net incidence as the transpose of net->cell.
+        """
+        order = np.argsort(self.net_cells, kind='stable')
+        self.cell_nets = self.net_of_pins()[order]
+        self.cell_ptr = np.zeros(self.num_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.net_cells, minlength=self.num_cells), out=self.cell_ptr[1:])
+
+    def die_area(self):
+        """
+        Returns:
+            tuple: (lx, rx, ly, hy) die extents from the rows.
+        """
+        ly, h, spacing, lx, numsites = self.rows.T
+        return lx.min(), (lx + numsites * spacing).max(), ly.min(), (ly + h).max()
+
+    def categorize_cells(self, lx, rx, ly, hy):
+        """
+        Flag terminals inside the die as macros and the rest as pins (see Benchmark.categorize_cells).
+        Args:
+            lx, rx, ly, hy (float): Die extents.
+        """
+        terminal = (self.flags & self.TERMINAL) != 0
+        inside = (ly <= self.ly) & (self.ly <= hy) & (lx <= self.lx) & (self.lx <= rx)
+        self.flags &= ~np.uint8(self.MACRO | self.PIN)
+        self.flags[terminal & inside] |= self.MACRO
+        self.flags[terminal & ~inside] |= self.PIN
+
+    def calculate_pin_counters(self):
+        """
+        Count, for every non-pin cell, the pin cells on the nets it connects to
+        (see Benchmark.calculate_cells_to_pins_connections).
+        """
+        is_pin = (self.flags[self.net_cells] & self.PIN) != 0
+        pins_per_net = np.bincount(self.net_of_pins(), weights=is_pin, minlength=self.num_nets)
+        self.pin_counter = np.bincount(self.net_cells, weights=np.where(is_pin, 0.0, pins_per_net[self.net_of_pins()]),
+                                       minlength=self.num_cells)
+
+    def pin_extents(self, cells, dx=None, dy=None):
+        """
+        Extents of some pins. A pin with an offset is the point at its cell's center plus
+        the offset, turned by the cell's orientation (offsets are given for N); a pin
+        without one (NaN, or no offsets given) spans its whole cell.
+        Args:
+            cells (np.ndarray): Cell index of every pin.
+            dx, dy (np.ndarray): Pin offsets from the cell center.
+        Returns:
+            tuple: (lx, rx, ly, hy) arrays, one entry per pin.
+        """
+        lx, ly = self.lx[cells], self.ly[cells]
+        w, h = self.w[cells], self.h[cells]
+        rx, hy = lx + w, ly + h
+        if dx is None:
+            return lx, rx, ly, hy
+        has_offset = ~np.isnan(dx)
+        a, b, c, d = self.pin_transform[cells].T
+        x = lx + 0.5 * w + (a * dx + b * dy)
+        y = ly + 0.5 * h + (c * dx + d * dy)
+        return (np.where(has_offset, x, lx), np.where(has_offset, x, rx),
+                np.where(has_offset, y, ly), np.where(has_offset, y, hy))
+
+    @property
+    def pin_transform(self):
+        """
+        Returns:
+            np.ndarray: (num_cells, 4) pin offset transform of every cell's orientation
+                (see ORIENTATIONS); unknown or missing orientations count as N.
+        """
+        if self._pin_transform is None:
+            codes, inverse = np.unique(self.orientation, return_inverse=True)
+            table = np.array([self.ORIENTATIONS.get(code.decode(), self.ORIENTATIONS['N']) for code in codes],
+                             dtype=np.float64).reshape(-1, 4)
+            self._pin_transform = table[inverse.ravel()]
+        return self._pin_transform
+
+    def incidence_graph(self):
+        """
+        Star expansion of the netlist: one node per cell followed by one node per net, and an
+        edge between every net and each of its cells. A net adds one edge per cell instead of
+        a clique, so high-fanout nets stay linear in size.
+        Returns:
+            scipy.sparse.csr_matrix: (num_cells + num_nets) square adjacency, cell->net edges only
+                (use it as an undirected graph).
+        """
+        num_nodes = self.num_cells + self.num_nets
+        indptr = np.concatenate((self.cell_ptr, np.full(self.num_nets, self.cell_ptr[-1])))
+        return csr_matrix((np.ones(len(self.cell_nets)), self.cell_nets + self.num_cells, indptr),
+                          shape=(num_nodes, num_nodes))
+
+    def calculate_levels(self):
+        """
+        Connectivity features of every cell (see Benchmark.calculate_cells_levels), from one
+        multi-source BFS and one connected-components pass over the star-expanded netlist:
+        cell_level, the number of nets on the shortest path to any pin cell (pins are level 0,
+        -1 if no pin is reachable); cell_source, the pin cell reached that way (-1 if none);
+        and cell_component, the label of the cell's connected component (consecutive from 0).
+        """
+        num_cells = self.num_cells
+        graph = self.incidence_graph()
+        _, labels = connected_components(graph, directed=False)
+        _, self.cell_component = np.unique(labels[:num_cells], return_inverse=True)
+
+        self.cell_level = np.full(num_cells, -1, dtype=np.int64)
+        self.cell_source = np.full(num_cells, -1, dtype=np.int64)
+        pins = np.flatnonzero(self.flags & self.PIN)
+        if not len(pins):
+            return
+        # Distances count cell->net->cell hops, so a level is half the distance
+        distance, _, source = dijkstra(graph, directed=False, indices=pins, unweighted=True, min_only=True,
+                                       return_predecessors=True)
+        reached = np.flatnonzero(np.isfinite(distance[:num_cells]))
+        self.cell_level[reached] = distance[reached].astype(np.int64) // 2
+        self.cell_source[reached] = source[reached]
+
+    @property
+    def pin_distance(self):
+        """
+        Returns:
+            np.ndarray: Manhattan distance between every cell's center and the center of its
+                cell_source pin at the current positions (NaN for cells that reach no pin).
+        """
+        reached = self.cell_source >= 0
+        source = self.cell_source[reached]
+        x, y = self.lx + 0.5 * self.w, self.ly + 0.5 * self.h
+        distance = np.full(self.num_cells, np.nan)
+        distance[reached] = np.abs(x[reached] - x[source]) + np.abs(y[reached] - y[source])
+        return distance
+
+    def connectivity_stats(self):
+        """
+        Returns:
+            dict: Number of connected components (counting cells on no net as their own),
+                cells in the largest one, cells on no net, cells with no path to a pin,
+                and the maximum and mean cell level over the cells that reach a pin.
+        """
+        sizes = np.bincount(self.cell_component)
+        reached = self.cell_level >= 0
+        return {'components': len(sizes), 'largest_component': int(sizes.max()) if len(sizes) else 0,
+                'isolated_cells': int((self.cell_fanout == 0).sum()), 'unreached_cells': int((~reached).sum()),
+                'max_level': int(self.cell_level.max()) if reached.any() else -1,
+                'mean_level': float(self.cell_level[reached].mean()) if reached.any() else float('nan')}
+
+    def calculate_net_bboxes(self, nets=None):
+        """
+        Calculate every net's bounding box and HPWL with segmented min/max reductions,
+        over its pins when the design has pin offsets and over whole-cell extents otherwise.
+        Empty nets get NaN boxes and zero HPWL.
+        Args:
+            nets (np.ndarray): Only update these nets (e.g. after moving some cells);
+                all nets are recalculated if omitted.
+        """
+        if self.pin_ptr is not None:
+            ptr, cells, dx, dy = self.pin_ptr, self.pin_cells, self.pin_dx, self.pin_dy
+        else:
+            ptr, cells, dx, dy = self.net_ptr, self.net_cells, None, None
+        reduces = (np.minimum, np.maximum, np.minimum, np.maximum)
+
+        if nets is not None:
+            nets = np.asarray(nets, dtype=np.int64)
+            nets = nets[ptr[nets + 1] > ptr[nets]]
+            positions, starts = self.csr_positions(ptr, nets)
+            if dx is not None:
+                dx, dy = dx[positions], dy[positions]
+            extents = self.pin_extents(cells[positions], dx, dy)
+            boxes = (self.net_lx, self.net_rx, self.net_ly, self.net_hy)
+            for out, values, reduce in zip(boxes, extents, reduces):
+                if len(starts):
+                    out[nets] = reduce.reduceat(values, starts)
+            self.net_hpwl[nets] = (self.net_rx[nets] - self.net_lx[nets]) + (self.net_hy[nets] - self.net_ly[nets])
+            return
+
+        num_nets = self.num_nets
+        nonempty = np.diff(ptr) > 0
+        starts = ptr[:-1][nonempty]
+        boxes = []
+        for values, reduce in zip(self.pin_extents(cells, dx, dy), reduces):
+            out = np.full(num_nets, np.nan)
+            if len(starts):
+                out[nonempty] = reduce.reduceat(values, starts)
+            boxes.append(out)
+        self.net_lx, self.net_rx, self.net_ly, self.net_hy = boxes
+        self.net_hpwl = np.where(nonempty, (self.net_rx - self.net_lx) + (self.net_hy - self.net_ly), 0.0)
+
+    def row_slots(self):
+        """
+        Match every cell to the row y-coordinate its ly sits on.
+        Returns:
+            tuple: (row_ys, slot) - the distinct row y-coordinates, and for every cell the
+                index into row_ys of its row, or -1 if the cell is off every row boundary.
+        """
+        row_ys = np.unique(self.rows[:, 0])
+        slot = np.searchsorted(row_ys, self.ly).clip(0, max(len(row_ys) - 1, 0))
+        on_row = row_ys[slot] == self.ly if len(row_ys) else np.zeros(self.num_cells, dtype=bool)
+        return row_ys, np.where(on_row, slot, -1)
+
+    def row_report(self):
+        """
+        Find cells the row assignment cannot place exactly (see Benchmark.report_row_assignment).
+        Returns:
+            tuple: (off_row, multirow) boolean masks - movable cells whose ly is not on any row,
+                and movable cells taller than the row they start on.
+        """
+        row_ys, slot = self.row_slots()
+        row_h = np.zeros(len(row_ys))
+        np.maximum.at(row_h, np.searchsorted(row_ys, self.rows[:, 0]), self.rows[:, 1])
+
+        movable = (self.flags & self.TERMINAL) == 0
+        off_row = (slot < 0) & movable
+        multirow = (slot >= 0) & (self.h > row_h[slot.clip(0)]) & movable
+        return off_row, multirow
+
+    def row_densities(self):
+        """
+        Density of every row: width of the cells whose ly equals the row's ly over the row width
+        (see Row.calculate_density).
+        Returns:
+            np.ndarray: Density of each row.
+        """
+        ly, h, spacing, lx, numsites = self.rows.T
+        row_ys, slot = self.row_slots()
+        on_row = slot >= 0
+        widths = np.bincount(slot[on_row], weights=self.w[on_row], minlength=len(row_ys))
+        return widths[np.searchsorted(row_ys, ly)] / (numsites * spacing)
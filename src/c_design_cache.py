@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, concurrent batch jobs may rebuild the same entry
+    fcntl = None
+
+import numpy as np
+
+from c_design_arrays import DesignArrays
+from c_file_parser import FParser
+
+
+class DesignCache:
+    """
+    On-disk cache of parsed designs.
+    Stores the DesignArrays of a benchmark as raw .npy files plus a JSON manifest,
+    keyed by the size, mtime and content hash of the Bookshelf files FParser resolves.
+    Cached arrays are memory-mapped copy-on-write, so loading is near-instant and
+    zero-copy; a cache whose source files changed is rebuilt automatically.
+    Loads and stores of an entry hold a lock file next to it (shared for loads, exclusive
+    for stores), so batch jobs of the same design can share one cache directory.
+    """
+    VERSION = 4
+    MANIFEST = "manifest.json"
+
+    def __init__(self, fp: FParser, cache_dir: str = None):
+        """
+        Initialize the DesignCache.
+        Args:
+            fp (FParser): Parser of the benchmark, used to resolve its source files.
+            cache_dir (str): Root cache directory; defaults to a .congestion_cache folder
+                next to the benchmark files.
+        """
+        self.sources = [fp.plfile, fp.nodesfile, fp.netsfile, fp.sclfile]
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(fp.plfile), ".congestion_cache")
+        self.path = os.path.join(cache_dir, fp.dname)
+
+    @staticmethod
+    def file_hash(path: str, block_size=1 << 20):
+        """
+        Content hash of a file.
+        Args:
+            path (str): File to hash.
+            block_size (int): Read size.
+        Returns:
+            str: Hex BLAKE2b digest.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def fingerprint(self, hashes=True):
+        """
+        Size, mtime and (optionally) content hash of every source file.
+        Args:
+            hashes (bool): Also hash the file contents.
+        Returns:
+            dict: Source path -> {'size', 'mtime_ns', 'hash'}.
+        """
+        prints = {}
+        for path in self.sources:
+            st = os.stat(path)
+            prints[path] = {
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'hash': self.file_hash(path) if hashes else None
+            }
+        return prints
+
+    @contextmanager
+    def _lock(self, exclusive: bool):
+        """
+        Hold the entry's lock file for the duration of the block.
+        Args:
+            exclusive (bool): Exclusive (store) rather than shared (load) lock.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", 'a') as file:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.path, self.MANIFEST)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def is_valid(self, manifest: dict):
+        """
+        Check a manifest against the current source files.
+        Files whose size and mtime match are trusted; only files with a new mtime are
+        re-hashed, and if their content is unchanged the manifest is refreshed in place.
+        Args:
+            manifest (dict): Stored manifest.
+        Returns:
+            bool: True if the cached design is up to date.
+        """
+        if manifest is None or manifest.get('version') != self.VERSION:
+            return False
+        stored = manifest['sources']
+        if sorted(stored) != sorted(self.sources):
+            return False
+
+        touched = False
+        for path, current in self.fingerprint(hashes=False).items():
+            if stored[path]['size'] != current['size']:
+                return False
+            if stored[path]['mtime_ns'] != current['mtime_ns']:
+                if self.file_hash(path) != stored[path]['hash']:
+                    return False
+                stored[path]['mtime_ns'] = current['mtime_ns']
+                touched = True
+
+        if touched:
+            self._write_manifest(manifest, self.path)
+        return True
+
+    def load(self):
+        """
+        Load the cached design if it is up to date.
+        Returns:
+            tuple: (DesignArrays, attributes dict), or None if the cache is missing or stale.
+        """
+        with self._lock(exclusive=False):
+            manifest = self._read_manifest()
+            if not self.is_valid(manifest):
+                return None
+
+            # Memory maps stay valid after the lock is released, even if the entry is replaced
+            columns = {field: np.load(os.path.join(self.path, f"{field}.npy"), mmap_mode='c')
+                       for field in manifest['fields']}
+        return DesignArrays.from_columns(columns), manifest['attributes']
+
+    def store(self, arrays: DesignArrays, attributes: dict, sources: dict = None):
+        """
+        Write a parsed design to the cache, replacing any previous entry. If another
+        process stored an up-to-date entry in the meantime, that entry is kept.
+        Args:
+            arrays (DesignArrays): Parsed design.
+            attributes (dict): Design-level scalars (die extents, density, HPWL).
+            sources (dict): fingerprint() of the source files taken before parsing them, so
+                that files edited during the parse are not stamped as fresh; taken now if None.
+        """
+        if sources is None:
+            sources = self.fingerprint()
+        with self._lock(exclusive=True):
+            if self.is_valid(self._read_manifest()):
+                return
+
+            tmp_path = f"{self.path}.tmp{os.getpid()}"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            os.makedirs(tmp_path)
+
+            columns = arrays.to_columns()
+            for field, values in columns.items():
+                np.save(os.path.join(tmp_path, f"{field}.npy"), np.ascontiguousarray(values))
+
+            manifest = {
+                'version': self.VERSION,
+                'sources': sources,
+                'fields': list(columns.keys()),
+                'attributes': attributes
+            }
+            self._write_manifest(manifest, tmp_path)
+
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.replace(tmp_path, self.path)
+
+    def _write_manifest(self, manifest: dict, path: str):
+        tmp_file = os.path.join(path, f"{self.MANIFEST}.tmp{os.getpid()}")
+        with open(tmp_file, 'w') as file:
+            json.dump(manifest, file, indent=1)
+        os.replace(tmp_file, os.path.join(path, self.MANIFEST))
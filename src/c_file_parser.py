@@ -1,4 +1,27 @@
+import mmap
 import os
+import re
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from c_design_arrays import DesignArrays
+from instrument_funcs import instrumented
+from log_funcs import get_logger
+
+logger = get_logger(__name__)
+
+# Bulk tokenizers for the fast parser; each match is one data line
+_NODES_LINE = re.compile(rb'^[ \t]*([^\s#]\S*)[ \t]+([-+.0-9eE]+)[ \t]+([-+.0-9eE]+)[ \t]*(\S*)', re.M)
+_PL_LINE = re.compile(rb'^[ \t]*([^\s#]\S*)[ \t]+([-+.0-9eE]+)[ \t]+([-+.0-9eE]+)(?:[ \t]*:[ \t]*(\S+))?', re.M)
+_NET_DEGREE = re.compile(rb'NetDegree[ \t]*:[ \t]*(\d+)')
+_NET_PIN = re.compile(rb'^[ \t]*(?!NetDegree)([^\s#]\S*)', re.M)
+# Pin lines with "cell [direction] : x_offset y_offset"; _PIN_OFFSET is a quick probe for any offset
+_NET_PIN_OFFSET = re.compile(rb'^[ \t]*(?!NetDegree)([^\s#]\S*)(?:[ \t]+[^\s:]\S*)?'
+                             rb'(?:[ \t]*:[ \t]*([-+.0-9eE]+)[ \t]+([-+.0-9eE]+))?', re.M)
+_PIN_OFFSET = re.compile(rb':[ \t]*[-+.0-9eE]+[ \t]+[-+.0-9eE]+[ \t]*\r?$', re.M)
+_HEADER = re.compile(rb'^[ \t]*(NumNodes|NumNets|NumPins)[ \t]*:[ \t]*(\d+)', re.M)
 
 
 class FParser:
@@ -17,11 +40,16 @@ class FParser:
             dname = dname.split("_")
             dname = dname[0]
 
+        self.dname = dname
         self.plfile = f"{folder_path}/{dname}.pl"
         self.nodesfile = f"{folder_path}/{dname}.nodes"
         self.netsfile = f"{folder_path}/{dname}.nets"
         self.sclfile = f"{folder_path}/{dname}.scl"
 
+        # File -> (MB, seconds, MB/s) of the last fast parse
+        self.parse_stats = {}
+
+    @instrumented('FParser.read_cells', counts=lambda cells, self: {'cells': len(cells)})
     def read_cells(self):
         """
         Parse and return all cell information from .pl and .nodes files.
@@ -68,21 +96,30 @@ class FParser:
                     cells[parts[0]].append("terminal")
 
         if numnodes != len(cells.keys()):
-            # print(cells.keys())
-            print(numnodes, len(cells.keys()))
-            print(f"Error: number of cells in file, different from extracted data")
+            logger.error(f"Error: number of cells in file, different from extracted data "
+                         f"({numnodes} vs {len(cells.keys())})")
             exit(1)
 
         return cells
 
-    def read_nets(self):
+    @instrumented('FParser.read_nets', counts=lambda nets, self, offsets=False: {
+        'nets': len(nets[0] if offsets else nets),
+        'pins': sum(map(len, (nets[0] if offsets else nets).values()))})
+    def read_nets(self, offsets=False):
         """
         Parse and return all net information from the .nets file.
+        Args:
+            offsets (bool): Also return the pin offsets ("cell dir : x_offset y_offset").
         Returns:
-            dict: Mapping of net names to lists of connected cell names.
+            dict: Mapping of net names to lists of connected cell names, one entry per pin.
+                With offsets, a tuple (nets, pin_offsets) where pin_offsets maps net names to
+                the (dx, dy) offset from the cell center of each pin (NaN where the file has
+                none), or is None if the file gives no offsets at all.
         """
         net_counter = -1
         nets = {}
+        pin_offsets = {}
+        found = False
 
         flag = False
         with open(self.netsfile, 'r') as file:
@@ -92,11 +129,23 @@ class FParser:
                     net_counter += 1
                     flag = True
                     nets[f"n{net_counter}"] = []
-                elif flag:
+                    pin_offsets[f"n{net_counter}"] = []
+                elif flag and line:
                     nets[f"n{net_counter}"].append(line[0])
+                    if offsets:
+                        # cell [direction] [: dx dy]
+                        colon = line.index(':') if ':' in line else -1
+                        if 0 < colon < len(line) - 2:
+                            pin_offsets[f"n{net_counter}"].append((float(line[colon + 1]), float(line[colon + 2])))
+                            found = True
+                        else:
+                            pin_offsets[f"n{net_counter}"].append((float('nan'), float('nan')))
 
+        if offsets:
+            return nets, pin_offsets if found else None
         return nets
 
+    @instrumented('FParser.read_rows', counts=lambda rows, self: {'rows': len(rows)})
     def read_rows(self):
         """
         Parse and return all row information from the .scl file.
@@ -121,4 +170,325 @@ class FParser:
                     rows[row_count].append(float(line[2]))
                     rows[row_count].append(float(line[5]))
 
-        return rows
\ No newline at end of file
+        return rows
+
+    @instrumented('FParser.read_arrays', counts=lambda arrays, self, *args, **kwargs: {
+        'cells': len(arrays.lx), 'nets': len(arrays.net_ptr) - 1, 'pins': len(arrays.net_cells),
+        'mb': self.parse_stats['total'][0]})
+    def read_arrays(self, chunk_bytes=1 << 25, nets=True):
+        """
+        Fast single-pass parse of the benchmark straight into DesignArrays.
+        Each file is memory-mapped and tokenized in bulk, chunk by chunk, with regular
+        expressions; numeric columns go into arrays preallocated from the NumNodes,
+        NumPins and NetDegree headers. Per-file throughput is kept in parse_stats.
+        Args:
+            chunk_bytes (int): Size of the mapped window tokenized at once.
+            nets (bool): Parse the .nets file; without it the arrays have no nets
+                (read them with stream_nets() instead).
+        Returns:
+            DesignArrays: The parsed design (not yet categorized).
+        """
+        start_time = time.perf_counter()
+        nodes = self._read_nodes_arrays(chunk_bytes)
+        pl = self._read_pl_arrays(len(nodes['names']), chunk_bytes)
+
+        numnodes = len(nodes['names'])
+        if numnodes != len(pl['names']):
+            logger.error(f"Error: number of cells in file, different from extracted data "
+                         f"({numnodes} vs {len(pl['names'])})")
+            exit(1)
+
+        # Cells follow .pl order, dimensions come from .nodes
+        if np.array_equal(pl['names'], nodes['names']):
+            order = np.arange(numnodes)
+        else:
+            by_name = np.argsort(nodes['names'])
+            pos = np.searchsorted(nodes['names'], pl['names'], sorter=by_name).clip(0, numnodes - 1)
+            order = by_name[pos]
+            if not np.array_equal(nodes['names'][order], pl['names']):
+                logger.error(f"Error: cells in {self.plfile} missing from {self.nodesfile}")
+                exit(1)
+
+        if nets:
+            degrees, pins, dx, dy = self._read_nets_arrays(pl['names'], chunk_bytes)
+        else:
+            degrees, pins = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            dx = dy = np.empty(0)
+        net_ptr, net_cells = DesignArrays.unique_incidence(degrees, pins, numnodes)
+        rows = self.read_rows()
+
+        # Per-pin layout, kept only when the file gives pin offsets
+        pin_layout = None
+        if not np.isnan(dx).all():
+            pin_layout = (np.concatenate(([0], np.cumsum(degrees))), pins, dx, dy)
+
+        arrays = DesignArrays(pl['names'], pl['x'], pl['y'], nodes['w'][order], nodes['h'][order],
+                              np.where(nodes['terminal'][order], DesignArrays.TERMINAL, 0),
+                              pl['orientation'], net_ptr, net_cells, list(rows.values()), pins=pin_layout)
+
+        elapsed = time.perf_counter() - start_time
+        files = (self.plfile, self.nodesfile, self.netsfile, self.sclfile) if nets else \
+            (self.plfile, self.nodesfile, self.sclfile)
+        mb = sum(os.path.getsize(f) for f in files) / 1e6
+        self.parse_stats['total'] = (mb, elapsed, mb / elapsed if elapsed else float('inf'))
+        logger.info(f"Parsed {self.dname}: {mb:.1f} MB in {elapsed:.2f}s ({self.parse_stats['total'][2]:.1f} MB/s)")
+        return arrays
+
+    @contextmanager
+    def _mapped(self, path: str):
+        """
+        Memory-map a file read-only and record its parse throughput on exit.
+        Args:
+            path (str): File to map.
+        Yields:
+            mmap.mmap or bytes: The mapped file (empty bytes for empty files).
+        """
+        start_time = time.perf_counter()
+        size = os.path.getsize(path)
+        with open(path, 'rb') as file:
+            if size == 0:
+                yield b''
+            else:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    yield mm
+        elapsed = time.perf_counter() - start_time
+        self.parse_stats[path] = (size / 1e6, elapsed, size / 1e6 / elapsed if elapsed else float('inf'))
+
+    def stream_nets(self, names, chunk_bytes=1 << 25):
+        """
+        Read the .nets file in chunks of whole nets, without ever holding the full netlist.
+        Args:
+            names (np.ndarray): Cell names (bytes) in cell index order.
+            chunk_bytes (int): Size of the mapped window tokenized at once.
+        Yields:
+            tuple: (degrees, pins, dx, dy) arrays of one chunk, the NetDegree of each of its nets,
+                the cell index of every pin and its offset from the cell center (NaN where none).
+        """
+        with self._mapped(self.netsfile) as mm:
+            data_start = mm.find(b'NetDegree')
+            if data_start < 0:
+                return
+            data_start = mm.rfind(b'\n', 0, data_start) + 1
+            by_name = np.argsort(names)
+            sorted_names = names[by_name]
+            for chunk in self._chunks(mm, data_start, chunk_bytes, b'NetDegree'):
+                degrees, pins, dx, dy = self._net_chunk(chunk, sorted_names, by_name)
+                if degrees.sum() != len(pins):
+                    logger.error(f"Error: number of pins in file, different from NetDegree headers "
+                                 f"({degrees.sum()} vs {len(pins)})")
+                    exit(1)
+                yield degrees, pins, dx, dy
+
+    @staticmethod
+    def _chunks(mm, start: int, chunk_bytes: int, boundary: bytes = None):
+        """
+        Split a mapped file into zero-copy windows that end on line boundaries.
+        Args:
+            mm: Mapped file.
+            start (int): Offset of the first window.
+            chunk_bytes (int): Approximate window size.
+            boundary (bytes): Only end windows right before a line containing this
+                (e.g. b'NetDegree', so no net is split across windows).
+        Yields:
+            memoryview: Consecutive windows covering mm[start:], released once consumed.
+        """
+        view = memoryview(mm)
+        size = len(mm)
+        try:
+            while start < size:
+                if boundary is None:
+                    end = mm.find(b'\n', min(start + chunk_bytes, size - 1))
+                    end = size if end < 0 else end + 1
+                else:
+                    end = mm.find(boundary, start + chunk_bytes)
+                    end = size if end < 0 else max(mm.rfind(b'\n', start, end) + 1, start + 1)
+                window = view[start:end]
+                try:
+                    yield window
+                finally:
+                    window.release()
+                start = end
+        finally:
+            view.release()
+
+    @staticmethod
+    def _headers(mm, end: int):
+        """
+        Read the NumNodes/NumNets/NumPins headers found before a given offset.
+        Args:
+            mm: Mapped file.
+            end (int): Offset where the data section starts.
+        Returns:
+            dict: Header name -> value.
+        """
+        head = bytes(mm[:end])
+        return {key.decode(): int(value) for key, value in _HEADER.findall(head)}
+
+    def _read_nodes_arrays(self, chunk_bytes: int):
+        """
+        Bulk parse of the .nodes file.
+        Returns:
+            dict: 'names', 'w', 'h' and 'terminal' arrays in file order.
+        """
+        with self._mapped(self.nodesfile) as mm:
+            # Header lines never match the data tokenizer, so one pass from the start is enough
+            numnodes = self._headers(mm, min(len(mm), 1 << 16)).get('NumNodes', 0)
+
+            w = np.empty(numnodes)
+            h = np.empty(numnodes)
+            terminal = np.empty(numnodes, dtype=bool)
+            names = []
+            filled = 0
+            for chunk in self._chunks(mm, 0, chunk_bytes):
+                cols = np.array(_NODES_LINE.findall(chunk), dtype=np.bytes_).reshape(-1, 4)
+                count = len(cols)
+                if filled + count > numnodes:
+                    logger.error(f"Error: number of cells in file, different from extracted data "
+                                 f"({numnodes} vs {filled + count})")
+                    exit(1)
+                names.append(cols[:, 0])
+                w[filled:filled + count] = cols[:, 1].astype(np.float64)
+                h[filled:filled + count] = cols[:, 2].astype(np.float64)
+                terminal[filled:filled + count] = np.char.startswith(cols[:, 3], b'terminal')
+                filled += count
+
+        names = np.concatenate(names) if names else np.empty(0, dtype=np.bytes_)
+        return {'names': names, 'w': w[:filled], 'h': h[:filled], 'terminal': terminal[:filled]}
+
+    def _read_pl_arrays(self, numnodes: int, chunk_bytes: int):
+        """
+        Bulk parse of the .pl file.
+        Args:
+            numnodes (int): Expected number of cells, used to preallocate.
+        Returns:
+            dict: 'names', 'x', 'y' and 'orientation' arrays in file order.
+        """
+        with self._mapped(self.plfile) as mm:
+            x = np.empty(numnodes)
+            y = np.empty(numnodes)
+            names = []
+            orientation = []
+            filled = 0
+            for chunk in self._chunks(mm, 0, chunk_bytes):
+                cols = np.array(_PL_LINE.findall(chunk), dtype=np.bytes_).reshape(-1, 4)
+                count = len(cols)
+                if filled + count > numnodes:
+                    logger.error(f"Error: number of cells in file, different from extracted data "
+                                 f"({numnodes} vs {filled + count})")
+                    exit(1)
+                names.append(cols[:, 0])
+                x[filled:filled + count] = cols[:, 1].astype(np.float64)
+                y[filled:filled + count] = cols[:, 2].astype(np.float64)
+                orientation.append(cols[:, 3])
+                filled += count
+
+        names = np.concatenate(names) if names else np.empty(0, dtype=np.bytes_)
+        orientation = np.concatenate(orientation) if orientation else np.empty(0, dtype=np.bytes_)
+        return {'names': names, 'x': x[:filled], 'y': y[:filled], 'orientation': orientation}
+
+    def _read_nets_arrays(self, names, chunk_bytes: int):
+        """
+        Bulk parse of the .nets file.
+        Args:
+            names (np.ndarray): Cell names (bytes) in cell index order.
+        Returns:
+            tuple: (degrees, pins, dx, dy) arrays, the NetDegree of each net, the cell index of
+                every pin and its offset from the cell center (NaN where the file has none).
+        """
+        with self._mapped(self.netsfile) as mm:
+            data_start = mm.find(b'NetDegree')
+            if data_start < 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+            data_start = mm.rfind(b'\n', 0, data_start) + 1
+            headers = self._headers(mm, data_start)
+
+            degrees = [np.empty(headers['NumNets'], dtype=np.int64)] if 'NumNets' in headers else []
+            pins = [np.empty(headers['NumPins'], dtype=np.int64)] if 'NumPins' in headers else []
+            dx = [np.empty(headers['NumPins'])] if 'NumPins' in headers else []
+            dy = [np.empty(headers['NumPins'])] if 'NumPins' in headers else []
+            by_name = np.argsort(names)
+            sorted_names = names[by_name]
+            net_filled = pin_filled = 0
+            for chunk in self._chunks(mm, data_start, chunk_bytes):
+                chunk_degrees, chunk_pins, chunk_dx, chunk_dy = self._net_chunk(chunk, sorted_names, by_name)
+                net_filled = self._fill(degrees, net_filled, chunk_degrees)
+                self._fill(dx, pin_filled, chunk_dx)
+                self._fill(dy, pin_filled, chunk_dy)
+                pin_filled = self._fill(pins, pin_filled, chunk_pins)
+
+        degrees = self._joined(degrees, net_filled)
+        pins = self._joined(pins, pin_filled)
+        dx = self._joined(dx, pin_filled).astype(np.float64, copy=False)
+        dy = self._joined(dy, pin_filled).astype(np.float64, copy=False)
+        if degrees.sum() != len(pins):
+            logger.error(f"Error: number of pins in file, different from NetDegree headers "
+                         f"({degrees.sum()} vs {len(pins)})")
+            exit(1)
+        return degrees, pins, dx, dy
+
+    @staticmethod
+    def _net_chunk(chunk, sorted_names, by_name):
+        """
+        Tokenize one window of the .nets file.
+        Pin cell names are resolved to indices with a binary search over the sorted cell names;
+        pin directions are skipped.
+        Args:
+            chunk: Window of the mapped file.
+            sorted_names (np.ndarray): Cell names (bytes), sorted.
+            by_name (np.ndarray): Cell index of each sorted name.
+        Returns:
+            tuple: (degrees, pins, dx, dy) arrays of the window; dx, dy are the pin offsets
+                from the cell center, NaN for pins without one.
+        """
+        degrees = np.array(_NET_DEGREE.findall(chunk), dtype=np.bytes_).astype(np.int64)
+        # Windows without offsets take the cheaper name-only tokenizer
+        if _PIN_OFFSET.search(chunk) is None:
+            cols = np.array(_NET_PIN.findall(chunk), dtype=np.bytes_).reshape(-1, 1)
+        else:
+            cols = np.array(_NET_PIN_OFFSET.findall(chunk), dtype=np.bytes_).reshape(-1, 3)
+        pin_names = cols[:, 0]
+        pos = np.searchsorted(sorted_names, pin_names).clip(0, max(len(sorted_names) - 1, 0))
+        unknown = sorted_names[pos] != pin_names
+        if unknown.any():
+            logger.error(f"Error: net pin on unknown cell {pin_names[unknown][0].decode()}")
+            exit(1)
+
+        dx = np.full(len(cols), np.nan)
+        dy = np.full(len(cols), np.nan)
+        has_offset = cols[:, 1] != b'' if cols.shape[1] > 1 else np.zeros(len(cols), dtype=bool)
+        if has_offset.any():
+            dx[has_offset] = cols[has_offset, 1].astype(np.float64)
+            dy[has_offset] = cols[has_offset, 2].astype(np.float64)
+        return degrees, by_name[pos], dx, dy
+
+    @staticmethod
+    def _joined(parts: list, filled: int):
+        """
+        Join the parts built by _fill() into one array of the stored values.
+        """
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        if len(parts) == 1:
+            return parts[0][:filled]
+        return np.concatenate(parts)
+
+    @staticmethod
+    def _fill(parts: list, filled: int, values):
+        """
+        Copy values into a preallocated array, appending an overflow part if it is too small.
+        Args:
+            parts (list): [preallocated array, overflow arrays...].
+            filled (int): Number of values already stored.
+            values (np.ndarray): Values to store.
+        Returns:
+            int: New number of stored values.
+        """
+        if parts and filled + len(values) <= len(parts[0]):
+            parts[0][filled:filled + len(values)] = values
+        elif parts and filled < len(parts[0]):
+            fit = len(parts[0]) - filled
+            parts[0][filled:] = values[:fit]
+            parts.append(values[fit:])
+        else:
+            parts.append(values)
+        return filled + len(values)
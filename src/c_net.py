@@ -1,20 +1,35 @@
 
 
+from array import array
+
+from c_design_arrays import DesignArrays
+
+
 class Net:
     """
     Represents a net (interconnection) in a VLSI design.
     Stores connected cells and calculates HPWL and related metrics.
+    Nets are created by their Benchmark (see Benchmark.new_net), which allocates
+    their IDs; connected cells are kept as cell IDs into that Benchmark.
     """
-    counter = -1
-    def __init__(self):
+    __slots__ = ('id', 'design', 'name', 'cell_ids', 'pin_ids', 'pin_offsets', 'netdegree', 'lx', 'ly', 'rx', 'hy',
+                 'hpwl')
+
+    def __init__(self, design=None, id: int = None):
         """
         Initialize a Net object with default attributes.
+        Args:
+            design (Benchmark): Benchmark the net belongs to.
+            id (int): Net ID, dense within the benchmark.
         """
-        Net.counter += 1
-        self.id = Net.counter
+        self.id = id
+        self.design = design
 
         self.name = None
-        self.cells = {}
+        self.cell_ids = ()
+        # When the netlist gives pin offsets: the cell ID of every pin and a flat dx, dy array
+        self.pin_ids = None
+        self.pin_offsets = None
         self.netdegree = None
         self.lx = None
         self.ly = None
@@ -22,15 +37,62 @@ class Net:
         self.hy = None
         self.hpwl = 0.0
 
+    @property
+    def cells(self):
+        """
+        Returns:
+            dict: Cell name -> Cell of the distinct cells connected by the net.
+        """
+        cells = self.design.cells_by_id
+        return {cells[i].name: cells[i] for i in self.cell_ids}
+
+    @property
+    def pins(self):
+        """
+        Returns:
+            list: (cell ID, dx, dy) of every pin, dx, dy its offset from the cell center
+                (NaN where none), or None if the netlist gives no pin offsets.
+        """
+        if self.pin_ids is None:
+            return None
+        offsets = self.pin_offsets
+        return [(i, offsets[2 * k], offsets[2 * k + 1]) for k, i in enumerate(self.pin_ids)]
+
+    def pin_bounds(self):
+        """
+        Bounding box of the net's pins. A pin with an offset is the point at its cell's
+        center plus the offset, turned by the cell's orientation; a pin without one (or any
+        pin of a net without offsets) spans its whole cell.
+        Returns:
+            tuple: (lx, rx, ly, hy) of the net.
+        """
+        cells = self.design.cells_by_id
+        if self.pin_ids is None:
+            members = [cells[i] for i in self.cell_ids]
+            return (min(cell.lx for cell in members), max(cell.rx for cell in members),
+                    min(cell.ly for cell in members), max(cell.hy for cell in members))
+
+        lx = ly = float('inf')
+        rx = hy = float('-inf')
+        for i, dx, dy in self.pins:
+            cell = cells[i]
+            if dx != dx:  # NaN: no offset
+                lx, rx = min(lx, cell.lx), max(rx, cell.rx)
+                ly, hy = min(ly, cell.ly), max(hy, cell.hy)
+            else:
+                a, b, c, d = DesignArrays.ORIENTATIONS.get(cell.orientation, DesignArrays.ORIENTATIONS['N'])
+                x = cell.lx + 0.5 * cell.w + (a * dx + b * dy)
+                y = cell.ly + 0.5 * cell.h + (c * dx + d * dy)
+                lx, rx = min(lx, x), max(rx, x)
+                ly, hy = min(ly, y), max(hy, y)
+        return lx, rx, ly, hy
+
     def calculate_hpwl(self):
         """
         Calculate and set the Half-Perimeter Wire Length (HPWL) for the net.
         Updates bounding box coordinates.
         """
-        self.lx = min(cell.lx for cell in self.cells.values())
-        self.rx = max(cell.rx for cell in self.cells.values())
-        self.ly = min(cell.ly for cell in self.cells.values())
-        self.hy = max(cell.hy for cell in self.cells.values())
+        self.lx, self.rx, self.ly, self.hy = self.pin_bounds()
 
         self.hpwl = (self.rx - self.lx) + (self.hy - self.ly)
 
@@ -41,26 +103,26 @@ class Net:
             float: Calculated HPWL value.
         """
         # Same as calculate_hpwl() but does not change the value of attribute
-        lx = min(cell.lx for cell in self.cells.values())
-        rx = max(cell.rx for cell in self.cells.values())
-        ly = min(cell.ly for cell in self.cells.values())
-        hy = max(cell.hy for cell in self.cells.values())
+        lx, rx, ly, hy = self.pin_bounds()
 
         return (rx - lx) + (hy - ly)
 
-    def generate_net(self, name: str, cells_file: list, cells_bench: dict):
+    def generate_net(self, name: str, cells_file: list, cells_bench: dict, offsets: list = None):
         """
-        Populate the net's attributes and connect it to cell objects.
+        Populate the net's attributes from its cells; the cells' net IDs are set by the
+        Benchmark once all nets exist (see Benchmark.link_cell_nets).
         Args:
             name (str): Net name.
-            cells_file (list): List of cell names connected by the net.
+            cells_file (list): List of cell names connected by the net, one entry per pin.
             cells_bench (dict): Dictionary of cell objects.
+            offsets (list): (dx, dy) offset from the cell center of each pin (NaN where none).
         """
         self.name = name
-        for cname in cells_file:
-            self.cells[cname] = cells_bench[cname]
-            # Also update the corresponding cell's net dict
-            cells_bench[cname].nets[self.name] = self
+        ids = [cells_bench[cname].id for cname in cells_file]
+        self.cell_ids = tuple(dict.fromkeys(ids))
+        if offsets is not None:
+            self.pin_ids = tuple(ids)
+            self.pin_offsets = array('d', (value for offset in offsets for value in offset))
 
         self.calculate_hpwl()
-        self.netdegree = len(self.cells.keys())
+        self.netdegree = len(self.cell_ids)
@@ -1,7 +1,14 @@
+import numpy as np
 from matplotlib import pyplot as plt
 from matplotlib import patches
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
 
 from c_benchmark import Benchmark
+from c_design_arrays import DesignArrays
+from parallel_funcs import corner_blocks
 
 class Plotter:
     """
@@ -14,27 +21,107 @@ class Plotter:
         pass
 
     @staticmethod
-    def plot_design(benchmark: Benchmark):
+    def rectangles(lx, ly, w, h):
         """
-        Plot the design layout, including pins, cells, rows, and die area.
+        Vertices of many axis-aligned rectangles, for a PolyCollection.
+        Args:
+            lx, ly, w, h (np.ndarray): Lower-left corners and dimensions.
+        Returns:
+            np.ndarray: (n, 4, 2) array of corner coordinates.
+        """
+        rx, hy = lx + w, ly + h
+        return np.stack((np.stack((lx, ly), axis=-1), np.stack((rx, ly), axis=-1),
+                         np.stack((rx, hy), axis=-1), np.stack((lx, hy), axis=-1)), axis=1)
+
+    @staticmethod
+    def rasterize(lx, ly, w, h, extent, pixels: int):
+        """
+        Count how many rectangles cover each pixel of a raster over the given extent.
+        Args:
+            lx, ly, w, h (np.ndarray): Lower-left corners and dimensions.
+            extent (tuple): (lx, rx, ly, hy) area to rasterize.
+            pixels (int): Pixels along the longer side.
+        Returns:
+            tuple: (y pixels, x pixels) coverage image and its (lx, rx, ly, hy) image extent.
+        """
+        min_x, max_x, min_y, max_y = extent
+        pixel = max(max_x - min_x, max_y - min_y) / pixels
+        x_pixels, y_pixels = int((max_x - min_x) / pixel) + 1, int((max_y - min_y) / pixel) + 1
+        # One difference array of the raster's size; pixel indices truncate like RoutingGrid.col_of
+        blocks = corner_blocks(x_pixels, y_pixels, np.trunc((lx - min_x) / pixel), np.trunc((lx + w - min_x) / pixel),
+                               np.trunc((ly - min_y) / pixel), np.trunc((ly + h - min_y) / pixel), 1, np.float32)
+        corners = np.concatenate([block[0] for block in blocks])
+        signed = np.concatenate([block[1] for block in blocks])
+        occupancy = np.bincount(corners, weights=signed, minlength=(x_pixels + 1) * (y_pixels + 1))
+        occupancy = occupancy.reshape(x_pixels + 1, y_pixels + 1).astype(np.float32)
+        np.cumsum(occupancy, axis=0, out=occupancy)
+        np.cumsum(occupancy, axis=1, out=occupancy)
+        return occupancy[:-1, :-1].T, (min_x, min_x + x_pixels * pixel, min_y, min_y + y_pixels * pixel)
+
+    @staticmethod
+    def plot_design(benchmark: Benchmark, output: str = None, congestion_map=None, max_polygons=200000,
+                    raster_pixels=2048, dpi=150):
+        """
+        Plot the design layout, including pins, cells, macros, rows, and die area.
+        Each object class is drawn as a single collection; when there are more than
+        max_polygons cells they are rasterized into an occupancy image instead.
         Args:
             benchmark (Benchmark): The benchmark object containing design data.
+            output (str): Save the figure to this file (format from the extension) instead of showing it.
+            congestion_map (CongestionMap): Optional congestion map overlaid on the layout.
+            max_polygons (int): Largest number of cells drawn as individual rectangles.
+            raster_pixels (int): Raster resolution along the longer side of the layout.
+            dpi (int): Resolution of the saved figure.
         """
-        fig = plt.figure()
+        arrays = benchmark.get_arrays()
+        if output is None:
+            fig = plt.figure()
+        else:
+            fig = Figure(figsize=(10, 10), dpi=dpi)
+            FigureCanvasAgg(fig)
         ax = fig.add_subplot(111, aspect='equal', adjustable='datalim')
-        for p in benchmark.pins.values():
-            ax.add_patch(patches.Rectangle((float(p.lx), float(p.ly)), 1.0, 1.0, fill=True))
-            ax.plot()
-        for cell in benchmark.cells.values():
-            ax.add_patch(patches.Rectangle((float(cell.lx), float(cell.ly)), cell.w, cell.h, fill=True,
-                                           color="black"))
-            ax.plot()
-        for row in benchmark.rows:
-            ax.add_patch(
-                patches.Rectangle((float(row.lx), float(row.ly)), row.rx - row.lx,
-                                  row.h, fill=None, color="black"))
-            ax.plot()
+
+        pin = (arrays.flags & DesignArrays.PIN) != 0
+        macro = (arrays.flags & DesignArrays.MACRO) != 0
+        cell = ~(pin | macro)
+
+        # Pins are drawn as 1x1 markers at their location
+        ones = np.ones(np.count_nonzero(pin))
+        ax.add_collection(PolyCollection(Plotter.rectangles(arrays.lx[pin], arrays.ly[pin], ones, ones),
+                                         facecolors='tab:blue', edgecolors='none', rasterized=True))
+
+        cell_boxes = arrays.lx[cell], arrays.ly[cell], arrays.w[cell], arrays.h[cell]
+        if np.count_nonzero(cell) <= max_polygons:
+            ax.add_collection(PolyCollection(Plotter.rectangles(*cell_boxes), facecolors='black',
+                                             edgecolors='none', rasterized=True))
+        else:
+            occupancy, extent = Plotter.rasterize(*cell_boxes, (benchmark.lx, benchmark.rx, benchmark.ly, benchmark.hy),
+                                                  raster_pixels)
+            ax.imshow(np.ma.masked_equal(occupancy, 0), cmap='Greys', vmin=0, vmax=max(occupancy.max(), 1),
+                      origin='lower', interpolation='nearest', extent=extent)
+
+        ax.add_collection(PolyCollection(Plotter.rectangles(arrays.lx[macro], arrays.ly[macro],
+                                                            arrays.w[macro], arrays.h[macro]),
+                                         facecolors='0.6', edgecolors='black', linewidths=0.5))
+
+        ly, h, spacing, lx, numsites = arrays.rows.T
+        ax.add_collection(PolyCollection(Plotter.rectangles(lx, ly, numsites * spacing, h), facecolors='none',
+                                         edgecolors='black', linewidths=0.2))
         ax.add_patch(
             patches.Rectangle((benchmark.lx, benchmark.ly), benchmark.w, benchmark.h, fill=False))
-        ax.plot()
-        plt.show()
\ No newline at end of file
+
+        if congestion_map is not None:
+            grid_size = congestion_map['grid_size']
+            min_x, min_y = congestion_map['min_x'], congestion_map['min_y']
+            cmap = LinearSegmentedColormap.from_list('congestion', ['green', 'yellow', 'red'])
+            image = ax.imshow(congestion_map['congestion'].T, cmap=cmap, vmin=0, vmax=1, alpha=0.5,
+                              origin='lower', interpolation='nearest', zorder=3,
+                              extent=(min_x, min_x + congestion_map['x_bins'] * grid_size,
+                                      min_y, min_y + congestion_map['y_bins'] * grid_size))
+            fig.colorbar(image, ax=ax, label='Congestion Level')
+
+        ax.autoscale_view()
+        if output is None:
+            plt.show()
+        else:
+            fig.savefig(output)
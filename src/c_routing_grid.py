@@ -0,0 +1,593 @@
+import tempfile
+
+import numpy as np
+
+from parallel_funcs import corner_blocks, parallel_box_sum, parallel_point_sum
+
+
+class RoutingGrid:
+    """
+    Array-backed routing grid over the die area.
+    Stores one contiguous float array per demand channel, indexed as [col, row].
+    Also behaves like the legacy grid dict, so code that still reads
+    grid['x_bins'] or grid['cells'][col][row]['pin_density'] keeps working.
+    Out of core, the channels are memory-mapped scratch files and whole-grid operations
+    run over column tiles sized to a memory budget.
+    """
+    CHANNELS = ('pin_density', 'net_demand_standard', 'net_demand_weighted', 'rent_demand', 'span_demand')
+    META_KEYS = ('x_bins', 'y_bins', 'grid_size', 'min_x', 'min_y')
+
+    # Working arrays per tile bin of the tiled operations (difference array, its bincount, the update)
+    TILE_ARRAYS = 3
+
+    def __init__(self, x_bins: int, y_bins: int, grid_size, min_x, min_y, dtype=np.float64, scratch_dir=None,
+                 memory_budget=256 << 20):
+        """
+        Initialize the RoutingGrid with zeroed demand channels.
+        Args:
+            x_bins (int): Number of grid columns.
+            y_bins (int): Number of grid rows.
+            grid_size: Size of each grid cell in microns.
+            min_x: X coordinate of the grid origin.
+            min_y: Y coordinate of the grid origin.
+            dtype: Floating point type of the demand channels.
+            scratch_dir (str): Keep the channels in memory-mapped files in this directory
+                (out-of-core mode) instead of in RAM.
+            memory_budget (int): Bytes of working memory per tiled operation in out-of-core mode.
+        """
+        self.x_bins = x_bins
+        self.y_bins = y_bins
+        self.grid_size = grid_size
+        self.min_x = min_x
+        self.min_y = min_y
+        self.scratch_dir = scratch_dir
+        self.memory_budget = memory_budget
+
+        # Columns per tile: the whole grid in RAM, else as many as the budget allows
+        if scratch_dir is None:
+            self.tile_cols = max(x_bins, 1)
+        else:
+            column_bytes = self.TILE_ARRAYS * (y_bins + 1) * np.dtype(np.float64).itemsize
+            self.tile_cols = int(min(max(memory_budget // column_bytes, 1), max(x_bins, 1)))
+
+        # One block, one contiguous (x_bins, y_bins) slab per channel
+        self.data = self.new_array((len(self.CHANNELS), x_bins, y_bins), dtype)
+        self.channels = {name: self.data[i] for i, name in enumerate(self.CHANNELS)}
+
+    @property
+    def out_of_core(self):
+        return self.scratch_dir is not None
+
+    def new_array(self, shape, dtype=None):
+        """
+        Zeroed array for grid-sized data: in RAM, or out of core a memory-mapped anonymous
+        scratch file, which the OS pages in and out and deletes once no longer referenced.
+        Args:
+            shape (tuple): Array shape.
+            dtype: Array dtype, the grid's by default.
+        Returns:
+            np.ndarray: The array (np.memmap out of core).
+        """
+        dtype = np.dtype(dtype or self.data.dtype)
+        if self.scratch_dir is None or not int(np.prod(shape)):
+            return np.zeros(shape, dtype=dtype)
+        with tempfile.TemporaryFile(dir=self.scratch_dir) as file:
+            file.truncate(int(np.prod(shape)) * dtype.itemsize)
+            return np.memmap(file, dtype=dtype, mode='r+', shape=shape)
+
+    def tiles(self, columns: int = None):
+        """
+        Column slices covering the grid; a single slice unless the grid is out of core.
+        Args:
+            columns (int): Columns per tile, the budgeted tile_cols by default.
+        Returns:
+            list: Slices over the column axis.
+        """
+        step = columns or self.tile_cols
+        return [slice(start, min(start + step, self.x_bins)) for start in range(0, self.x_bins, step)]
+
+    @property
+    def shape(self):
+        """
+        Returns:
+            tuple: Grid shape as (x_bins, y_bins).
+        """
+        return self.x_bins, self.y_bins
+
+    def __getitem__(self, key):
+        """
+        Dict-style access to grid metadata, channel arrays and the legacy cell view.
+        Args:
+            key (str): 'cells', a metadata key or a channel name.
+        Returns:
+            The legacy cell view, the metadata value or the channel array.
+        """
+        if key == 'cells':
+            return GridCellsView(self.channels, self.x_bins, self.y_bins)
+        if key in self.META_KEYS:
+            return getattr(self, key)
+        if key in self.channels:
+            return self.channels[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key == 'cells' or key in self.META_KEYS or key in self.channels
+
+    def keys(self):
+        """
+        Returns:
+            list: Metadata keys, 'cells' and channel names.
+        """
+        return list(self.META_KEYS) + ['cells'] + list(self.channels.keys())
+
+    def add_channel(self, name: str, values=None):
+        """
+        Add an extra (x_bins, y_bins) channel to the grid.
+        Args:
+            name (str): Channel name.
+            values (np.ndarray): Initial values, zeros if omitted.
+        Returns:
+            np.ndarray: The stored channel array.
+        """
+        if values is None:
+            values = self.new_array(self.shape)
+        elif not isinstance(values, np.memmap):
+            values = np.ascontiguousarray(values, dtype=self.data.dtype)
+        if values.shape != self.shape:
+            raise ValueError(f"Channel {name} has shape {values.shape}, expected {self.shape}")
+        self.channels[name] = values
+        return values
+
+    def copy(self):
+        """
+        Create a deep copy of the grid, including any extra channels.
+        Returns:
+            RoutingGrid: The copied grid.
+        """
+        grid = RoutingGrid(self.x_bins, self.y_bins, self.grid_size, self.min_x, self.min_y, self.data.dtype,
+                           self.scratch_dir, self.memory_budget)
+        for tile in self.tiles():
+            grid.data[:, tile] = self.data[:, tile]
+        for name, values in self.channels.items():
+            if name not in self.CHANNELS:
+                grid.add_channel(name)[...] = values
+        return grid
+
+    def pooled(self, factor: int):
+        """
+        Coarser grid whose bins hold the sums of factor x factor blocks of this grid's bins.
+        Blocks cut off by the top and right edges sum only the bins they contain, so the
+        coarse grid has ceil(bins / factor) bins per axis, as a direct build at
+        grid_size * factor would. Extra channels are not pooled.
+        Args:
+            factor (int): Number of bins per block side.
+        Returns:
+            RoutingGrid: The pooled grid.
+        """
+        x_bins, y_bins = -(-self.x_bins // factor), -(-self.y_bins // factor)
+        grid = RoutingGrid(x_bins, y_bins, self.grid_size * factor, self.min_x, self.min_y, self.data.dtype,
+                           self.scratch_dir, self.memory_budget)
+        # Tiles of whole blocks, so each coarse bin is summed from one tile as in a single pass
+        columns = max(self.tile_cols // factor, 1) * factor
+        for tile in self.tiles(columns):
+            pooled = np.add.reduceat(self.data[:, tile], np.arange(0, tile.stop - tile.start, factor), axis=1)
+            grid.data[:, tile.start // factor:-(-tile.stop // factor)] = np.add.reduceat(
+                pooled, np.arange(0, self.y_bins, factor), axis=2)
+        return grid
+
+    def col_of(self, x):
+        """
+        Grid column of an x coordinate (truncated, not clipped).
+        Args:
+            x: Scalar or array of x coordinates.
+        Returns:
+            Column index or array of column indices.
+        """
+        if np.isscalar(x):
+            return int((x - self.min_x) / self.grid_size)
+        return np.trunc((np.asarray(x) - self.min_x) / self.grid_size).astype(np.int64)
+
+    def row_of(self, y):
+        """
+        Grid row of a y coordinate (truncated, not clipped).
+        Args:
+            y: Scalar or array of y coordinates.
+        Returns:
+            Row index or array of row indices.
+        """
+        if np.isscalar(y):
+            return int((y - self.min_y) / self.grid_size)
+        return np.trunc((np.asarray(y) - self.min_y) / self.grid_size).astype(np.int64)
+
+    def box(self, min_col: int, max_col: int, min_row: int, max_row: int):
+        """
+        Index expression for an inclusive bin range, clipped to the grid.
+        Args:
+            min_col (int): First column.
+            max_col (int): Last column (inclusive).
+            min_row (int): First row.
+            max_row (int): Last row (inclusive).
+        Returns:
+            tuple: Pair of slices usable on any channel array.
+        """
+        min_col, min_row = max(min_col, 0), max(min_row, 0)
+        return (slice(min_col, max(min(max_col, self.x_bins - 1) + 1, min_col)),
+                slice(min_row, max(min(max_row, self.y_bins - 1) + 1, min_row)))
+
+    def accumulate_boxes(self, channel: str, min_col, max_col, min_row, max_row, weights, executor=None, workers=1):
+        """
+        Add a weight to every bin of many inclusive bin ranges at once.
+        Scatters four corner updates per box into a 2D difference array and
+        integrates it with one cumulative sum per axis, so the cost is
+        O(boxes + bins) regardless of box size. Ranges are clipped like box().
+        Args:
+            channel (str): Channel to update.
+            min_col, max_col, min_row, max_row (np.ndarray): Inclusive bin ranges per box.
+            weights (np.ndarray): Weight added to each bin of each box.
+            executor (Executor): Process pool for the tile-parallel path (see parallel_funcs).
+            workers (int): Number of workers of the executor.
+        """
+        if self.out_of_core:
+            self._tiled_box_sum(channel, *self.box_corners(min_col, max_col, min_row, max_row, weights))
+            return
+        if executor is None:
+            self.channels[channel] += self.box_sum(min_col, max_col, min_row, max_row, weights)
+            return
+
+        parallel_box_sum(executor, workers, (min_col, max_col, min_row, max_row, weights), self.channels[channel])
+
+    def accumulate_points(self, channel: str, col, row, weights, executor=None, workers=1):
+        """
+        Add weights at single bins; points outside the grid are skipped.
+        Args:
+            channel (str): Channel to update.
+            col, row (np.ndarray): Bin of each point.
+            weights (np.ndarray): Weight of each point.
+            executor (Executor): Process pool for the tile-parallel path (see parallel_funcs).
+            workers (int): Number of workers of the executor.
+        """
+        inside = (0 <= col) & (col < self.x_bins) & (0 <= row) & (row < self.y_bins)
+        bins = col[inside] * self.y_bins + row[inside]
+        weights = np.asarray(weights, dtype=np.float64)[inside]
+        if self.out_of_core:
+            self._tiled_point_sum(channel, bins, weights)
+            return
+        if executor is None:
+            self.channels[channel] += np.bincount(bins, weights=weights,
+                                                  minlength=self.x_bins * self.y_bins).reshape(self.shape)
+            return
+
+        parallel_point_sum(executor, workers, bins, weights, self.channels[channel])
+
+    def box_area(self, min_col, max_col, min_row, max_row):
+        """
+        Number of grid bins in each inclusive bin range, clipped like box().
+        Args:
+            min_col, max_col, min_row, max_row (np.ndarray): Inclusive bin ranges per box.
+        Returns:
+            np.ndarray: Bins covered by each box.
+        """
+        cols = np.minimum(max_col, self.x_bins - 1) - np.maximum(min_col, 0) + 1
+        rows = np.minimum(max_row, self.y_bins - 1) - np.maximum(min_row, 0) + 1
+        return cols.clip(0) * rows.clip(0)
+
+    def add_boxes(self, channel: str, min_col, max_col, min_row, max_row, weights):
+        """
+        Add a weight to every bin of a few inclusive bin ranges, one slice update per box.
+        Costs only the area of the boxes, while accumulate_boxes always integrates the
+        whole grid, so this is the cheaper choice for small incremental updates; boxes
+        covering more bins than the grid holds fall back to accumulate_boxes.
+        Args:
+            channel (str): Channel to update.
+            min_col, max_col, min_row, max_row (np.ndarray): Inclusive bin ranges per box.
+            weights (np.ndarray): Weight added to each bin of each box.
+        """
+        if self.box_area(min_col, max_col, min_row, max_row).sum() > self.x_bins * self.y_bins:
+            self.accumulate_boxes(channel, min_col, max_col, min_row, max_row, weights)
+            return
+
+        values = self.channels[channel]
+        weights = np.broadcast_to(weights, np.shape(min_col))
+        for c0, c1, r0, r1, weight in zip(np.asarray(min_col).tolist(), np.asarray(max_col).tolist(),
+                                          np.asarray(min_row).tolist(), np.asarray(max_row).tolist(),
+                                          weights.tolist()):
+            values[self.box(c0, c1, r0, r1)] += weight
+
+    def overlap_boxes(self, lx, ux, ly, uy, weights):
+        """
+        Exact overlap areas of rectangles with the bins, as constant-weight bin ranges.
+        The overlap is separable, ox(col) * oy(row), and each profile is a full bin pitch
+        over the rectangle's columns (rows) minus the uncovered margins of the first and
+        last one, so the product expands into nine bin ranges per rectangle: the whole
+        range, four edge strips and four corner bins, which accumulate_boxes adds at once.
+        Parts outside the grid are dropped; a zero width or height counts as one bin pitch.
+        Args:
+            lx, ux, ly, uy (np.ndarray): Rectangle extents.
+            weights (np.ndarray): Weight per unit of overlap area of each rectangle.
+        Returns:
+            tuple: (min_col, max_col, min_row, max_row, weights) of the bin ranges, whose sum
+                at each bin is the overlap area times the rectangle weight.
+        """
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), np.shape(lx))
+        c0, c1, a0, a1, x_inside = self._overlap_profile(lx, ux, self.min_x, self.x_bins)
+        r0, r1, b0, b1, y_inside = self._overlap_profile(ly, uy, self.min_y, self.y_bins)
+        inside = x_inside & y_inside
+        if not inside.all():
+            c0, c1, a0, a1, r0, r1, b0, b1, weights = (v[inside] for v in (c0, c1, a0, a1, r0, r1, b0, b1, weights))
+
+        g = self.grid_size
+        min_col = np.concatenate((c0, c0, c0, c0, c1, c0, c0, c1, c1))
+        max_col = np.concatenate((c1, c1, c1, c0, c1, c0, c0, c1, c1))
+        min_row = np.concatenate((r0, r0, r1, r0, r0, r0, r1, r0, r1))
+        max_row = np.concatenate((r1, r0, r1, r1, r1, r0, r1, r0, r1))
+        weights = np.concatenate((g * g * weights, -g * b0 * weights, -g * b1 * weights, -g * a0 * weights,
+                                  -g * a1 * weights, a0 * b0 * weights, a0 * b1 * weights, a1 * b0 * weights,
+                                  a1 * b1 * weights))
+        return min_col, max_col, min_row, max_row, weights
+
+    def _overlap_profile(self, lo, hi, origin, bins: int):
+        """
+        One axis of overlap_boxes: first and last bin of each interval clipped to the grid,
+        the uncovered margins of these two bins, and whether the interval meets the grid.
+        """
+        g = self.grid_size
+        lo, hi = np.asarray(lo, dtype=np.float64), np.asarray(hi, dtype=np.float64)
+        end = origin + bins * g
+        inside = (hi >= origin) & (lo <= end)
+        line = hi <= lo
+        lo, hi = np.clip(lo, origin, end), np.clip(hi, origin, end)
+        first = np.floor((lo - origin) / g).astype(np.int64)
+        last = np.floor((hi - origin) / g).astype(np.int64)
+        head = lo - (origin + first * g)
+        tail = (origin + (last + 1) * g) - hi
+        # A zero-length interval covers its whole bin
+        last[line] = first[line]
+        head[line] = 0
+        tail[line] = 0
+        return first, last, head, tail, inside
+
+    def accumulate_overlap(self, channel: str, lx, ux, ly, uy, weights, executor=None, workers=1):
+        """
+        Add each rectangle's weight times its exact overlap area with every bin (see overlap_boxes).
+        Args:
+            channel (str): Channel to update.
+            lx, ux, ly, uy (np.ndarray): Rectangle extents.
+            weights (np.ndarray): Weight per unit of overlap area of each rectangle.
+            executor (Executor): Process pool for the tile-parallel path (see parallel_funcs).
+            workers (int): Number of workers of the executor.
+        """
+        self.accumulate_boxes(channel, *self.overlap_boxes(lx, ux, ly, uy, weights), executor=executor,
+                              workers=workers)
+
+    def box_corners(self, min_col, max_col, min_row, max_row, weights):
+        """
+        Difference-array updates of many inclusive bin ranges, clipped like box().
+        Args:
+            min_col, max_col, min_row, max_row (np.ndarray): Inclusive bin ranges per box.
+            weights (np.ndarray): Weight of each box.
+        Returns:
+            tuple: (corners, signed) - flat indices into the (x_bins + 1, y_bins + 1)
+                difference array and the signed weight added at each.
+        """
+        blocks = corner_blocks(self.x_bins, self.y_bins, min_col, max_col, min_row, max_row, weights, self.data.dtype)
+        corners = np.concatenate([block[0] for block in blocks])
+        signed = np.concatenate([block[1] for block in blocks])
+        return corners, signed
+
+    def box_sum(self, min_col, max_col, min_row, max_row, weights):
+        """
+        Sum of constant-weight boxes over the grid, computed with a difference array.
+        Args:
+            min_col, max_col, min_row, max_row (np.ndarray): Inclusive bin ranges per box.
+            weights (np.ndarray): Weight of each box.
+        Returns:
+            np.ndarray: (x_bins, y_bins) array of accumulated weights.
+        """
+        corners, signed = self.box_corners(min_col, max_col, min_row, max_row, weights)
+        stride = self.y_bins + 1
+        diff = np.bincount(corners, weights=signed, minlength=(self.x_bins + 1) * stride)
+        diff = diff.reshape(self.x_bins + 1, stride).astype(self.data.dtype, copy=False)
+
+        np.cumsum(diff, axis=0, out=diff)
+        np.cumsum(diff, axis=1, out=diff)
+        return diff[:-1, :-1]
+
+    def _bucket(self, flat, weights, stride: int):
+        """
+        Group flat indices into a (columns, stride) array by column tile, keeping their
+        order within each tile, so per-tile bincounts add in the same order as one global pass.
+        Returns:
+            tuple: Sorted indices, their weights, and the bounds of each tile's run.
+        """
+        order = np.argsort(flat // stride, kind='stable')
+        flat, weights = flat[order], weights[order]
+        starts = [tile.start * stride for tile in self.tiles()] + [self.x_bins * stride]
+        return flat, weights, np.searchsorted(flat, starts)
+
+    def _tiled_box_sum(self, channel: str, corners, signed):
+        """
+        Out-of-core box_sum added into a channel, one column tile at a time: each tile
+        bincounts only its own corners, and the running x-cumsum is carried from tile to
+        tile, so the result is bit-for-bit the one of the in-memory path.
+        """
+        stride = self.y_bins + 1
+        corners, signed, bounds = self._bucket(corners, signed, stride)
+        values = self.channels[channel]
+        carry = np.zeros(stride, dtype=self.data.dtype)
+        for tile, lo, hi in zip(self.tiles(), bounds[:-1], bounds[1:]):
+            width = tile.stop - tile.start
+            diff = np.bincount(corners[lo:hi] - tile.start * stride, weights=signed[lo:hi], minlength=width * stride)
+            diff = diff.reshape(width, stride).astype(self.data.dtype, copy=False)
+            diff[0] += carry
+            np.cumsum(diff, axis=0, out=diff)
+            carry = diff[-1].copy()
+            np.cumsum(diff, axis=1, out=diff)
+            values[tile] += diff[:, :-1]
+
+    def _tiled_point_sum(self, channel: str, bins, weights):
+        """
+        Out-of-core point bincount added into a channel, one column tile at a time.
+        """
+        bins, weights, bounds = self._bucket(bins, weights, self.y_bins)
+        values = self.channels[channel]
+        for tile, lo, hi in zip(self.tiles(), bounds[:-1], bounds[1:]):
+            width = tile.stop - tile.start
+            values[tile] += np.bincount(bins[lo:hi] - tile.start * self.y_bins, weights=weights[lo:hi],
+                                        minlength=width * self.y_bins).reshape(width, self.y_bins)
+
+
+class CongestionMap:
+    """
+    Normalized congestion of one method over a RoutingGrid.
+    Stores only its congestion array and references the grid's demand channels,
+    so the maps of all methods share one set of channels instead of copying the grid.
+    Dict-style access matches a RoutingGrid with an extra 'congestion' channel;
+    to_dict() materializes the legacy nested layout on request.
+    """
+    def __init__(self, grid: RoutingGrid, congestion):
+        """
+        Initialize the CongestionMap.
+        Args:
+            grid (RoutingGrid): Grid holding the raw demand channels.
+            congestion (np.ndarray): (x_bins, y_bins) normalized congestion.
+        """
+        self.grid = grid
+        self.congestion = congestion
+        self.channels = {**grid.channels, 'congestion': congestion}
+
+    @property
+    def x_bins(self):
+        return self.grid.x_bins
+
+    @property
+    def y_bins(self):
+        return self.grid.y_bins
+
+    @property
+    def grid_size(self):
+        return self.grid.grid_size
+
+    @property
+    def shape(self):
+        return self.grid.shape
+
+    def __getitem__(self, key):
+        """
+        Dict-style access to grid metadata, channel arrays and the legacy cell view.
+        Args:
+            key (str): 'cells', a metadata key, a channel name or 'congestion'.
+        Returns:
+            The legacy cell view, the metadata value or the channel array.
+        """
+        if key == 'cells':
+            return GridCellsView(self.channels, self.grid.x_bins, self.grid.y_bins)
+        if key in self.grid.META_KEYS:
+            return getattr(self.grid, key)
+        if key in self.channels:
+            return self.channels[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key == 'cells' or key in self.grid.META_KEYS or key in self.channels
+
+    def keys(self):
+        """
+        Returns:
+            list: Metadata keys, 'cells' and channel names.
+        """
+        return list(self.grid.META_KEYS) + ['cells'] + list(self.channels.keys())
+
+    def to_dict(self):
+        """
+        Materialize the legacy layout: metadata keys plus 'cells' as nested lists of
+        per-bin dicts holding every channel and the congestion value.
+        Returns:
+            dict: Plain dict copy of the map.
+        """
+        names = list(self.channels.keys())
+        values = np.stack([self.channels[name] for name in names], axis=-1).tolist()
+        legacy = {key: getattr(self.grid, key) for key in self.grid.META_KEYS}
+        legacy['cells'] = [[dict(zip(names, cell)) for cell in column] for column in values]
+        return legacy
+
+
+class GridCellsView:
+    """
+    Legacy [col][row] view over a set of channel arrays.
+    """
+    def __init__(self, channels: dict, x_bins: int, y_bins: int):
+        self.channels = channels
+        self.x_bins = x_bins
+        self.y_bins = y_bins
+
+    def __len__(self):
+        return self.x_bins
+
+    def __getitem__(self, col):
+        if not -self.x_bins <= col < self.x_bins:
+            raise IndexError(col)
+        return _GridColumnView(self.channels, col % self.x_bins, self.y_bins)
+
+    def __iter__(self):
+        for col in range(self.x_bins):
+            yield _GridColumnView(self.channels, col, self.y_bins)
+
+
+class _GridColumnView:
+    """
+    One grid column of a GridCellsView.
+    """
+    def __init__(self, channels: dict, col: int, y_bins: int):
+        self.channels = channels
+        self.col = col
+        self.y_bins = y_bins
+
+    def __len__(self):
+        return self.y_bins
+
+    def __getitem__(self, row):
+        if not -self.y_bins <= row < self.y_bins:
+            raise IndexError(row)
+        return GridBinView(self.channels, self.col, row % self.y_bins)
+
+    def __iter__(self):
+        for row in range(self.y_bins):
+            yield GridBinView(self.channels, self.col, row)
+
+
+class GridBinView:
+    """
+    Dict-like view of a single bin, reading and writing through to the channel arrays.
+    """
+    def __init__(self, channels: dict, col: int, row: int):
+        self.channels = channels
+        self.col = col
+        self.row = row
+
+    def __getitem__(self, key):
+        return float(self.channels[key][self.col, self.row])
+
+    def __setitem__(self, key, value):
+        self.channels[key][self.col, self.row] = value
+
+    def __contains__(self, key):
+        return key in self.channels
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def keys(self):
+        return self.channels.keys()
+
+    def items(self):
+        return [(key, self[key]) for key in self.channels]
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Plain dict copy of the bin values.
+        """
+        return dict(self.items())
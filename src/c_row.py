@@ -2,15 +2,20 @@ class Row:
     """
     Represents a row in a VLSI design, containing placement and cell information.
     Provides methods to generate row attributes and calculate density.
+    Rows are created by their Benchmark (see Benchmark.new_row), which allocates
+    their IDs; the row's cells are kept as cell IDs into that Benchmark.
     """
-    counter = -1
+    __slots__ = ('id', 'design', 'ly', 'hy', 'lx', 'rx', 'h', 'sitespacing', 'numsites', 'density', 'cell_ids')
 
-    def __init__(self):
+    def __init__(self, design=None, id: int = None):
         """
         Initialize a Row object with default attributes.
+        Args:
+            design (Benchmark): Benchmark the row belongs to.
+            id (int): Row ID, dense within the benchmark.
         """
-        Row.counter += 1
-        self.id = Row.counter
+        self.id = id
+        self.design = design
 
         self.ly = None  # corerow
         self.hy = None
@@ -21,14 +26,25 @@ class Row:
         self.numsites = None
         self.density = None
 
-        self.cells = []
+        self.cell_ids = ()
+
+    @property
+    def cells(self):
+        """
+        Returns:
+            list: Cells of the row, in ascending left x.
+        """
+        cells = self.design.cells_by_id
+        return [cells[i] for i in self.cell_ids]
 
-    def generate_row(self, fl: list, cells_list: list):
+    def generate_row(self, fl: list, cells_list: list, grouped=False):
         """
         Populate the row's attributes from parsed file data and assign cells to the row.
         Args:
             fl (list): List of row attributes (coordinates, height, spacing, etc.).
             cells_list (list): List of all cell objects in the design.
+            grouped (bool): cells_list already holds exactly this row's cells, sorted by lx
+                (see Benchmark.generate_rows).
         """
         self.ly = fl[0]
         self.h = fl[1]
@@ -39,7 +55,10 @@ class Row:
         self.hy = self.ly + self.h
         self.rx = self.lx + self.numsites * self.sitespacing
 
-        self.find_cells(cells_list)
+        if grouped:
+            self.cell_ids = tuple(cell.id for cell in cells_list)
+        else:
+            self.find_cells(cells_list)
         self.calculate_density()
 
     def find_cells(self, cells: list):
@@ -48,11 +67,10 @@ class Row:
         Args:
             cells (list): List of all cell objects in the design.
         """
-        for cell in cells:
-            if cell.ly == self.ly:
-                self.cells.append(cell)
+        row_cells = [cell for cell in cells if cell.ly == self.ly]
         # Keep them sorted in ascending left x
-        self.cells.sort(key=lambda c:c.lx)
+        row_cells.sort(key=lambda c:c.lx)
+        self.cell_ids = tuple(cell.id for cell in row_cells)
 
     def calculate_density(self):
         """
@@ -0,0 +1,106 @@
+import numpy as np
+
+from c_design_arrays import DesignArrays
+
+
+class SpatialIndex:
+    """
+    Hierarchical bin-bucketed spatial index over axis-aligned boxes (net bounding boxes,
+    cell footprints). Each level cuts the boxes' extent into square buckets twice as wide
+    as the level below, and every box is listed, in CSR form, in the buckets it overlaps
+    at the finest level where it spans at most max_buckets of them; a window query only
+    visits the buckets under the window on each level, so long nets and macros neither
+    flood the fine buckets nor get checked on every query.
+    """
+
+    def __init__(self, lx, rx, ly, hy, bucket_size: float = None, items_per_bucket=4, max_buckets=4):
+        """
+        Build the index.
+        Args:
+            lx, rx, ly, hy (np.ndarray): Box extents; boxes with a NaN extent are never returned.
+            bucket_size (float): Bucket pitch of the finest level; by default chosen so that
+                the extent holds about one bucket per items_per_bucket boxes.
+            items_per_bucket (int): Target boxes per bucket for the default bucket_size.
+            max_buckets (int): Most buckets a box may span on its level.
+        """
+        self.lx, self.rx = np.asarray(lx, dtype=np.float64), np.asarray(rx, dtype=np.float64)
+        self.ly, self.hy = np.asarray(ly, dtype=np.float64), np.asarray(hy, dtype=np.float64)
+        valid = np.flatnonzero(~(np.isnan(self.lx) | np.isnan(self.rx) | np.isnan(self.ly) | np.isnan(self.hy)))
+
+        if len(valid):
+            self.min_x, self.min_y = float(self.lx[valid].min()), float(self.ly[valid].min())
+            width = float(self.rx[valid].max()) - self.min_x
+            height = float(self.hy[valid].max()) - self.min_y
+        else:
+            self.min_x = self.min_y = 0.0
+            width = height = 0.0
+        if bucket_size is None:
+            bucket_size = np.sqrt(width * height * items_per_bucket / max(len(valid), 1))
+        bucket_size = float(bucket_size) if bucket_size > 0 else max(width, height, 1.0)
+
+        # Coarser levels until one holds every remaining box (at worst, in its single bucket)
+        self.levels = []
+        remaining = valid
+        while True:
+            level = {'size': bucket_size, 'x_buckets': int(width / bucket_size) + 1,
+                     'y_buckets': int(height / bucket_size) + 1}
+            min_col = self._bucket_of(level, self.lx[remaining], 'x')
+            max_col = self._bucket_of(level, self.rx[remaining], 'x')
+            min_row = self._bucket_of(level, self.ly[remaining], 'y')
+            max_row = self._bucket_of(level, self.hy[remaining], 'y')
+            buckets = (max_col - min_col + 1) * (max_row - min_row + 1)
+            last = level['x_buckets'] * level['y_buckets'] <= max_buckets
+            fits = np.ones(len(remaining), dtype=bool) if last else buckets <= max_buckets
+            self._fill(level, remaining[fits], min_col[fits], min_row[fits], max_row[fits], buckets[fits])
+            self.levels.append(level)
+            remaining = remaining[~fits]
+            if last or not len(remaining):
+                break
+            bucket_size *= 2
+
+    def __len__(self):
+        return len(self.lx)
+
+    def _bucket_of(self, level: dict, values, axis: str):
+        """
+        Bucket column (axis 'x') or row (axis 'y') of coordinates on one level, clipped to it.
+        """
+        origin, count = (self.min_x, level['x_buckets']) if axis == 'x' else (self.min_y, level['y_buckets'])
+        return np.clip(((np.asarray(values) - origin) // level['size']).astype(np.int64), 0, count - 1)
+
+    @staticmethod
+    def _fill(level: dict, items, min_col, min_row, max_row, buckets):
+        """
+        Expand every box into the buckets of its range on a level, then group them by bucket.
+        """
+        rows = max_row - min_row + 1
+        starts = np.zeros(len(buckets), dtype=np.int64)
+        np.cumsum(buckets[:-1], out=starts[1:])
+        offset = np.arange(int(buckets.sum()), dtype=np.int64) - np.repeat(starts, buckets)
+        rows = np.repeat(rows, buckets)
+        bucket = ((np.repeat(min_col, buckets) + offset // rows) * level['y_buckets'] +
+                  np.repeat(min_row, buckets) + offset % rows)
+        order = np.argsort(bucket, kind='stable')
+        size = level['x_buckets'] * level['y_buckets']
+        level['items'] = np.repeat(items, buckets)[order]
+        level['ptr'] = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(bucket, minlength=size), out=level['ptr'][1:])
+
+    def query(self, lx: float, rx: float, ly: float, hy: float):
+        """
+        Boxes intersecting a window (edges touching count).
+        Args:
+            lx, rx, ly, hy (float): Window extents.
+        Returns:
+            np.ndarray: Sorted indices of the boxes.
+        """
+        candidates = []
+        for level in self.levels:
+            cols = np.arange(self._bucket_of(level, lx, 'x'), self._bucket_of(level, rx, 'x') + 1, dtype=np.int64)
+            rows = np.arange(self._bucket_of(level, ly, 'y'), self._bucket_of(level, hy, 'y') + 1, dtype=np.int64)
+            buckets = (cols[:, None] * level['y_buckets'] + rows[None, :]).ravel()
+            candidates.append(DesignArrays.csr_gather(level['ptr'], level['items'], buckets)[0])
+        candidates = np.unique(np.concatenate(candidates))
+        hit = ((self.lx[candidates] <= rx) & (self.rx[candidates] >= lx) &
+               (self.ly[candidates] <= hy) & (self.hy[candidates] >= ly))
+        return candidates[hit]
@@ -1,15 +1,22 @@
 # Packages
 import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import sys
-from datetime import datetime
+import os
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.colors import LinearSegmentedColormap
-from scipy.stats import pearsonr
+from matplotlib.figure import Figure
+from scipy.stats import rankdata
 
 # Project imports
 from c_benchmark import Benchmark
+from c_routing_grid import RoutingGrid, CongestionMap
+from c_design_arrays import DesignArrays
+from c_spatial_index import SpatialIndex
+import instrument_funcs
+from instrument_funcs import instrumented
 
 
 class CongestionEstimator:
@@ -17,66 +24,376 @@ class CongestionEstimator:
     Estimates routing congestion in VLSI designs using multiple methods.
     Supports pin-density, standard net demand, fanout-weighted, Rent's Rule, and net-span approaches.
     """
-    def __init__(self, d: Benchmark, grid_size=10):
+    ACCUMULATION_MODES = ('difference', 'loop', 'stream')
+    DEMAND_MODES = ('bins', 'area')
+
+    # Congestion map -> demand channel it combines with pin density
+    METHODS = {
+        'standard': 'net_demand_standard',
+        'weighted': 'net_demand_weighted',
+        'rents': 'rent_demand',
+        'span': 'span_demand'
+    }
+
+    # Congestion map -> estimation stage whose profile is reported with it
+    STAGES = {
+        'standard': 'CongestionEstimator.estimate_net_demand_standard',
+        'weighted': 'CongestionEstimator.estimate_net_demand_weighted',
+        'rents': 'CongestionEstimator.estimate_rents_rule',
+        'span': 'CongestionEstimator.estimate_net_span'
+    }
+
+    # Rent's Rule parameters
+    RENT_K = 0.5  # Average interconnects per cell
+    RENT_P = 0.6  # Rent exponent
+
+    def __init__(self, d: Benchmark, grid_size=10, accumulation='difference', workers=1, scratch_dir=None,
+                 memory_budget=256 << 20, chunk_bytes=1 << 25, demand='bins'):
         """
         Initialize the CongestionEstimator.
         Args:
             d (Benchmark): The parsed benchmark design object.
             grid_size (int): The size of each grid cell in microns.
+            accumulation (str): 'difference' works on the design's columnar arrays and accumulates
+                all bounding boxes at once with a 2D difference array, 'loop' walks the
+                Cell/Net objects and updates the bins of each box in turn, 'stream' reads
+                the .nets file chunk by chunk and accumulates each chunk's boxes the
+                'difference' way, so the design only needs its cell arrays
+                (Benchmark.generate_benchmark(nets=False)) and no netlist is ever held.
+            workers (int): Worker processes for tile-parallel accumulation in shared memory
+                ('difference' and 'stream' modes); results are bit-for-bit equal to workers=1.
+            scratch_dir (str): Out-of-core mode ('difference' or 'stream' mode, one worker): demand channels
+                and congestion maps are memory-mapped files in this directory, and every
+                whole-grid pass runs over column tiles; results are bit-for-bit equal to in-memory.
+            memory_budget (int): Bytes of working memory per tile in out-of-core mode.
+            chunk_bytes (int): Size of the .nets window read at once in 'stream' mode.
+            demand (str): 'bins' gives a net's weight to every bin its box touches and spreads
+                a cell's pins evenly over the bins it touches; 'area' weighs each bin by its
+                exact overlap with the box instead (covered fraction of the bin for net
+                demand, fraction of the net's box for span demand as in RUDY, fraction of
+                the footprint for pins), so maps barely depend on the grid size.
+                Not available with accumulation='loop'.
         """
+        if accumulation not in self.ACCUMULATION_MODES:
+            raise ValueError(f"Unknown accumulation mode: {accumulation}")
+        if demand not in self.DEMAND_MODES:
+            raise ValueError(f"Unknown demand mode: {demand}")
+        if demand == 'area' and accumulation == 'loop':
+            raise ValueError("Area demand requires accumulation='difference' or 'stream'")
+        if workers > 1 and accumulation == 'loop':
+            raise ValueError("Parallel estimation requires accumulation='difference' or 'stream'")
+        if scratch_dir is not None and (workers > 1 or accumulation == 'loop'):
+            raise ValueError("Out-of-core estimation requires accumulation='difference' or 'stream' and workers=1")
         self.design = d
         self.grid_size = grid_size
+        self.accumulation = accumulation
+        self.workers = workers
+        self.scratch_dir = scratch_dir
+        self.memory_budget = memory_budget
+        self.chunk_bytes = chunk_bytes
+        self.demand = demand
         self.routing_grid = None
         self.congestion_maps = {}
         self.runtimes = {}
+        self._net_bins = None
+        self._streamed = None
+        self._spatial = None
+        self._max_values = None
+        self._maxima = None
+        self._executor = None
+        # Method -> instrumentation record of its estimation stage, when instrumentation is enabled
+        self.profile = {}
+
+    def _parallel(self):
+        """
+        Keyword arguments selecting the tile-parallel path of RoutingGrid accumulations.
+        Returns:
+            dict: Executor and worker count, or empty for serial accumulation.
+        """
+        if self.workers <= 1:
+            return {}
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return {'executor': self._executor, 'workers': self.workers}
 
+    def close(self):
+        """
+        Shut down the worker processes of the parallel mode, if any.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @instrumented('CongestionEstimator.build_routing_grid',
+                  counts=lambda _, self: {'bins': self.routing_grid.x_bins * self.routing_grid.y_bins})
     def build_routing_grid(self):
         """
         Create a routing grid over the die area.
-        Initializes a 2D grid structure to store congestion-related metrics for each cell.
+        Initializes an array-backed grid with one demand channel per congestion metric.
         """
 
         x_bins = int((self.design.rx - self.design.lx) / self.grid_size) + 1
         y_bins = int((self.design.hy - self.design.ly) / self.grid_size) + 1
 
-        self.routing_grid = {
-            'x_bins': x_bins,
-            'y_bins': y_bins,
-            'grid_size':self.grid_size,
-            'min_x': self.design.lx,
-            'min_y': self.design.ly,
-            'cells': [[{
-                'pin_density': 0,
-                'net_demand_standard': 0,
-                'net_demand_weighted': 0,
-                'rent_demand': 0,
-                'span_demand': 0
-            } for _ in range(y_bins)] for _ in range(x_bins)]
-        }
+        self.routing_grid = RoutingGrid(x_bins, y_bins, self.grid_size, self.design.lx, self.design.ly,
+                                        scratch_dir=self.scratch_dir, memory_budget=self.memory_budget)
+        self._net_bins = None
+        self._streamed = None
+        self._spatial = None
+        self._maxima = None
 
+    @instrumented('CongestionEstimator.calculate_pin_density', counts=lambda _, self: self._stage_counts('pin'))
     def calculate_pin_density(self):
         """
         Calculate pin density for each grid cell.
         Distributes the number of pins in each cell across overlapping grid cells.
         """
-        if not self.routing_grid:
+        if self.routing_grid is None:
             self.build_routing_grid()
+        if self.accumulation == 'stream':
+            self._stream_nets()  # Pin counters come from the shared pass, timed on its own
+        start_time = time.perf_counter()
 
+        if self.accumulation != 'loop':
+            self._accumulate_pin_density()
+            self.runtimes['pin'] = time.perf_counter() - start_time
+            return
+
+        grid = self.routing_grid
+        pin_density = grid.channels['pin_density']
         for cell in self.design.cells.values():
             if cell.macro or cell.pin:
                 continue
 
-            min_col = int((cell.lx - self.routing_grid['min_x']) / self.grid_size)
-            max_col = int((cell.lx + cell.w - self.routing_grid['min_x']) / self.grid_size)
-            min_row = int((cell.ly - self.routing_grid['min_y']) / self.grid_size)
-            max_row = int((cell.ly + cell.h - self.routing_grid['min_y']) / self.grid_size)
+            min_col = grid.col_of(cell.lx)
+            max_col = grid.col_of(cell.lx + cell.w)
+            min_row = grid.row_of(cell.ly)
+            max_row = grid.row_of(cell.ly + cell.h)
 
             overlapping_cells = (max_col - min_col + 1) * (max_row - min_row + 1)
             if overlapping_cells > 0:
                 pins_per_cell = cell.pin_counter / overlapping_cells
-                for col in range(min_col, max_col + 1):
-                    for row in range(min_row, max_row + 1):
-                        self.routing_grid['cells'][col][row]['pin_density'] += pins_per_cell
+                pin_density[grid.box(min_col, max_col, min_row, max_row)] += pins_per_cell
+
+        self.runtimes['pin'] = time.perf_counter() - start_time
+
+    def _accumulate_pin_density(self):
+        """
+        Vectorized pin density: spreads each cell's pins evenly over the bins its
+        footprint touches, accumulating all cells at once with a difference array.
+        """
+        arrays = self.design.get_arrays()
+        movable = (arrays.flags & (DesignArrays.MACRO | DesignArrays.PIN)) == 0
+        boxes = self._pin_boxes(arrays.lx[movable], arrays.ly[movable], arrays.w[movable], arrays.h[movable],
+                                self._cell_counts()[0][movable])
+        self.routing_grid.accumulate_boxes('pin_density', *boxes, **self._parallel())
+
+    def _pin_boxes(self, lx, ly, w, h, pins):
+        """
+        Bin ranges and weights spreading each cell's pins over its footprint: evenly over
+        the bins it touches in 'bins' mode, in proportion to overlap area in 'area' mode.
+        Args:
+            lx, ly, w, h (np.ndarray): Cell footprints.
+            pins (np.ndarray): Pins of each cell.
+        Returns:
+            tuple: (min_col, max_col, min_row, max_row, weights) for RoutingGrid.accumulate_boxes.
+        """
+        grid = self.routing_grid
+        if self.demand == 'area':
+            return grid.overlap_boxes(lx, lx + w, ly, ly + h, pins / self._footprint_area(lx, lx + w, ly, ly + h))
+
+        min_col, max_col = grid.col_of(lx), grid.col_of(lx + w)
+        min_row, max_row = grid.row_of(ly), grid.row_of(ly + h)
+        overlapping_cells = (max_col - min_col + 1) * (max_row - min_row + 1)
+        valid = overlapping_cells > 0
+        return (min_col[valid], max_col[valid], min_row[valid], max_row[valid],
+                pins[valid] / overlapping_cells[valid])
+
+    def _net_boxes(self, box, extents, weights, rudy=False):
+        """
+        Bin ranges and weights adding a weight per net over its bounding box: to every bin
+        it touches in 'bins' mode; in 'area' mode, times each bin's covered fraction or,
+        with rudy, times the fraction of the net's box inside the bin (RUDY: the net's wire
+        spread evenly over its box).
+        Args:
+            box (tuple): (min_col, max_col, min_row, max_row) of each net.
+            extents (tuple): (lx, rx, ly, hy) of each net, used in 'area' mode.
+            weights (np.ndarray): Weight of each net.
+            rudy (bool): Spread the weight over the net's box ('area' mode).
+        Returns:
+            tuple: (min_col, max_col, min_row, max_row, weights) for RoutingGrid.accumulate_boxes.
+        """
+        if self.demand != 'area':
+            return (*box, weights)
+        area = self._footprint_area(*extents) if rudy else self.grid_size ** 2
+        return self.routing_grid.overlap_boxes(*extents, weights / area)
+
+    def _footprint_area(self, lx, ux, ly, uy):
+        """
+        Area of rectangles as overlap_boxes sees them, with a zero width or height counting
+        as one bin pitch, so every rectangle's overlaps add up to its area.
+        """
+        return (np.where(ux > lx, ux - lx, self.grid_size) * np.where(uy > ly, uy - ly, self.grid_size))
+
+    def _stage_counts(self, method: str):
+        """
+        Item counts of one estimation stage for the instrumentation: the cells or nets
+        accumulated and the bin updates they made (box areas, or one per point).
+        Args:
+            method (str): 'pin' for pin density, or a METHODS key.
+        Returns:
+            dict: Counts of the stage.
+        """
+        grid = self.routing_grid
+        arrays = self.design.get_arrays()
+        if method == 'rents':
+            col, row = grid.col_of(arrays.lx), grid.row_of(arrays.ly)
+            inside = (col >= 0) & (col < grid.x_bins) & (row >= 0) & (row < grid.y_bins)
+            return {'cells': len(arrays.lx), 'bins_touched': int(np.count_nonzero(inside))}
+        if method == 'pin':
+            movable = (arrays.flags & (DesignArrays.MACRO | DesignArrays.PIN)) == 0
+            lx, ly = arrays.lx[movable], arrays.ly[movable]
+            area = grid.box_area(grid.col_of(lx), grid.col_of(lx + arrays.w[movable]),
+                                 grid.row_of(ly), grid.row_of(ly + arrays.h[movable]))
+            return {'cells': int(np.count_nonzero(movable)), 'bins_touched': int(area.sum())}
+        if self.accumulation == 'stream':
+            return {'nets': self._streamed['nets'], 'bins_touched': self._streamed['bins_touched']}
+        nets = self._net_bin_ranges()
+        area = grid.box_area(nets['min_col'], nets['max_col'], nets['min_row'], nets['max_row'])
+        return {'nets': len(nets['fanout']), 'bins_touched': int(area.sum())}
+
+    def _net_bin_ranges(self):
+        """
+        Bin ranges, fanout and Manhattan span of every non-empty net, gathered once per grid
+        from the design's columnar arrays.
+        Returns:
+            dict: Per-net arrays 'min_col', 'max_col', 'min_row', 'max_row', 'fanout', 'span',
+                plus the (lx, rx, ly, hy) boxes under 'extents' in 'area' demand mode and
+                the matching list of Net objects under 'nets' in 'loop' mode.
+        """
+        if self._net_bins is not None:
+            return self._net_bins
+
+        grid = self.routing_grid
+        arrays = self.design.get_arrays()
+        nonempty = arrays.net_degree > 0
+        lx, rx = arrays.net_lx[nonempty], arrays.net_rx[nonempty]
+        ly, hy = arrays.net_ly[nonempty], arrays.net_hy[nonempty]
+
+        self._net_bins = {
+            'index': np.flatnonzero(nonempty),
+            'min_col': grid.col_of(lx),
+            'max_col': grid.col_of(rx),
+            'min_row': grid.row_of(ly),
+            'max_row': grid.row_of(hy),
+            'fanout': arrays.net_degree[nonempty],
+            'span': (rx - lx) + (hy - ly),
+        }
+        if self.demand == 'area':
+            self._net_bins['extents'] = (lx, rx, ly, hy)
+        if self.accumulation == 'loop':
+            self._net_bins['nets'] = [net for net in self.design.nets.values() if net.cell_ids]
+        return self._net_bins
+
+    def _cell_counts(self):
+        """
+        Per-cell pin counter (pins on the cell's nets) and fanout (nets on the cell), from
+        the pass over the .nets file in 'stream' mode, from the design's netlist otherwise.
+        Returns:
+            tuple: (pin_counter, cell_fanout) arrays.
+        """
+        if self.accumulation == 'stream':
+            streamed = self._stream_nets()
+            return streamed['pin_counter'], streamed['cell_fanout']
+        arrays = self.design.get_arrays()
+        return arrays.pin_counter, arrays.cell_fanout
+
+    def _stream_nets(self):
+        """
+        Results of the 'stream' mode pass over the .nets file, run once per routing grid.
+        Returns:
+            dict: See _stream_pass().
+        """
+        if self._streamed is None:
+            self._streamed = self._stream_pass()
+        return self._streamed
+
+    @instrumented('CongestionEstimator.stream_nets', counts=lambda streamed, self: {
+        'nets': streamed['nets'], 'chunks': streamed['chunks'], 'bins_touched': streamed['bins_touched']})
+    def _stream_pass(self):
+        """
+        'stream' mode: a single pass over the .nets file, one chunk of whole nets at a time.
+        Each chunk's bounding boxes and fanouts are computed from the cell arrays and
+        accumulated into the standard, weighted and span channels, and its nets are
+        counted into the per-cell fanout and pin counter arrays used by Rent's Rule
+        and pin density; the chunk is then dropped.
+        Returns:
+            dict: 'pin_counter' and 'cell_fanout' arrays, 'nets', 'chunks' and 'bins_touched'
+                counts and the pass 'runtime'.
+        """
+        start_time = time.perf_counter()
+        grid = self.routing_grid
+        arrays = self.design.get_arrays()
+        num_cells = arrays.num_cells
+        is_pin = (arrays.flags & DesignArrays.PIN) != 0
+        pin_counter = np.zeros(num_cells)
+        cell_fanout = np.zeros(num_cells, dtype=np.int64)
+        nets = chunks = bins_touched = 0
+
+        for degrees, pins, dx, dy in self.design.fp.stream_nets(arrays.names, self.chunk_bytes):
+            # Same per-net quantities as DesignArrays (unique cells, pin counters, pin boxes)
+            net_ptr, net_cells = DesignArrays.unique_incidence(degrees, pins, num_cells)
+            degree = np.diff(net_ptr)
+            net_of = np.repeat(np.arange(len(degree), dtype=np.int64), degree)
+            cell_fanout += np.bincount(net_cells, minlength=num_cells)
+            pin_entry = is_pin[net_cells]
+            pins_per_net = np.bincount(net_of, weights=pin_entry, minlength=len(degree))
+            pin_counter += np.bincount(net_cells, weights=np.where(pin_entry, 0.0, pins_per_net[net_of]),
+                                       minlength=num_cells)
+
+            nonempty = degree > 0
+            starts = (np.cumsum(degrees) - degrees)[nonempty]
+            if not len(starts):
+                continue
+            pin_lx, pin_rx, pin_ly, pin_hy = arrays.pin_extents(pins, dx, dy)
+            lx = np.minimum.reduceat(pin_lx, starts)
+            ux = np.maximum.reduceat(pin_rx, starts)
+            ly = np.minimum.reduceat(pin_ly, starts)
+            uy = np.maximum.reduceat(pin_hy, starts)
+            box = (grid.col_of(lx), grid.col_of(ux), grid.row_of(ly), grid.row_of(uy))
+            extents = (lx, ux, ly, uy)
+            fanout = degree[nonempty]
+            grid.accumulate_boxes('net_demand_standard', *self._net_boxes(box, extents, np.ones(len(fanout))),
+                                  **self._parallel())
+            grid.accumulate_boxes('net_demand_weighted', *self._net_boxes(box, extents, np.log1p(fanout)),
+                                  **self._parallel())
+            spans = ((ux - lx) + (uy - ly)) / self.grid_size
+            grid.accumulate_boxes('span_demand', *self._net_boxes(box, extents, spans, rudy=True), **self._parallel())
+
+            nets += len(fanout)
+            chunks += 1
+            bins_touched += int(grid.box_area(*box).sum())
+
+        return {'pin_counter': pin_counter, 'cell_fanout': cell_fanout, 'nets': nets, 'chunks': chunks,
+                'bins_touched': bins_touched, 'runtime': time.perf_counter() - start_time}
+
+    def _accumulate_net_demand(self, weights, demand_key, rudy=False):
+        """
+        Add a per-net weight to every bin of each net's bounding box (see _net_boxes for 'area' mode).
+        Standard, weighted and span demand only differ by these weights.
+        Args:
+            weights (np.ndarray): Weight of each net, aligned with _net_bin_ranges().
+            demand_key (str): Grid channel to update.
+            rudy (bool): Spread the weight over the net's box in 'area' mode.
+        """
+        nets = self._net_bin_ranges()
+        if self.accumulation == 'difference':
+            box = (nets['min_col'], nets['max_col'], nets['min_row'], nets['max_row'])
+            self.routing_grid.accumulate_boxes(demand_key, *self._net_boxes(box, nets.get('extents'), weights, rudy),
+                                               **self._parallel())
+        else:
+            for net, weight in zip(nets['nets'], weights):
+                self._process_net_demand(net, weight, demand_key)
 
     def _process_net_demand(self, net, weight, demand_key):
         """
@@ -84,158 +401,723 @@ class CongestionEstimator:
         Args:
             net: Net object.
             weight (float): Weight to apply to the net's demand.
-            demand_key (str): Key in the grid cell dict to update.
+            demand_key (str): Grid channel to update.
         """
-        if not net.cells:
+        if not net.cell_ids:
             return
 
-        min_col = int((net.lx - self.routing_grid['min_x']) / self.grid_size)
-        max_col = int((net.rx - self.routing_grid['min_x']) / self.grid_size)
-        min_row = int((net.ly - self.routing_grid['min_y']) / self.grid_size)
-        max_row = int((net.hy - self.routing_grid['min_y']) / self.grid_size)
-
-        for col in range(min_col, max_col + 1):
-            for row in range(min_row, max_row + 1):
-                self.routing_grid['cells'][col][row][demand_key] += weight
+        grid = self.routing_grid
+        box = grid.box(grid.col_of(net.lx), grid.col_of(net.rx), grid.row_of(net.ly), grid.row_of(net.hy))
+        grid.channels[demand_key][box] += weight
 
+    @instrumented('CongestionEstimator.estimate_net_demand_standard',
+                  counts=lambda _, self: self._stage_counts('standard'))
     def estimate_net_demand_standard(self):
         """
         Estimate net demand using the standard method (all nets contribute equally).
         Updates the routing grid with standard net demand values.
         """
-        start_time = time.time()
-        if not self.routing_grid:
+        start_time = time.perf_counter()
+        if self.routing_grid is None:
             self.build_routing_grid()
-        for net in self.design.nets.values():
-            self._process_net_demand(net, weight=1.0, demand_key='net_demand_standard')
-        self.runtimes['standard'] = time.time() - start_time
+        if self.accumulation == 'stream':
+            # One pass fills all the net channels, so each net method reports its time
+            self.runtimes['standard'] = self._stream_nets()['runtime']
+            return
+        nets = self._net_bin_ranges()
+        self._accumulate_net_demand(np.ones(len(nets['fanout'])), 'net_demand_standard')
+        self.runtimes['standard'] = time.perf_counter() - start_time
 
+    @instrumented('CongestionEstimator.estimate_net_demand_weighted',
+                  counts=lambda _, self: self._stage_counts('weighted'))
     def estimate_net_demand_weighted(self):
         """
         Estimate net demand weighted by net fanout (log scale).
         Updates the routing grid with fanout-weighted net demand values.
         """
-        start_time = time.time()
-        if not self.routing_grid:
+        start_time = time.perf_counter()
+        if self.routing_grid is None:
             self.build_routing_grid()
-        for net in self.design.nets.values():
-            fanout = len(net.cells.keys())
-            weight = np.log1p(fanout)  # log(1 + fanout)
-            self._process_net_demand(net, weight, 'net_demand_weighted')
-        self.runtimes['weighted'] = time.time() - start_time
+        if self.accumulation == 'stream':
+            self.runtimes['weighted'] = self._stream_nets()['runtime']
+            return
+        nets = self._net_bin_ranges()
+        weights = np.log1p(nets['fanout'])  # log(1 + fanout)
+        self._accumulate_net_demand(weights, 'net_demand_weighted')
+        self.runtimes['weighted'] = time.perf_counter() - start_time
 
+    @instrumented('CongestionEstimator.estimate_rents_rule', counts=lambda _, self: self._stage_counts('rents'))
     def estimate_rents_rule(self):
         """
         Estimate congestion using Rent's Rule.
         Applies an empirical model to estimate wiring demand per cell.
         """
-        start_time = time.time()
-        if not self.routing_grid:
+        if self.routing_grid is None:
             self.build_routing_grid()
+        if self.accumulation == 'stream':
+            self._stream_nets()  # Cell fanouts come from the shared pass, timed on its own
+        start_time = time.perf_counter()
 
-        k = 0.5  # Average interconnects per cell
-        p = 0.6  # Rent exponent
+        k = self.RENT_K
+        p = self.RENT_P
 
+        if self.accumulation != 'loop':
+            self._accumulate_rents_rule(k, p)
+            self.runtimes['rents'] = time.perf_counter() - start_time
+            return
+
+        grid = self.routing_grid
+        rent_demand = grid.channels['rent_demand']
         for cell in self.design.cells.values():
-            connected_nets = cell.nets.values()
-            fanout = len(connected_nets)
+            fanout = len(cell.net_ids)
             wiring_demand = k * (fanout ** p)
 
-            col = int((cell.lx - self.routing_grid['min_x']) / self.grid_size)
-            row = int((cell.ly - self.routing_grid['min_y']) / self.grid_size)
+            col = grid.col_of(cell.lx)
+            row = grid.row_of(cell.ly)
 
-            if 0 <= col < self.routing_grid['x_bins'] and 0 <= row < self.routing_grid['y_bins']:
-                self.routing_grid['cells'][col][row]['rent_demand'] += wiring_demand
+            if 0 <= col < grid.x_bins and 0 <= row < grid.y_bins:
+                rent_demand[col, row] += wiring_demand
 
-        self.runtimes['rents'] = time.time() - start_time
+        self.runtimes['rents'] = time.perf_counter() - start_time
 
+    def _accumulate_rents_rule(self, k, p):
+        """
+        Vectorized Rent's Rule demand: k * fanout^p per cell, added at the bin of its lower-left corner.
+        Args:
+            k (float): Average interconnects per cell.
+            p (float): Rent exponent.
+        """
+        grid = self.routing_grid
+        arrays = self.design.get_arrays()
+        wiring_demand = k * (self._cell_counts()[1] ** p)
+
+        col = grid.col_of(arrays.lx)
+        row = grid.row_of(arrays.ly)
+        grid.accumulate_points('rent_demand', col, row, wiring_demand, **self._parallel())
+
+    @instrumented('CongestionEstimator.estimate_net_span', counts=lambda _, self: self._stage_counts('span'))
     def estimate_net_span(self):
         """
         Estimate congestion based on the Manhattan span of each net.
         Updates the routing grid with net span-based demand values.
         """
-        start_time = time.time()
-        if not self.routing_grid:
+        start_time = time.perf_counter()
+        if self.routing_grid is None:
+            self.build_routing_grid()
+        if self.accumulation == 'stream':
+            self.runtimes['span'] = self._stream_nets()['runtime']
+            return
+
+        nets = self._net_bin_ranges()
+        spans = nets['span']  # Manhattan span
+        self._accumulate_net_demand(spans / self.grid_size, 'span_demand', rudy=True)
+        self.runtimes['span'] = time.perf_counter() - start_time
+
+    @instrumented('CongestionEstimator.connectivity_features', counts=lambda _, self: {
+        'cells': self.design.get_arrays().num_cells})
+    def connectivity_features(self):
+        """
+        Per-bin netlist connectivity features from DesignArrays.calculate_levels(), with every
+        cell at the bin of its lower-left corner as in the Rent's Rule demand: mean cell level
+        and mean pin distance over the cells that reach a pin, and the number of distinct
+        connected components.
+        Returns:
+            dict: Feature name -> (x_bins, y_bins) array; 'mean_level' and 'mean_pin_distance'
+                are NaN in bins without cells that reach a pin.
+        """
+        if self.accumulation == 'stream':
+            raise ValueError("Connectivity features need the netlist; use accumulation='difference'")
+        if self.routing_grid is None:
             self.build_routing_grid()
+        grid = self.routing_grid
+        arrays = self.design.get_arrays()
+        if arrays.cell_level is None:
+            arrays.calculate_levels()
+
+        col, row = grid.col_of(arrays.lx), grid.row_of(arrays.ly)
+        inside = (0 <= col) & (col < grid.x_bins) & (0 <= row) & (row < grid.y_bins)
+        bins = col * grid.y_bins + row
+        size = grid.x_bins * grid.y_bins
+
+        reached = inside & (arrays.cell_level >= 0)
+        counts = np.bincount(bins[reached], minlength=size)
+        features = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for name, values in (('mean_level', arrays.cell_level), ('mean_pin_distance', arrays.pin_distance)):
+                features[name] = (np.bincount(bins[reached], weights=values[reached], minlength=size) /
+                                  counts).reshape(grid.shape)
+
+        # Distinct (bin, component) pairs
+        num_components = int(arrays.cell_component.max(initial=0)) + 1
+        pairs = np.unique(bins[inside] * num_components + arrays.cell_component[inside])
+        features['components'] = np.bincount(pairs // num_components, minlength=size).reshape(grid.shape)
+        return features
+
+    def spatial_index(self):
+        """
+        Spatial indexes of the net bounding boxes and cell footprints, built once per
+        routing grid (and again after update_cell_positions()).
+        Returns:
+            dict: 'nets', a SpatialIndex over the nets of _net_bin_ranges() in that order,
+                and 'cells', a SpatialIndex over the cells.
+        """
+        if self.accumulation == 'stream':
+            raise ValueError("Window queries need the netlist; use accumulation='difference'")
+        if self.routing_grid is None:
+            self.build_routing_grid()
+        if self._spatial is None:
+            arrays = self.design.get_arrays()
+            index = self._net_bin_ranges()['index']
+            self._spatial = {
+                'nets': SpatialIndex(arrays.net_lx[index], arrays.net_rx[index],
+                                     arrays.net_ly[index], arrays.net_hy[index]),
+                'cells': SpatialIndex(arrays.lx, arrays.rx, arrays.ly, arrays.hy),
+            }
+        return self._spatial
 
-        for net in self.design.nets.values():
-            span = (net.rx - net.lx) + (net.hy - net.ly)  # Manhattan span
+    def window_contributors(self, window=None, bins=None, k: int = None, rank_by='standard'):
+        """
+        Nets and cells driving the demand of a die window, answered from the spatial index
+        without a pass over the netlist. A net's contribution to a channel is its demand
+        summed over the window's bins, with the bin ranges and weights of the estimation,
+        so the contributions of all nets add up to the channel's demand in the window.
+        Args:
+            window (tuple): (lx, rx, ly, hy) die window; every bin it touches is queried.
+            bins (tuple): (min_col, max_col, min_row, max_row) bin range instead, e.g.
+                (col, col, row, row) for one grid bin or a hotspot_regions() range.
+            k (int): Keep only the k top-ranked nets.
+            rank_by (str): Net method ranking the nets ('standard', 'weighted' or 'span').
+        Returns:
+            dict: 'bins', the queried bin range; 'nets', a DataFrame of the contributing nets
+                (name, degree, box, and per method its contribution and share of the
+                window's demand) ranked by rank_by; 'cells', a DataFrame of the cells
+                overlapping the window with their pin density and Rent's Rule contributions.
+        """
+        net_methods = ('standard', 'weighted', 'span')
+        if rank_by not in net_methods:
+            raise ValueError(f"rank_by must be one of {net_methods}, got {rank_by!r}")
+        spatial = self.spatial_index()
+        grid = self.routing_grid
+        g = self.grid_size
+        if bins is None:
+            if window is None:
+                raise ValueError("Give a die window or a bin range")
+            bins = (grid.col_of(window[0]), grid.col_of(window[1]), grid.row_of(window[2]), grid.row_of(window[3]))
+        bins = (max(int(bins[0]), 0), min(int(bins[1]), grid.x_bins - 1),
+                max(int(bins[2]), 0), min(int(bins[3]), grid.y_bins - 1))
+        if bins[0] > bins[1] or bins[2] > bins[3]:
+            raise ValueError(f"Window {window if window is not None else bins} is outside the routing grid")
 
-            min_col = int((net.lx - self.routing_grid['min_x']) / self.grid_size)
-            max_col = int((net.rx - self.routing_grid['min_x']) / self.grid_size)
-            min_row = int((net.ly - self.routing_grid['min_y']) / self.grid_size)
-            max_row = int((net.hy - self.routing_grid['min_y']) / self.grid_size)
+        # Die rectangle of the bins; candidates are looked up one pitch wider, as col_of
+        # truncates toward zero, and nets or cells contributing nothing are dropped below
+        lx, rx = grid.min_x + bins[0] * g, grid.min_x + (bins[1] + 1) * g
+        ly, hy = grid.min_y + bins[2] * g, grid.min_y + (bins[3] + 1) * g
+        arrays = self.design.get_arrays()
 
-            for col in range(min_col, max_col + 1):
-                for row in range(min_row, max_row + 1):
-                    self.routing_grid['cells'][col][row]['span_demand'] += span / self.grid_size
-        self.runtimes['span'] = time.time() - start_time
+        nets = self._net_bin_ranges()
+        positions = spatial['nets'].query(lx - g, rx + g, ly - g, hy + g)
+        if self.demand == 'area':
+            positions = positions[self._meets_grid(*(e[positions] for e in nets['extents']))]
+        box = tuple(nets[key][positions] for key in ('min_col', 'max_col', 'min_row', 'max_row'))
+        extents = tuple(e[positions] for e in nets['extents']) if 'extents' in nets else None
+        weights = {'standard': np.ones(len(positions)), 'weighted': np.log1p(nets['fanout'][positions]),
+                   'span': nets['span'][positions] / g}
+        contributions = {method: self._window_sums(self._net_boxes(box, extents, w, rudy=method == 'span'),
+                                                   len(positions), bins)
+                         for method, w in weights.items()}
+        keep = np.logical_or.reduce([c != 0 for c in contributions.values()])
+        index = nets['index'][positions[keep]]
+        net_table = pd.DataFrame({
+            'Net': [arrays.net_name(i) for i in index],
+            'Degree': nets['fanout'][positions[keep]],
+            'Lx': arrays.net_lx[index], 'Rx': arrays.net_rx[index],
+            'Ly': arrays.net_ly[index], 'Hy': arrays.net_hy[index],
+        })
+        for method, values in contributions.items():
+            total = values.sum()
+            net_table[method.capitalize()] = values[keep]
+            net_table[f'{method.capitalize()} Share'] = values[keep] / total if total else 0.0
+        net_table = net_table.sort_values(rank_by.capitalize(), ascending=False, kind='stable')
+        if k is not None:
+            net_table = net_table.head(k)
 
+        cells = spatial['cells'].query(lx - g, rx + g, ly - g, hy + g)
+        pin_counter, cell_fanout = self._cell_counts()
+        movable = cells[(arrays.flags[cells] & (DesignArrays.MACRO | DesignArrays.PIN)) == 0]
+        if self.demand == 'area':
+            movable = movable[self._meets_grid(arrays.lx[movable], arrays.rx[movable],
+                                               arrays.ly[movable], arrays.hy[movable])]
+        pins = np.zeros(len(cells))
+        pins[np.searchsorted(cells, movable)] = self._window_sums(
+            self._pin_boxes(arrays.lx[movable], arrays.ly[movable], arrays.w[movable], arrays.h[movable],
+                            pin_counter[movable]), len(movable), bins)
+        col, row = grid.col_of(arrays.lx[cells]), grid.row_of(arrays.ly[cells])
+        inside = (bins[0] <= col) & (col <= bins[1]) & (bins[2] <= row) & (row <= bins[3])
+        rents = np.where(inside, self.RENT_K * (cell_fanout[cells] ** self.RENT_P), 0.0)
+        overlap = ((arrays.lx[cells] <= rx) & (arrays.rx[cells] >= lx) &
+                   (arrays.ly[cells] <= hy) & (arrays.hy[cells] >= ly))
+        keep = overlap | (pins != 0) | inside
+        cell_table = pd.DataFrame({
+            'Cell': [arrays.cell_name(i) for i in cells[keep]],
+            'Lx': arrays.lx[cells[keep]], 'Ly': arrays.ly[cells[keep]],
+            'W': arrays.w[cells[keep]], 'H': arrays.h[cells[keep]],
+            'Pin Density': pins[keep], 'Rents': rents[keep],
+        }).sort_values('Pin Density', ascending=False, kind='stable')
+
+        return {'bins': bins, 'nets': net_table.reset_index(drop=True), 'cells': cell_table.reset_index(drop=True)}
+
+    def _meets_grid(self, lx, rx, ly, hy):
+        """
+        Whether rectangles meet the routing grid, i.e. are kept by RoutingGrid.overlap_boxes().
+        """
+        grid = self.routing_grid
+        g = self.grid_size
+        return ((rx >= grid.min_x) & (lx <= grid.min_x + grid.x_bins * g) &
+                (hy >= grid.min_y) & (ly <= grid.min_y + grid.y_bins * g))
+
+    def _window_sums(self, boxes, count: int, bins):
+        """
+        Sum, per item, of the demand some bin ranges add inside a bin window.
+        Args:
+            boxes (tuple): (min_col, max_col, min_row, max_row, weights) from _net_boxes() or
+                _pin_boxes(), one block of count ranges per box part (nine in 'area' mode).
+            count (int): Number of items the ranges were built for.
+            bins (tuple): (min_col, max_col, min_row, max_row) window.
+        Returns:
+            np.ndarray: Demand of each item inside the window.
+        """
+        min_col, max_col, min_row, max_row, weights = boxes
+        area = self.routing_grid.box_area(np.maximum(min_col, bins[0]), np.minimum(max_col, bins[1]),
+                                          np.maximum(min_row, bins[2]), np.minimum(max_row, bins[3]))
+        owner = np.arange(len(weights)) % count if count else np.zeros(0, dtype=np.int64)
+        return np.bincount(owner, weights=weights * area, minlength=count)
+
+    @instrumented('CongestionEstimator.generate_all_congestion_maps', counts=lambda maps, self: {
+        'methods': len(maps), 'bins': self.routing_grid.x_bins * self.routing_grid.y_bins})
     def generate_all_congestion_maps(self):
         """
         Generate congestion maps for all implemented methods with normalization.
         Returns:
             dict: Congestion maps for each method.
         """
-        self.calculate_pin_density()
-        self.estimate_net_demand_standard()
-        self.estimate_net_demand_weighted()
-        self.estimate_rents_rule()
-        self.estimate_net_span()
-
-        # Calculate max values for normalization
-        max_values = {
-            'pin': max(c['pin_density'] for row in self.routing_grid['cells'] for c in row) or 1,
-            'standard': max(c['net_demand_standard'] for row in self.routing_grid['cells'] for c in row) or 1,
-            'weighted': max(c['net_demand_weighted'] for row in self.routing_grid['cells'] for c in row) or 1,
-            'rents': max(c['rent_demand'] for row in self.routing_grid['cells'] for c in row) or 1,
-            'span': max(c['span_demand'] for row in self.routing_grid['cells'] for c in row) or 1
-        }
+        try:
+            self.calculate_pin_density()
+            self.estimate_net_demand_standard()
+            self.estimate_net_demand_weighted()
+            self.estimate_rents_rule()
+            self.estimate_net_span()
+        finally:
+            self.close()
 
-        methods = {
-            'standard': 'net_demand_standard',
-            'weighted': 'net_demand_weighted',
-            'rents': 'rent_demand',
-            'span': 'span_demand'
-        }
+        self._normalize_maps()
+        if instrument_funcs.is_enabled():
+            self.profile = {method: instrument_funcs.last(stage) for method, stage in self.STAGES.items()}
+        return self.congestion_maps
 
-        for name, demand_key in methods.items():
-            congestion_map = {
-                **self.routing_grid,
-                'cells':[[{
-                    **cell,
-                    'congestion': 0.6 * (cell[demand_key] / max_values[name]) +
-                                  0.4 * (cell['pin_density'] / max_values['pin'])
-                } for cell in row] for row in self.routing_grid['cells']]
-            }
-            self.congestion_maps[name] = congestion_map
-        
+    @classmethod
+    def max_values(cls, grid: RoutingGrid):
+        """
+        Maximum of the pin density and of each method's demand channel, used for normalization.
+        Args:
+            grid (RoutingGrid): Grid with filled demand channels.
+        Returns:
+            dict: 'pin' and method name -> maximum (1 for all-zero channels).
+        """
+        # One pass over all channels at once, tile by tile when out of core
+        maxima = np.max([grid.data[:, tile].max(axis=(1, 2)) for tile in grid.tiles()], axis=0)
+        maxima = dict(zip(grid.CHANNELS, maxima.tolist()))
+        max_values = {'pin': maxima['pin_density'] or 1}
+        for name, demand_key in cls.METHODS.items():
+            max_values[name] = maxima[demand_key] or 1
+        return max_values
+
+    @classmethod
+    def normalize(cls, grid: RoutingGrid, max_values=None):
+        """
+        Combine a grid's demand channels into one normalized congestion map per method.
+        Out of core, this is the second pass of a two-pass reduction: the maxima come
+        first, then each tile of the maps is written from the same tile of the channels.
+        Args:
+            grid (RoutingGrid): Grid with filled demand channels.
+            max_values (dict): Normalization maxima, computed with max_values() if omitted.
+        Returns:
+            dict: CongestionMap sharing the grid's channels, for each method.
+        """
+        if max_values is None:
+            max_values = cls.max_values(grid)
+        channels = grid.channels
+        congestion = grid.new_array((len(cls.METHODS),) + grid.shape)
+        for tile in grid.tiles():
+            pins = 0.4 * (channels['pin_density'][tile] / max_values['pin'])
+            for i, (name, demand_key) in enumerate(cls.METHODS.items()):
+                out = congestion[i, tile]
+                np.divide(channels[demand_key][tile], max_values[name], out=out)
+                out *= 0.6
+                out += pins
+        return {name: CongestionMap(grid, congestion[i]) for i, name in enumerate(cls.METHODS)}
+
+    @instrumented('CongestionEstimator.normalize', counts=lambda _, self, boxes=None: {
+        'bins': self.routing_grid.x_bins * self.routing_grid.y_bins if boxes is None else
+        int(self.routing_grid.box_area(*boxes).sum())})
+    def _normalize_maps(self, boxes=None):
+        """
+        Build the normalized congestion map of every method from the demand channels.
+        Args:
+            boxes (tuple): (min_col, max_col, min_row, max_row) arrays of the only bin ranges
+                that changed since the maps were last built. The channel maxima are then
+                updated from these ranges; the maps of methods whose maximum changed are
+                rebuilt, and only these ranges of the others are refreshed.
+        """
+        grid = self.routing_grid
+        if boxes is not None:
+            boxes = np.unique(np.column_stack(boxes), axis=0)
+            # Ranges covering more bins than the grid holds cost more than a full pass
+            if grid.box_area(*boxes.T).sum() > grid.x_bins * grid.y_bins:
+                boxes = None
+        if boxes is None or self._maxima is None:
+            self._maxima = self._scan_maxima()
+        else:
+            self._update_maxima(boxes)
+        max_values = {'pin': self._maxima['pin_density'][0] or 1}
+        for name, demand_key in self.METHODS.items():
+            max_values[name] = self._maxima[demand_key][0] or 1
+
+        previous = self._max_values
+        self._max_values = max_values
+        if boxes is None or not self.congestion_maps or max_values['pin'] != previous['pin']:
+            self.congestion_maps.update(self.normalize(grid, max_values))
+            return
+        for name in self.METHODS:
+            if max_values[name] != previous[name]:
+                for tile in grid.tiles():
+                    self._refresh_map(name, (tile, slice(None)))
+            else:
+                for min_col, max_col, min_row, max_row in boxes:
+                    self._refresh_map(name, grid.box(min_col, max_col, min_row, max_row))
+
+    def _refresh_map(self, name: str, box):
+        """
+        Recompute one method's congestion map over a box from the channels and current maxima.
+        Args:
+            name (str): Method name.
+            box (tuple): Pair of slices into the grid.
+        """
+        channels = self.routing_grid.channels
+        max_values = self._max_values
+        self.congestion_maps[name].congestion[box] = (
+            0.6 * (channels[self.METHODS[name]][box] / max_values[name]) +
+            0.4 * (channels['pin_density'][box] / max_values['pin']))
+
+    def _scan_maxima(self, keys=None):
+        """
+        Maximum of some demand channels and the bin holding it, in one pass over the grid
+        (tile by tile when out of core).
+        Args:
+            keys (list): Channels to scan, all by default.
+        Returns:
+            dict: Channel -> (maximum, (col, row)).
+        """
+        grid = self.routing_grid
+        maxima = {key: (-np.inf, (0, 0)) for key in keys or grid.CHANNELS}
+        for tile in grid.tiles():
+            for key, (value, _) in maxima.items():
+                values = grid.channels[key][tile]
+                if not values.size:
+                    continue
+                i = np.unravel_index(values.argmax(), values.shape)
+                if values[i] > value:
+                    maxima[key] = (float(values[i]), (tile.start + int(i[0]), int(i[1])))
+        return maxima
+
+    def _update_maxima(self, boxes):
+        """
+        Update the channel maxima after only some bin ranges changed: the maximum of a channel
+        is the larger of its previous one and the maxima inside the ranges, unless the bin that
+        held it is inside the ranges and decreased, in which case that channel is rescanned.
+        Args:
+            boxes (np.ndarray): (min_col, max_col, min_row, max_row) rows of the changed ranges.
+        """
+        grid = self.routing_grid
+        slices = [grid.box(*box) for box in boxes]
+        rescan = []
+        for key, (value, (col, row)) in self._maxima.items():
+            values = grid.channels[key]
+            covered = np.any((boxes[:, 0] <= col) & (col <= boxes[:, 1]) & (boxes[:, 2] <= row) & (row <= boxes[:, 3]))
+            if covered and values[col, row] < value:
+                rescan.append(key)
+                continue
+            for box in slices:
+                window = values[box]
+                if window.size and window.max() > value:
+                    i = np.unravel_index(window.argmax(), window.shape)
+                    value, col, row = float(window[i]), box[0].start + int(i[0]), box[1].start + int(i[1])
+            self._maxima[key] = (value, (col, row))
+        if rescan:
+            self._maxima.update(self._scan_maxima(rescan))
+
+    @instrumented('CongestionEstimator.update_cell_positions', counts=lambda _, self, moves: {'cells': len(moves)})
+    def update_cell_positions(self, moves: dict):
+        """
+        Incrementally update the congestion maps after moving some cells (ECO mode).
+        Only the moved cells and the nets connected to them are revisited: their old
+        contributions are subtracted from every demand channel and the new ones added,
+        so the cost grows with the touched nets rather than with the design.
+        Args:
+            moves (dict): Cell name -> new (lx, ly) lower-left corner.
+        Returns:
+            dict: The updated congestion maps.
+        """
+        if self.accumulation == 'stream':
+            raise ValueError("Incremental updates need the netlist; use accumulation='difference'")
+        if not self.congestion_maps:
+            # Nothing to update yet; estimate from scratch, on a fresh grid so that channels
+            # filled by an earlier partial run are not counted twice
+            self.design.move_cells(moves)
+            self.build_routing_grid()
+            return self.generate_all_congestion_maps()
+
+        start_time = time.perf_counter()
+        arrays = self.design.get_arrays()
+        cells = np.fromiter((arrays.index_of(name) for name in moves), dtype=np.int64, count=len(moves))
+        positions = np.searchsorted(self._net_bin_ranges()['index'], arrays.nets_of_cells(cells))
+
+        ranges = [self._add_cell_demand(cells, -1.0), self._add_net_demand(positions, -1.0)]
+        self.design.move_cells(moves)
+        self._update_net_bins(positions)
+        self._spatial = None
+        ranges += [self._add_cell_demand(cells, 1.0), self._add_net_demand(positions, 1.0)]
+
+        boxes = tuple(np.concatenate(r) for r in zip(*ranges))
+        if len(boxes[0]):
+            self._normalize_maps(boxes)
+        self.runtimes['update'] = time.perf_counter() - start_time
         return self.congestion_maps
-    
+
+    def _add_cell_demand(self, cells, sign):
+        """
+        Add (sign=1) or remove (sign=-1) the pin density and Rent's Rule demand of some cells
+        at their current positions.
+        Args:
+            cells (np.ndarray): Cell indices.
+            sign (float): 1.0 to add, -1.0 to subtract.
+        Returns:
+            tuple: (min_col, max_col, min_row, max_row) arrays of the bins touched.
+        """
+        grid = self.routing_grid
+        arrays = self.design.get_arrays()
+        lx, ly, w, h = arrays.lx[cells], arrays.ly[cells], arrays.w[cells], arrays.h[cells]
+
+        movable = (arrays.flags[cells] & (DesignArrays.MACRO | DesignArrays.PIN)) == 0
+        boxes = self._pin_boxes(lx[movable], ly[movable], w[movable], h[movable],
+                                sign * arrays.pin_counter[cells][movable])
+        grid.add_boxes('pin_density', *boxes)
+
+        min_col, min_row = grid.col_of(lx), grid.row_of(ly)
+        inside = (0 <= min_col) & (min_col < grid.x_bins) & (0 <= min_row) & (min_row < grid.y_bins)
+        wiring_demand = self.RENT_K * (arrays.cell_fanout[cells][inside] ** self.RENT_P)
+        np.add.at(grid.channels['rent_demand'], (min_col[inside], min_row[inside]), sign * wiring_demand)
+        points = (min_col, min_col, min_row, min_row)
+        return tuple(np.concatenate((bins, point)) for bins, point in zip(boxes[:4], points))
+
+    def _add_net_demand(self, positions, sign):
+        """
+        Add (sign=1) or remove (sign=-1) the standard, weighted and span demand of some nets
+        using their current entries in _net_bin_ranges().
+        Args:
+            positions (np.ndarray): Positions of the nets in _net_bin_ranges().
+            sign (float): 1.0 to add, -1.0 to subtract.
+        Returns:
+            tuple: (min_col, max_col, min_row, max_row) arrays of the bins touched.
+        """
+        nets = self._net_bin_ranges()
+        box = tuple(nets[key][positions] for key in ('min_col', 'max_col', 'min_row', 'max_row'))
+        extents = tuple(e[positions] for e in nets['extents']) if 'extents' in nets else None
+        grid = self.routing_grid
+        grid.add_boxes('net_demand_standard', *self._net_boxes(box, extents, np.full(len(positions), sign)))
+        weighted = sign * np.log1p(nets['fanout'][positions])
+        grid.add_boxes('net_demand_weighted', *self._net_boxes(box, extents, weighted))
+        grid.add_boxes('span_demand', *self._net_boxes(box, extents, sign * nets['span'][positions] / self.grid_size,
+                                                       rudy=True))
+        return box
+
+    def _update_net_bins(self, positions):
+        """
+        Refresh the cached bin ranges and spans of some nets from the design's net boxes.
+        Args:
+            positions (np.ndarray): Positions of the nets in _net_bin_ranges().
+        """
+        grid = self.routing_grid
+        arrays = self.design.get_arrays()
+        nets = self._net_bin_ranges()
+        index = nets['index'][positions]
+        lx, rx = arrays.net_lx[index], arrays.net_rx[index]
+        ly, hy = arrays.net_ly[index], arrays.net_hy[index]
+        nets['min_col'][positions] = grid.col_of(lx)
+        nets['max_col'][positions] = grid.col_of(rx)
+        nets['min_row'][positions] = grid.row_of(ly)
+        nets['max_row'][positions] = grid.row_of(hy)
+        nets['span'][positions] = (rx - lx) + (hy - ly)
+        if 'extents' in nets:
+            for values, new in zip(nets['extents'], (lx, rx, ly, hy)):
+                values[positions] = new
+
+
+class CongestionPyramid:
+    """
+    Congestion maps at several grid sizes from a single estimation pass.
+    Raw demand is estimated once at the finest grid size; every coarser level sums
+    blocks of fine bins (RoutingGrid.pooled) and is then normalized on its own.
+    Pooled net demand counts the fine bins each net box covers inside a coarse bin,
+    so coarse levels weigh nets by covered area rather than counting them once per bin.
+    """
+    def __init__(self, d: Benchmark, grid_sizes, accumulation='difference', workers=1, scratch_dir=None,
+                 memory_budget=256 << 20, demand='bins'):
+        """
+        Initialize the CongestionPyramid.
+        Args:
+            d (Benchmark): The parsed benchmark design object.
+            grid_sizes (list): Grid sizes in microns; all must be integer multiples of the smallest.
+            accumulation (str): CongestionEstimator accumulation mode of the fine pass.
+            workers (int): CongestionEstimator worker processes of the fine pass.
+            scratch_dir (str): Out-of-core mode of every level, see CongestionEstimator.
+            memory_budget (int): Bytes of working memory per tile in out-of-core mode.
+            demand (str): CongestionEstimator demand mode; with 'area', every level matches
+                a direct estimation at its grid size.
+        """
+        self.grid_sizes = sorted(set(grid_sizes))
+        finest = self.grid_sizes[0]
+        self.factors = {}
+        for grid_size in self.grid_sizes:
+            factor = int(round(grid_size / finest))
+            if factor < 1 or abs(factor * finest - grid_size) > 1e-9 * grid_size:
+                raise ValueError(f"Grid size {grid_size} is not a multiple of the finest grid size {finest}")
+            self.factors[grid_size] = factor
+
+        self.estimator = CongestionEstimator(d, grid_size=finest, accumulation=accumulation, workers=workers,
+                                             scratch_dir=scratch_dir, memory_budget=memory_budget, demand=demand)
+        self.levels = {}
+        self.runtimes = {}
+
+    @instrumented('CongestionPyramid.generate', counts=lambda levels, self: {'levels': len(levels)})
+    def generate(self):
+        """
+        Run the fine estimation pass and derive every coarser level from it.
+        Returns:
+            dict: Grid size -> congestion maps of that level.
+        """
+        finest = self.grid_sizes[0]
+        self.levels[finest] = self.estimator.generate_all_congestion_maps()
+        self.runtimes[finest] = dict(self.estimator.runtimes)
+
+        for grid_size in self.grid_sizes[1:]:
+            start_time = time.perf_counter()
+            grid = self.estimator.routing_grid.pooled(self.factors[grid_size])
+            self.levels[grid_size] = CongestionEstimator.normalize(grid)
+            runtime = time.perf_counter() - start_time
+            self.runtimes[grid_size] = {method: runtime for method in CongestionEstimator.METHODS}
+        return self.levels
+
+    def __getitem__(self, grid_size):
+        return self.levels[grid_size]
+
+    def __iter__(self):
+        return iter(self.levels)
+
+    def items(self):
+        return self.levels.items()
+
+    def generate_comparison_reports(self):
+        """
+        Run CongestionAnalyzer on every level.
+        Returns:
+            dict: Grid size -> comparison report (see CongestionAnalyzer.generate_comparison_report).
+        """
+        if not self.levels:
+            self.generate()
+        # Only the finest level ran the estimation stages
+        profiles = {self.grid_sizes[0]: self.estimator.profile}
+        return {grid_size: CongestionAnalyzer(maps, self.runtimes[grid_size],
+                                              profiles.get(grid_size)).generate_comparison_report()
+                for grid_size, maps in self.levels.items()}
+
 
 class CongestionVisualizer:
     """
     Visualizes congestion maps using matplotlib.
     Provides methods for 4-way comparison and single map plotting.
+    With an output directory, figures are rendered headless on the Agg canvas and saved
+    to files instead of shown, so it is safe to use from batch and worker processes.
     """
-    def __init__(self, design_data):
+    def __init__(self, design_data, output_dir=None, formats=('png',), max_pixels=512, dpi=100):
         """
         Initialize the CongestionVisualizer.
         Args:
             design_data: The design or benchmark data for visualization context.
+            output_dir (str): Save figures here instead of showing them.
+            formats (tuple): File formats to save, e.g. ('png', 'svg').
+            max_pixels (int): Grids with more bins per axis are max-pooled down to about this size.
+            dpi (int): Resolution of saved figures.
         """
         self.design = design_data
+        self.output_dir = output_dir
+        self.formats = formats
+        self.max_pixels = max_pixels
+        self.dpi = dpi
         self.cmap = LinearSegmentedColormap.from_list(
             'congestion', ['green', 'yellow', 'red']
         )
 
-    def plot_4way_comparison(self, maps):
+    @staticmethod
+    def downsample(data, max_pixels: int, tile_rows: int = None):
+        """
+        Max-pool a 2D array so neither axis exceeds max_pixels, keeping every hotspot visible.
+        Args:
+            data (np.ndarray): 2D array.
+            max_pixels (int): Maximum size of each axis.
+            tile_rows (int): Pool blocks of about this many rows at a time (rounded to whole
+                blocks), so only one block of an out-of-core map is read at once.
+        Returns:
+            np.ndarray: The pooled array, or data itself if it is small enough.
+        """
+        factor = -(-max(data.shape) // max_pixels)
+        if factor <= 1:
+            return data
+        if tile_rows is not None and tile_rows < data.shape[0]:
+            step = max(tile_rows // factor, 1) * factor
+            return np.concatenate([CongestionVisualizer._pool(data[start:start + step], factor)
+                                   for start in range(0, data.shape[0], step)])
+        return CongestionVisualizer._pool(data, factor)
+
+    @staticmethod
+    def _pool(data, factor: int):
+        """
+        Max-pool both axes of a 2D array by factor.
+        """
+        # One strided maximum per block offset, over whole (contiguous) rows first; the
+        # shorter slices of the last offsets leave partial edge blocks with only their own bins
+        pooled = data[::factor].copy()
+        for offset in range(1, factor):
+            part = data[offset::factor]
+            np.maximum(pooled[:part.shape[0]], part, out=pooled[:part.shape[0]])
+
+        blocks = pooled[:, ::factor].copy()
+        for offset in range(1, factor):
+            part = pooled[:, offset::factor]
+            np.maximum(blocks[:, :part.shape[1]], part, out=blocks[:, :part.shape[1]])
+        return blocks
+
+    @instrumented('CongestionVisualizer.plot_4way_comparison',
+                  counts=lambda _, self, maps, name=None: {'bins': sum(m.x_bins * m.y_bins for m in maps.values())})
+    def plot_4way_comparison(self, maps, name=None):
         """
         Plot a 4-way comparison of all congestion estimation methods.
         Args:
             maps (dict): Dictionary of congestion maps for each method.
+            name (str): File name stem in headless mode; defaults to <design>_g<grid size>_4way.
+        Returns:
+            list: Paths of the saved files (empty when shown interactively).
         """
-        plt.figure(figsize=(16,12))
+        fig = self._figure(figsize=(16,12))
         titles = [
             "Standard (Uniform Nets)",
             "Fanout-Weighted",
@@ -244,116 +1126,225 @@ class CongestionVisualizer:
         ]
 
         for i, (method, title) in enumerate(zip(maps.keys(), titles), 1):
-            plt.subplot(2,2,i)
-            self._plot_single_map(maps[method])
-            plt.title(title)
+            ax = fig.add_subplot(2,2,i)
+            self._draw_map(fig, ax, maps[method])
+            ax.set_title(title)
 
-        plt.tight_layout()
-        plt.show()
-    
-    def _plot_single_map(self, congestion_map):
+        if name is None:
+            grid_size = next(iter(maps.values()))['grid_size']
+            name = f"{self._design_name()}_g{grid_size}_4way"
+        return self._finish(fig, name)
+
+    @instrumented('CongestionVisualizer.plot_pyramid', counts=lambda _, self, pyramid, method='standard', name=None: {
+        'bins': sum(maps[method].x_bins * maps[method].y_bins for maps in pyramid.levels.values())})
+    def plot_pyramid(self, pyramid: CongestionPyramid, method='standard', name=None):
+        """
+        Plot one method's congestion map at every level of a pyramid, side by side.
+        Args:
+            pyramid (CongestionPyramid): Generated pyramid.
+            method (str): Method to plot.
+            name (str): File name stem in headless mode; defaults to <design>_pyramid_<method>.
+        Returns:
+            list: Paths of the saved files (empty when shown interactively).
+        """
+        fig = self._figure(figsize=(6 * len(pyramid.levels), 5))
+        for i, (grid_size, maps) in enumerate(pyramid.items(), 1):
+            ax = fig.add_subplot(1, len(pyramid.levels), i)
+            self._draw_map(fig, ax, maps[method])
+            ax.set_title(f"{method} - grid {grid_size}")
+
+        return self._finish(fig, name or f"{self._design_name()}_pyramid_{method}")
+
+    def _design_name(self):
+        return getattr(self.design, 'name', 'design')
+
+    def _figure(self, figsize):
+        """
+        New figure: a pyplot figure when showing, a standalone Agg figure when saving.
+        """
+        if self.output_dir is None:
+            return plt.figure(figsize=figsize)
+        fig = Figure(figsize=figsize, dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        return fig
+
+    def _finish(self, fig, name: str):
+        """
+        Show the figure, or save it in every format to the output directory.
+        Returns:
+            list: Paths of the saved files.
         """
-        Plot a single congestion map as a heatmap.
+        if self.output_dir is None:
+            fig.tight_layout()
+            plt.show()
+            return []
+
+        # Fixed margins (in inches) instead of tight_layout, which renders the figure an extra time
+        width, height = fig.get_size_inches()
+        fig.subplots_adjust(left=0.8 / width, right=1 - 0.2 / width, bottom=0.6 / height, top=1 - 0.4 / height,
+                            wspace=0.15, hspace=0.2)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for fmt in self.formats:
+            path = os.path.join(self.output_dir, f"{name}.{fmt}")
+            # Fast zlib level: heatmaps compress well enough and encoding dominates otherwise
+            options = {'pil_kwargs': {'compress_level': 1}} if fmt == 'png' else {}
+            fig.savefig(path, format=fmt, **options)
+            paths.append(path)
+        return paths
+
+    def _draw_map(self, fig, ax, congestion_map):
+        """
+        Draw a congestion map as a heatmap on the given axes.
         Args:
-            congestion_map (dict): Congestion map to plot.
+            fig (Figure): Figure holding the axes, for the colorbar.
+            ax (Axes): Axes to draw on.
+            congestion_map (CongestionMap): Congestion map to plot.
         """
         rows = congestion_map['y_bins']
         cols = congestion_map['x_bins']
-        data = np.zeros((rows, cols))
-        
-        for x in range(cols):
-            for y in range(rows):
-                data[y, x] = congestion_map['cells'][x][y]['congestion']
-        
-        plt.imshow(data, cmap=self.cmap, aspect='auto',
-                  extent=[0, cols*congestion_map['grid_size'], 
-                         0, rows*congestion_map['grid_size']],
-                  origin='lower', vmin=0, vmax=1)
-        plt.colorbar(label='Congestion Level')
-        plt.xlabel('X Position (μm)')
-        plt.ylabel('Y Position (μm)')
-        plt.grid(True, alpha=0.3)
+        grid = getattr(congestion_map, 'grid', None)
+        tile_rows = grid.tile_cols if grid is not None and grid.out_of_core else None
+        # (col, row) -> image (y, x)
+        data = self.downsample(congestion_map['congestion'], self.max_pixels, tile_rows).T
+
+        image = ax.imshow(data, cmap=self.cmap, aspect='auto', interpolation='nearest',
+                          extent=[0, cols*congestion_map['grid_size'],
+                                  0, rows*congestion_map['grid_size']],
+                          origin='lower', vmin=0, vmax=1)
+        fig.colorbar(image, ax=ax, label='Congestion Level')
+        ax.set_xlabel('X Position (μm)')
+        ax.set_ylabel('Y Position (μm)')
+        ax.grid(True, alpha=0.3)
+
+    def _plot_single_map(self, congestion_map):
+        """
+        Plot a single congestion map as a heatmap on the current pyplot axes.
+        Args:
+            congestion_map (CongestionMap): Congestion map to plot.
+        """
+        self._draw_map(plt.gcf(), plt.gca(), congestion_map)
 
     
 class CongestionAnalyzer:
     """
     Analyzes and compares congestion maps, generating metrics and correlation matrices.
     """
-    def __init__(self, congestion_maps, runtimes):
+    def __init__(self, congestion_maps, runtimes, profile=None):
         """
         Initialize the CongestionAnalyzer.
         Args:
             congestion_maps (dict): Congestion maps for each method.
             runtimes (dict): Runtime information for each method.
+            profile (dict): Instrumentation record of each method's estimation stage
+                (CongestionEstimator.profile); adds CPU, memory and bin counts to the metrics.
         """
         self.maps = congestion_maps
         self.runtimes = runtimes
+        self.profile = profile or {}
     
-    def generate_comparison_report(self):
+    @instrumented('CongestionAnalyzer.generate_comparison_report', counts=lambda _, self, spearman=False: {
+        'methods': len(self.maps), 'bins': sum(m.x_bins * m.y_bins for m in self.maps.values())})
+    def generate_comparison_report(self, spearman=False):
         """
         Generate comprehensive comparison metrics and correlation matrix for all methods.
+        All statistics are reductions over (methods, bins) arrays of congestion values,
+        read one column tile at a time for out-of-core maps.
+        Args:
+            spearman (bool): Also compute the Spearman rank correlation matrix; ranking
+                needs every method's full map in memory at once.
         Returns:
-            dict: Contains metrics DataFrame and correlation DataFrame.
-        """
-        metrics = []
-        
-        for method, cmap in self.maps.items():
-            congestion_vals = [c['congestion'] for row in cmap['cells'] for c in row]
-            metrics.append({
-                'Method': method,
-                'Runtime (s)': self.runtimes.get(method, 0),
-                'Max Congestion': max(congestion_vals),
-                'Mean Congestion': np.mean(congestion_vals),
-                'Std Dev': np.std(congestion_vals),
-                'Hotspots (>0.8)': sum(c > 0.8 for c in congestion_vals),
-                'Hotspots (>0.9)': sum(c > 0.9 for c in congestion_vals)
-            })
-        
-        df = pd.DataFrame(metrics)
-        
-        # Add correlation matrix
-        corr_matrix = np.zeros((len(self.maps), len(self.maps)))
+            dict: Contains metrics DataFrame, correlation DataFrame and, if requested,
+                spearman DataFrame.
+        """
         methods = list(self.maps.keys())
-        for i, m1 in enumerate(methods):
-            for j, m2 in enumerate(methods):
-                vals1 = [c['congestion'] for row in self.maps[m1]['cells'] for c in row]
-                vals2 = [c['congestion'] for row in self.maps[m2]['cells'] for c in row]
-                corr_matrix[i,j] = pearsonr(vals1, vals2)[0]
-        
-        corr_df = pd.DataFrame(corr_matrix, index=methods, columns=methods)
-        
-        return {
+        maps = [self.maps[method]['congestion'] for method in methods]
+        grid = getattr(self.maps[methods[0]], 'grid', None)
+        count = maps[0].size
+        sums, gram, shift, maxima, hot_8, hot_9 = 0, 0, None, [], 0, 0
+        for tile in grid.tiles() if grid is not None else [slice(None)]:
+            values = np.stack([congestion[tile].ravel() for congestion in maps])
+            maxima.append(values.max(axis=1))
+            hot_8 = hot_8 + np.count_nonzero(values > 0.8, axis=1)
+            hot_9 = hot_9 + np.count_nonzero(values > 0.9, axis=1)
+            if shift is None:
+                shift = values.mean(axis=1)  # The first tile's means stand in for the global ones
+            values -= shift[:, None]
+            sums = sums + values.sum(axis=1)
+            gram = gram + values @ values.T
+        mean, covariance = self.covariance(sums, gram, count, shift)
+        std = np.sqrt(np.diag(covariance))
+
+        df = pd.DataFrame({
+            'Method': methods,
+            'Runtime (s)': [self.runtimes.get(method, 0) for method in methods],
+            'Max Congestion': np.max(maxima, axis=0),
+            'Mean Congestion': mean,
+            'Std Dev': std,
+            'Hotspots (>0.8)': hot_8,
+            'Hotspots (>0.9)': hot_9
+        })
+        if self.profile:
+            records = [self.profile.get(method) or {} for method in methods]
+            peaks = [record.get('peak') for record in records]
+            df['CPU (s)'] = [record.get('cpu') for record in records]
+            df['Peak Memory (MB)'] = [None if peak is None else peak / 1e6 for peak in peaks]
+            df['Bins Touched'] = [record.get('counts', {}).get('bins_touched') for record in records]
+
+        report = {
             'metrics': df,
-            'correlation': corr_df
+            'correlation': pd.DataFrame(self.correlation(covariance), index=methods, columns=methods)
         }
-        
-def setup_logging(log_file_path):
-    """
-    Redirect stdout and stderr to a log file with a timestamp.
-    Args:
-        log_file_path (str): Directory path to save the log file.
-    Returns:
-        str: Path to the created log file.
-    """
-    class Logger(object):
-        def __init__(self, filename):
-            self.terminal = sys.stdout
-            self.log = open(filename, "a")
+        if spearman:
+            # Rank each method once; Spearman is Pearson on the ranks
+            ranks = np.stack([rankdata(congestion.ravel()) for congestion in maps])
+            report['spearman'] = pd.DataFrame(self.correlation(self.moments(ranks)[1]),
+                                              index=methods, columns=methods)
+        return report
 
-        def write(self, message):
-            self.terminal.write(message)
-            self.log.write(message)
+    @staticmethod
+    def moments(values):
+        """
+        Means and population covariance of the rows of a (methods, bins) array held in memory.
+        Args:
+            values (np.ndarray): One row of values per method.
+        Returns:
+            tuple: (mean, covariance) arrays.
+        """
+        return values.mean(axis=1), np.atleast_2d(np.cov(values, bias=True))
 
-        def flush(self):
-            pass
+    @staticmethod
+    def covariance(sums, gram, count: int, shift=None):
+        """
+        Means and population covariance from the row sums and Gram matrix of shifted rows
+        (values minus shift), which can be accumulated tile by tile. The shortcut
+        gram / count - outer(mean, mean) cancels catastrophically when the mean is large
+        next to the spread; shifting every row by an estimate of its mean (such as the
+        first tile's) keeps it accurate for data on any offset, not just maps in [0, 1].
+        Args:
+            sums (np.ndarray): Sum of each shifted row.
+            gram (np.ndarray): Gram matrix of the shifted rows.
+            count (int): Number of columns.
+            shift (np.ndarray): Value subtracted from each row before accumulating; None for zero.
+        Returns:
+            tuple: (mean, covariance) arrays.
+        """
+        offset = sums / count
+        covariance = gram / count - np.outer(offset, offset)
+        diagonal = np.diag_indices(len(offset))
+        covariance[diagonal] = np.maximum(covariance[diagonal], 0)  # Rounding can dip below zero
+        return (offset if shift is None else offset + shift), covariance
 
-    # Create log file with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = f"{log_file_path}/congestion_analysis_{timestamp}.log"
-    
-    sys.stdout = Logger(log_file)
-    sys.stderr = sys.stdout  # Redirect stderr to the same file
-    
-    print(f"Logging initialized at {datetime.now()}")
-    print(f"Log file: {log_file}")
-    return log_file
+    @staticmethod
+    def correlation(covariance):
+        """
+        Pearson correlation matrix from a covariance matrix; constant methods give NaN.
+        Args:
+            covariance (np.ndarray): Covariance matrix.
+        Returns:
+            np.ndarray: Correlation matrix.
+        """
+        std = np.sqrt(np.diag(covariance))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.clip(covariance / np.outer(std, std), -1, 1)
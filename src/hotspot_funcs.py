@@ -0,0 +1,204 @@
+# Packages
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import ndimage
+
+
+def bin_centers(congestion_map, cols, rows):
+    """
+    Die coordinates of bin centers.
+    Args:
+        congestion_map: CongestionMap or RoutingGrid the bins belong to.
+        cols, rows (np.ndarray): Bin columns and rows (may be fractional, e.g. centroids).
+    Returns:
+        tuple: (x, y) arrays in microns.
+    """
+    grid_size = congestion_map['grid_size']
+    return (congestion_map['min_x'] + (np.asarray(cols) + 0.5) * grid_size,
+            congestion_map['min_y'] + (np.asarray(rows) + 0.5) * grid_size)
+
+
+def top_indices(values, k=None, threshold=None):
+    """
+    Flat indices of the largest values, in descending order (ties by index).
+    Uses argpartition, so only the selected values are sorted.
+    Args:
+        values (np.ndarray): Flat values.
+        k (int): Keep at most k values.
+        threshold (float): Keep only values >= threshold.
+    Returns:
+        np.ndarray: Selected flat indices.
+    """
+    if k is not None:
+        if k < 0:
+            raise ValueError(f"k must be non-negative, got {k}")
+        if k == 0:
+            return np.zeros(0, dtype=np.int64)
+    if threshold is None and k is not None and k < len(values):
+        threshold = _rank_bound(values, k)
+    candidates = np.flatnonzero(values >= threshold) if threshold is not None else None
+    selected = values if candidates is None else values[candidates]
+    if k is not None and k < len(selected):
+        index = np.argpartition(selected, len(selected) - k)[-k:]
+    else:
+        index = np.arange(len(selected))
+    if candidates is not None:
+        index = candidates[index]
+    return index[np.lexsort((index, -values[index]))]
+
+
+def _rank_bound(values, k: int, sample_size=1 << 16):
+    """
+    Cheap lower bound on the k-th largest value, from a strided sample.
+    Pre-filtering with it keeps argpartition off the long runs of equal values
+    (mostly zeros) congestion maps have, where its selection slows down badly.
+    Returns:
+        float: A value with at least k values >= it, or None if none was found.
+    """
+    step = max(len(values) // sample_size, 1)
+    sample = values[::step]
+    # Expect about (rank * step) values above the sample's rank-th largest; widen if the sample was unlucky
+    rank = k // step + 2
+    while rank <= len(sample):
+        bound = np.partition(sample, len(sample) - rank)[len(sample) - rank]
+        above = np.count_nonzero(values > bound)
+        if above >= k:
+            return np.nextafter(bound, np.inf)
+        if above + np.count_nonzero(values == bound) >= k:
+            return bound
+        rank *= 4
+    return None
+
+
+def top_bins(congestion_map, k=None, threshold=None, channel='congestion'):
+    """
+    Most congested bins of a map, by rank and/or threshold.
+    Args:
+        congestion_map (CongestionMap): Map to search.
+        k (int): Keep at most k bins.
+        threshold (float): Keep only bins whose value is >= threshold.
+        channel (str): Channel to rank by.
+    Returns:
+        pd.DataFrame: One row per bin with its column, row, die coordinates and value.
+    """
+    if k is None and threshold is None:
+        raise ValueError("Give k, threshold or both")
+    values = congestion_map[channel]
+    index = top_indices(values.ravel(), k, threshold)
+    cols, rows = np.unravel_index(index, values.shape)
+    x, y = bin_centers(congestion_map, cols, rows)
+    return pd.DataFrame({'Col': cols, 'Row': rows, 'X': x, 'Y': y, 'Value': values.ravel()[index]})
+
+
+def hotspot_regions(congestion_map, threshold=0.8, diagonal=False, channel='congestion'):
+    """
+    Connected regions of bins at or above a threshold.
+    Args:
+        congestion_map (CongestionMap): Map to search.
+        threshold (float): Minimum value of a hotspot bin.
+        diagonal (bool): Also connect diagonally adjacent bins (8-connectivity).
+        channel (str): Channel to threshold.
+    Returns:
+        pd.DataFrame: One row per region, by descending peak, with its size, area,
+            peak and mean value, peak bin, centroid (bins and die coordinates) and bin range.
+    """
+    values = congestion_map[channel]
+    structure = np.ones((3, 3), dtype=bool) if diagonal else None
+    labels, count = ndimage.label(values >= threshold, structure=structure)
+    if count == 0:
+        return pd.DataFrame(columns=['Region', 'Bins', 'Area (um^2)', 'Peak', 'Mean', 'Peak Col', 'Peak Row',
+                                     'Centroid Col', 'Centroid Row', 'Centroid X', 'Centroid Y',
+                                     'Min Col', 'Max Col', 'Min Row', 'Max Row'])
+
+    # Per-region reductions over the hotspot bins only, all linear (no sorting)
+    hot = np.flatnonzero(labels)
+    region = labels.ravel()[hot] - 1
+    hot_values = values.ravel()[hot]
+    cols, rows = np.unravel_index(hot, values.shape)
+    size = np.bincount(region, minlength=count)
+    total = np.bincount(region, weights=hot_values, minlength=count)
+    centroid_col = np.bincount(region, weights=cols, minlength=count) / size
+    centroid_row = np.bincount(region, weights=rows, minlength=count) / size
+
+    peak = np.full(count, -np.inf)
+    np.maximum.at(peak, region, hot_values)
+    at_peak = np.flatnonzero(hot_values == peak[region])
+    first = np.full(count, len(hot))
+    np.minimum.at(first, region[at_peak], at_peak)
+    peak_col, peak_row = cols[first], rows[first]
+
+    regions = np.arange(1, count + 1)
+    ranges = np.array([(c.start, c.stop - 1, r.start, r.stop - 1) for c, r in ndimage.find_objects(labels)])
+    x, y = bin_centers(congestion_map, centroid_col, centroid_row)
+
+    df = pd.DataFrame({
+        'Region': regions,
+        'Bins': size,
+        'Area (um^2)': size * congestion_map['grid_size'] ** 2,
+        'Peak': peak,
+        'Mean': total / size,
+        'Peak Col': peak_col,
+        'Peak Row': peak_row,
+        'Centroid Col': centroid_col,
+        'Centroid Row': centroid_row,
+        'Centroid X': x,
+        'Centroid Y': y,
+        'Min Col': ranges[:, 0],
+        'Max Col': ranges[:, 1],
+        'Min Row': ranges[:, 2],
+        'Max Row': ranges[:, 3]
+    })
+    return df.sort_values(['Peak', 'Bins'], ascending=False, kind='stable').reset_index(drop=True)
+
+
+def divergence_bins(congestion_maps, method_a: str, method_b: str, k=10):
+    """
+    Bins where two methods disagree most.
+    Args:
+        congestion_maps (dict): Congestion maps for each method.
+        method_a, method_b (str): Methods to compare.
+        k (int): Number of bins to return.
+    Returns:
+        pd.DataFrame: One row per bin with its position, both congestion values and their
+            difference (a - b), by descending absolute difference.
+    """
+    a = congestion_maps[method_a]['congestion'].ravel()
+    b = congestion_maps[method_b]['congestion'].ravel()
+    difference = a - b
+    index = top_indices(np.abs(difference), k)
+    cols, rows = np.unravel_index(index, congestion_maps[method_a].shape)
+    x, y = bin_centers(congestion_maps[method_a], cols, rows)
+    return pd.DataFrame({'Col': cols, 'Row': rows, 'X': x, 'Y': y,
+                         method_a: a[index], method_b: b[index], 'Difference': difference[index]})
+
+
+def divergence_ranking(congestion_maps, threshold=0.8):
+    """
+    Rank every pair of methods by how much their maps disagree.
+    Args:
+        congestion_maps (dict): Congestion maps for each method.
+        threshold (float): Hotspot threshold for the hotspot agreement columns.
+    Returns:
+        pd.DataFrame: One row per pair with mean and max absolute difference, hotspot bins
+            flagged by only one of the two and their Jaccard overlap, by descending mean difference.
+    """
+    hot = {method: congestion_map['congestion'] >= threshold for method, congestion_map in congestion_maps.items()}
+    records = []
+    for method_a, method_b in combinations(congestion_maps.keys(), 2):
+        difference = np.abs(congestion_maps[method_a]['congestion'] - congestion_maps[method_b]['congestion'])
+        union = np.count_nonzero(hot[method_a] | hot[method_b])
+        both = np.count_nonzero(hot[method_a] & hot[method_b])
+        records.append({
+            'Method A': method_a,
+            'Method B': method_b,
+            'Mean Abs Difference': difference.mean(),
+            'Max Abs Difference': difference.max(),
+            f'Hotspot Mismatch (>{threshold})': union - both,
+            'Hotspot Jaccard': both / union if union else 1.0
+        })
+    df = pd.DataFrame(records)
+    if not df.empty:
+        df = df.sort_values('Mean Abs Difference', ascending=False, kind='stable').reset_index(drop=True)
+    return df
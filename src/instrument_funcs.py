@@ -0,0 +1,180 @@
+# Packages
+import functools
+import json
+import os
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Set to 1 (timing and memory) or 'time' (timing only) to instrument a run without code changes
+ENV_VAR = 'CONGESTION_INSTRUMENT'
+
+_enabled = False
+_memory = False
+_started_tracemalloc = False
+_records = []
+_stack = []
+
+
+class _Stage:
+    """
+    One timed stage; nested stages record their parent and depth.
+    """
+    __slots__ = ('record', 'start_wall', 'start_cpu', 'start_memory', 'peak')
+
+    def __init__(self, name: str, counts: dict):
+        self.record = {'stage': name, 'parent': None, 'depth': 0, 'counts': dict(counts)}
+
+    def count(self, **counts):
+        """
+        Add item counts (cells, nets, bins touched...) to the stage.
+        """
+        self.record['counts'].update(counts)
+
+    def __enter__(self):
+        if _stack:
+            self.record['parent'] = _stack[-1].record['stage']
+            self.record['depth'] = len(_stack)
+        if _memory:
+            # tracemalloc keeps a single peak, so fold it into the enclosing stage before resetting
+            current, peak = tracemalloc.get_traced_memory()
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.start_memory = self.peak = current
+        _stack.append(self)
+        self.start_cpu = time.process_time()
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        _stack.pop()
+        self.record.update(wall=wall, cpu=cpu, allocated=None, peak=None)
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            self.record.update(allocated=current - self.start_memory, peak=self.peak - self.start_memory)
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, self.peak)
+        _records.append(self.record)
+        return False
+
+
+def enable(memory=True):
+    """
+    Start recording stages.
+    Args:
+        memory (bool): Also trace Python and NumPy allocations with tracemalloc (slower).
+    """
+    global _enabled, _memory, _started_tracemalloc
+    _enabled = True
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+
+
+def disable():
+    """
+    Stop recording stages; records made so far are kept.
+    """
+    global _enabled, _memory, _started_tracemalloc
+    _enabled = False
+    _memory = False
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """
+    Drop all records.
+    """
+    _records.clear()
+
+
+def records():
+    """
+    Returns:
+        list: Stage records, in completion order (nested stages before their parent).
+    """
+    return list(_records)
+
+
+def last(name: str):
+    """
+    Returns:
+        dict: The most recent record of a stage, or None.
+    """
+    return next((record for record in reversed(_records) if record['stage'] == name), None)
+
+
+def instrumented(name: str, counts=None):
+    """
+    Decorator timing every call of a function as a stage.
+    Args:
+        name (str): Stage name.
+        counts (callable): Called as counts(result, *args, **kwargs) after the stage, outside
+            its timing, to return a dict of item counts.
+    Returns:
+        callable: Decorator.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name, {}) as timed:
+                result = func(*args, **kwargs)
+            if counts is not None:
+                timed.count(**counts(result, *args, **kwargs))
+            return result
+        return wrapper
+    return decorator
+
+
+def to_dataframe(stage_records=None):
+    """
+    Stage records as a table, one column per item count.
+    Args:
+        stage_records (list): Records to tabulate (default: all).
+    Returns:
+        pd.DataFrame: Stage, parent, depth, wall and CPU seconds, allocated and peak MB, counts.
+    """
+    stage_records = records() if stage_records is None else stage_records
+    rows = []
+    for record in stage_records:
+        allocated, peak = record['allocated'], record['peak']
+        rows.append({
+            'Stage': record['stage'],
+            'Parent': record['parent'],
+            'Depth': record['depth'],
+            'Wall (s)': record['wall'],
+            'CPU (s)': record['cpu'],
+            'Allocated (MB)': None if allocated is None else allocated / 1e6,
+            'Peak (MB)': None if peak is None else peak / 1e6,
+            **record['counts']
+        })
+    return pd.DataFrame(rows)
+
+
+def export_json(path: str, stage_records=None):
+    """
+    Write stage records to a JSON file.
+    Args:
+        path (str): Output file.
+        stage_records (list): Records to write (default: all).
+    """
+    with open(path, 'w') as file:
+        json.dump(records() if stage_records is None else stage_records, file, indent=1, default=int)
+
+
+if os.environ.get(ENV_VAR, '').lower() not in ('', '0', 'false'):
+    enable(memory=os.environ[ENV_VAR].lower() != 'time')
@@ -0,0 +1,251 @@
+# Packages
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+# Every module logs under this logger, so configuring it never touches the root logger or sys streams
+LOGGER_NAME = 'congestion'
+
+_design = ContextVar('design', default=None)
+_queue = None
+_listener = None
+_level = logging.INFO
+
+
+def get_logger(name: str):
+    """
+    Logger of a module, under the package logger.
+    Args:
+        name (str): Module name, usually __name__.
+    Returns:
+        logging.Logger: The module logger.
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+@contextmanager
+def design_context(name: str):
+    """
+    Tag every record logged inside the block (in this thread or task) with a design name,
+    which routes it to that design's log files.
+    Args:
+        name (str): Design name.
+    """
+    token = _design.set(name)
+    try:
+        yield
+    finally:
+        _design.reset(token)
+
+
+@contextmanager
+def silenced():
+    """
+    Drop every package record logged inside the block, on the console and in the log files,
+    by raising the package logger's level; records logged by worker processes are not affected.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    level = logger.level
+    logger.setLevel(logging.CRITICAL + 1)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+class _DesignFilter(logging.Filter):
+    """
+    Adds the current design (see design_context) to records that do not carry one.
+    """
+    def filter(self, record):
+        if getattr(record, 'design', None) is None:
+            record.design = _design.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record: time, level, logger, design, message and, if the record
+    was logged with extra={'data': {...}}, its structured fields (stage timings, metrics...).
+    """
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'design': getattr(record, 'design', None),
+            'message': record.getMessage()
+        }
+        data = getattr(record, 'data', None)
+        if data is not None:
+            entry['data'] = data
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DesignFileHandler(logging.Handler):
+    """
+    Writes each record tagged with a design to <log_dir>/<design>.log and, if structured,
+    <log_dir>/<design>.jsonl. Only the most recently used files are kept open.
+    """
+    def __init__(self, log_dir: str, structured=True, max_open=32):
+        """
+        Args:
+            log_dir (str): Folder of the per-design files.
+            structured (bool): Also write the JSON lines file.
+            max_open (int): Designs whose files are kept open at once.
+        """
+        super().__init__()
+        self.log_dir = log_dir
+        self.structured = structured
+        self.max_open = max_open
+        self.json_formatter = JsonFormatter()
+        self.files = OrderedDict()
+
+    def _files(self, design: str):
+        if design in self.files:
+            self.files.move_to_end(design)
+            return self.files[design]
+        if len(self.files) >= self.max_open:
+            for file in self.files.popitem(last=False)[1]:
+                file.close()
+        name = design.replace(os.sep, '_')
+        files = [open(f"{self.log_dir}/{name}.log", 'a')]
+        if self.structured:
+            files.append(open(f"{self.log_dir}/{name}.jsonl", 'a'))
+        self.files[design] = files
+        return files
+
+    def emit(self, record):
+        design = getattr(record, 'design', None)
+        if design is None:
+            return
+        try:
+            files = self._files(design)
+            files[0].write(self.format(record) + '\n')
+            if self.structured:
+                files[1].write(self.json_formatter.format(record) + '\n')
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        for files in self.files.values():
+            for file in files:
+                file.flush()
+
+    def close(self):
+        for files in self.files.values():
+            for file in files:
+                file.close()
+        self.files.clear()
+        super().close()
+
+
+def _package_logger(handler, level):
+    """
+    Route the package logger to a single handler.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    handler.addFilter(_DesignFilter())
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def _console_handler():
+    """
+    Plain console output, as the messages looked when they were printed.
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    return handler
+
+
+def start_logging(log_dir: str, level=logging.INFO, console=True, per_design=True, structured=True):
+    """
+    Start the queue-based logging backend. Loggers only put records on a queue; a background
+    thread formats them and writes the console, the run log and the per-design files, so
+    logging never blocks on I/O. Worker processes join in through worker_initializer().
+    Args:
+        log_dir (str): Folder of the log files.
+        level (int or str): Minimum level logged.
+        console (bool): Also echo records to stdout.
+        per_design (bool): Also write <design>.log files for records tagged with a design.
+        structured (bool): Write JSON lines files (run and per design) next to the text logs.
+    Returns:
+        str: Path of the run log file.
+    """
+    global _queue, _listener, _level
+    stop_logging()
+    os.makedirs(log_dir, exist_ok=True)
+    _level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_file = f"{log_dir}/congestion_analysis_{timestamp}.log"
+    text_formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    handlers = [logging.FileHandler(log_file)]
+    handlers[0].setFormatter(text_formatter)
+    if structured:
+        handlers.append(logging.FileHandler(f"{log_dir}/congestion_analysis_{timestamp}.jsonl"))
+        handlers[-1].setFormatter(JsonFormatter())
+    if per_design:
+        handlers.append(DesignFileHandler(log_dir, structured))
+        handlers[-1].setFormatter(text_formatter)
+    if console:
+        handlers.append(_console_handler())
+
+    # A multiprocessing queue, so records of pool workers reach the same listener
+    _queue = multiprocessing.Queue(-1)
+    _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    _package_logger(logging.handlers.QueueHandler(_queue), _level)
+
+    get_logger(__name__).info(f"Logging initialized at {datetime.now()}")
+    get_logger(__name__).info(f"Log file: {log_file}")
+    return log_file
+
+
+def stop_logging():
+    """
+    Flush and stop the logging backend, and go back to plain console output.
+    """
+    global _queue, _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _queue.close()
+        _queue.join_thread()
+        _queue = _listener = None
+    _package_logger(_console_handler(), _level)
+
+
+def worker_initializer():
+    """
+    Process pool initializer that sends the workers' records to this process' backend.
+    Returns:
+        tuple: (initializer, initargs) for ProcessPoolExecutor, or (None, ()) when logging is not started.
+    """
+    if _queue is None:
+        return None, ()
+    return _init_worker, (_queue, _level)
+
+
+def _init_worker(queue, level):
+    _package_logger(logging.handlers.QueueHandler(queue), level)
+
+
+_package_logger(_console_handler(), _level)
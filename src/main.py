@@ -1,62 +1,166 @@
 # Packages
+import argparse
 import os
+import sys
+from datetime import datetime
 
 # Project imports
 from c_benchmark import Benchmark
 from congestion_funcs import *
+import instrument_funcs
+from batch_funcs import expand_designs, run_batch
+from hotspot_funcs import divergence_bins, divergence_ranking, hotspot_regions
+from log_funcs import design_context, get_logger, start_logging, stop_logging
 
+logger = get_logger(__name__)
 
-def main():
-    path = ""  # Set your benchmark path here
+
+def parse_args(argv=None):
+    """
+    Parse the command-line arguments.
+    Args:
+        argv (list): Arguments to parse, defaults to sys.argv.
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Early-stage routing congestion prediction for Bookshelf benchmarks.")
+    parser.add_argument('designs', nargs='+',
+                        help="Benchmark folders or glob patterns (quote globs, e.g. 'ispd/*').")
+    parser.add_argument('-g', '--grid-sizes', nargs='+', type=float, default=[500],
+                        help="Grid cell sizes in microns (default: 500).")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Number of worker processes (default: CPU count).")
+    parser.add_argument('--log-dir', default="logs", help="Directory for logs and CSV reports.")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help="Minimum level of logged messages (default: INFO).")
+    parser.add_argument('--accumulation', choices=CongestionEstimator.ACCUMULATION_MODES, default='difference',
+                        help="Demand accumulation mode of the estimator.")
+    parser.add_argument('--demand', choices=CongestionEstimator.DEMAND_MODES, default='bins',
+                        help="Give demand to every touched bin ('bins', default) or by exact overlap area ('area').")
+    parser.add_argument('--tile-workers', type=int, default=1,
+                        help="Worker processes per estimator for tile-parallel accumulation (default: 1).")
+    parser.add_argument('--scratch-dir', default=None, metavar='DIR',
+                        help="Out-of-core mode: keep demand grids and congestion maps in memory-mapped files in DIR.")
+    parser.add_argument('--memory-budget', type=int, default=256, metavar='MB',
+                        help="Working memory per tile in out-of-core mode, in MB (default: 256).")
+    parser.add_argument('--pyramid', action='store_true',
+                        help="Estimate once at the smallest grid size and derive the others by pooling.")
+    parser.add_argument('--render', nargs='?', const=True, default=None, metavar='DIR',
+                        help="Save 4-way heatmaps of every job, optionally in DIR (default: <log-dir>/heatmaps).")
+    parser.add_argument('--formats', nargs='+', default=['png'], choices=['png', 'svg', 'pdf'],
+                        help="Heatmap file formats (default: png).")
+    parser.add_argument('--cache', nargs='?', const=True, default=None, metavar='DIR',
+                        help="Cache parsed designs, optionally in DIR.")
+    parser.add_argument('--instrument', nargs='?', const='memory', default=None, choices=['time', 'memory'],
+                        help="Record wall/CPU time, memory ('memory', default) and item counts of every stage "
+                             f"(or set {instrument_funcs.ENV_VAR}=1).")
+    parser.add_argument('--interactive', action='store_true',
+                        help="Run each job in this process and show its plots instead of batching.")
+    args = parser.parse_args(argv)
+    args.grid_sizes = [int(g) if float(g).is_integer() else g for g in args.grid_sizes]
+    return args
+
+
+def analyze_design(path, grid_size, log_dir, accumulation='difference', tile_workers=1, scratch_dir=None,
+                   memory_budget=256 << 20, demand='bins'):
+    """
+    Analyze a single design in this process, with plots and divergence report.
+    Args:
+        path (str): Benchmark folder.
+        grid_size: Grid cell size in microns.
+        log_dir (str): Directory for the log and CSV reports.
+        accumulation (str): CongestionEstimator accumulation mode.
+        tile_workers (int): CongestionEstimator worker processes.
+        scratch_dir (str): CongestionEstimator out-of-core scratch directory.
+        memory_budget (int): CongestionEstimator out-of-core tile budget in bytes.
+        demand (str): CongestionEstimator demand mode.
+    """
+    instrument_funcs.reset()
     d = Benchmark(path)
-    d.generate_benchmark()
-    
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = setup_logging(log_dir)
-    print(f'Design: {d.name}')
+    with design_context(d.name):
+        d.generate_benchmark(nets=accumulation != 'stream')
+        logger.info(f'Design: {d.name}')
+
+        try:
+            estimator = CongestionEstimator(d, grid_size=grid_size, accumulation=accumulation, workers=tile_workers,
+                                            scratch_dir=scratch_dir, memory_budget=memory_budget, demand=demand)
+            logger.info('Calculating congestion maps...')
+            congestion_maps = estimator.generate_all_congestion_maps()
+
+            visualizer = CongestionVisualizer(d)
+            logger.info('Generating visualizations...')
+            visualizer.plot_4way_comparison(congestion_maps)
+
+            analyzer = CongestionAnalyzer(congestion_maps, estimator.runtimes, estimator.profile)
+            report = analyzer.generate_comparison_report()
+
+            logger.info("\n=== Method Comparison Metrics ===\n" + report['metrics'].to_string())
+            logger.info("\n=== Correlation Between Methods ===\n" + report['correlation'].to_string())
+
+            # Get cells where methods disagree most
+            logger.info("\n=== Divergence Between Methods ===\n" + divergence_ranking(congestion_maps).to_string())
+            logger.info("\n=== Top 10 Divergence Locations (standard vs rents) ===\n" +
+                        divergence_bins(congestion_maps, 'standard', 'rents', k=10).to_string())
+
+            logger.info("\n=== Hotspot Regions (>0.8) ===")
+            for method, congestion_map in congestion_maps.items():
+                regions = hotspot_regions(congestion_map, threshold=0.8)
+                logger.info(f"{method}: {len(regions)} regions" +
+                            (f"\n{regions.head(10).to_string()}" if len(regions) else ""))
+
+            # Save reports to files
+            report['metrics'].to_csv(f"{log_dir}/metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+            report['correlation'].to_csv(f"{log_dir}/correlation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+
+            profile = instrument_funcs.records()
+            if instrument_funcs.is_enabled():
+                table = instrument_funcs.to_dataframe(profile)
+                logger.info("\n=== Stage Profile ===\n" + table.to_string())
+                table.to_csv(f"{log_dir}/profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", index=False)
+                instrument_funcs.export_json(f"{log_dir}/profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+            # One structured record with everything measured, for the JSON logs
+            logger.info(f"Analysis complete. Logs saved to: {log_dir}/{d.name}.log",
+                        extra={'data': {'grid_size': grid_size, 'runtimes': estimator.runtimes,
+                                        'metrics': report['metrics'].to_dict('records'), 'profile': profile}})
+
+        except Exception:
+            logger.exception("ERROR: analysis failed")
+            raise
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    designs = expand_designs(args.designs)
+    if not designs:
+        print(f"ERROR: no benchmark folders match {args.designs}", file=sys.stderr)
+        return 1
+
+    log_dir = args.log_dir
+    start_logging(log_dir, args.log_level)
+
+    if args.instrument:
+        instrument_funcs.enable(memory=args.instrument == 'memory')
+
+    memory_budget = args.memory_budget << 20
+    if args.scratch_dir is not None:
+        os.makedirs(args.scratch_dir, exist_ok=True)
 
     try:
-        estimator = CongestionEstimator(d, grid_size=500)
-        print('Calculating congestion maps...')
-        congestion_maps = estimator.generate_all_congestion_maps()
-
-        visualizer = CongestionVisualizer(d)
-        print('Generating visualizations...')
-        visualizer.plot_4way_comparison(congestion_maps)
-
-        analyzer = CongestionAnalyzer(congestion_maps, estimator.runtimes)
-        report = analyzer.generate_comparison_report()
-        
-        print("\n=== Method Comparison Metrics ===")
-        print(report['metrics'].to_string())  # to_string() for better formatting
-        
-        print("\n=== Correlation Between Methods ===")
-        print(report['correlation'].to_string())
-
-        # Get cells where methods disagree most
-        std_vals = np.array([c['congestion'] for row in congestion_maps['standard']['cells'] for c in row])
-        rent_vals = np.array([c['congestion'] for row in congestion_maps['rents']['cells'] for c in row])
-        divergence = np.abs(std_vals - rent_vals)
-        top_divergence_indices = np.argsort(divergence)[-100:]  # Top 10 differing cells
-
-        print("\n=== Top 10 Divergence Locations ===")
-        print(top_divergence_indices)
-        
-        # Save reports to files
-        report['metrics'].to_csv(f"{log_dir}/metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-        report['correlation'].to_csv(f"{log_dir}/correlation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-        
-        print(f"\nAnalysis complete. Logs saved to: {log_file}")
-    
-    except Exception as e:
-        print(f"\nERROR: {str(e)}", file=sys.stderr)
-        raise
+        if args.interactive:
+            for path in designs:
+                for grid_size in args.grid_sizes:
+                    analyze_design(path, grid_size, log_dir, args.accumulation, args.tile_workers, args.scratch_dir,
+                                   memory_budget, args.demand)
+            return 0
 
+        render_dir = os.path.join(log_dir, "heatmaps") if args.render is True else args.render
+        _, failures = run_batch(designs, args.grid_sizes, args.workers, log_dir, args.accumulation, args.cache,
+                                args.tile_workers, args.pyramid, render_dir, tuple(args.formats), args.instrument,
+                                args.scratch_dir, memory_budget, args.demand)
+        return 1 if failures else 0
     finally:
-        # Ensure all output is flushed to the log file
-        sys.stdout.log.close()
-        sys.stdout = sys.stdout.terminal
+        stop_logging()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,274 @@
+# Packages
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArray:
+    """
+    NumPy array stored in a multiprocessing.shared_memory block.
+    Workers attach to it by name, so large arrays are never pickled.
+    """
+    def __init__(self, shape, dtype, name: str = None):
+        """
+        Create a new shared array, or attach to an existing one when a name is given.
+        Args:
+            shape (tuple): Array shape.
+            dtype: Array dtype.
+            name (str): Name of an existing shared memory block to attach to.
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            # Pool workers share the creator's resource tracker, so attaching only
+            # re-registers the same name; the creator alone unlinks the block
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @classmethod
+    def from_array(cls, values):
+        """
+        Create a shared copy of an array.
+        Args:
+            values (np.ndarray): Array to copy.
+        Returns:
+            SharedArray: The shared copy.
+        """
+        shared = cls(values.shape, values.dtype)
+        shared.array[...] = values
+        return shared
+
+    @property
+    def spec(self):
+        """
+        Returns:
+            tuple: (name, shape, dtype) needed by a worker to attach.
+        """
+        return self.shm.name, self.shape, self.dtype.str
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    def close(self):
+        """
+        Detach from the block, and free it if this process created it.
+        """
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def split_range(n: int, parts: int):
+    """
+    Split range(n) into contiguous, near-equal tiles.
+    Args:
+        n (int): Length of the range.
+        parts (int): Maximum number of tiles.
+    Returns:
+        list: (start, stop) pairs of non-empty tiles.
+    """
+    bounds = np.linspace(0, n, min(parts, n) + 1).astype(np.int64)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def corner_blocks(x_bins: int, y_bins: int, min_col, max_col, min_row, max_row, weights, dtype):
+    """
+    Difference-array updates of inclusive bin ranges, clipped to the grid, as four blocks
+    (one per box corner) of flat indices into the (x_bins + 1, y_bins + 1) difference array.
+    RoutingGrid.box_corners concatenates the blocks; the tile-parallel path builds them per shard.
+    Returns:
+        list: (corners, signed weights) of each block.
+    """
+    c0 = np.maximum(np.asarray(min_col, dtype=np.int64), 0)
+    c1 = np.minimum(np.asarray(max_col, dtype=np.int64), x_bins - 1)
+    r0 = np.maximum(np.asarray(min_row, dtype=np.int64), 0)
+    r1 = np.minimum(np.asarray(max_row, dtype=np.int64), y_bins - 1)
+    weights = np.broadcast_to(np.asarray(weights, dtype=dtype), c0.shape)
+
+    valid = (c0 <= c1) & (r0 <= r1)
+    if not valid.all():
+        c0, c1, r0, r1, weights = c0[valid], c1[valid], r0[valid], r1[valid], weights[valid]
+
+    stride = y_bins + 1
+    return [(c0 * stride + r0, weights), ((c1 + 1) * stride + r0, -weights),
+            (c0 * stride + r1 + 1, -weights), ((c1 + 1) * stride + r1 + 1, weights)]
+
+
+def _shard_blocks(kind: str, sources, shape, start: int, stop: int):
+    """
+    Updates of the items [start, stop) of a shared source, as blocks of (flat index, weight):
+    four corner blocks of the boxes for 'boxes', the points themselves for 'points'.
+    """
+    if kind == 'boxes':
+        *box, weights = (source.array[start:stop] for source in sources)
+        return corner_blocks(shape[0] - 1, shape[1] - 1, *box, weights, weights.dtype)
+    index, weights = (source.array[start:stop] for source in sources)
+    return [(index, weights)]
+
+
+def _bucket_shard(kind: str, source_specs, shape, tile_starts, start: int, stop: int, offsets=None,
+                  out_specs=None):
+    """
+    Worker, in two passes over one shard of the items. Without offsets: count the updates
+    of each block falling into each row tile of the target. With offsets: write them,
+    grouped by tile and in their original order, at these positions of the shared output.
+    """
+    sources = [SharedArray.attach(spec) for spec in source_specs]
+    outputs = [SharedArray.attach(spec) for spec in out_specs] if out_specs is not None else []
+    try:
+        counts = []
+        for k, (flat, weights) in enumerate(_shard_blocks(kind, sources, shape, start, stop)):
+            tile = np.searchsorted(tile_starts, flat // shape[1], side='right') - 1
+            if offsets is None:
+                counts.append(np.bincount(tile, minlength=len(tile_starts)))
+                continue
+            order = np.argsort(tile, kind='stable')
+            tile = tile[order]
+            first = np.searchsorted(tile, np.arange(len(tile_starts)))
+            positions = offsets[k][tile] + np.arange(len(tile)) - first[tile]
+            outputs[0].array[positions] = flat[order]
+            outputs[1].array[positions] = weights[order]
+        return np.array(counts) if offsets is None else None
+    finally:
+        for shared in sources + outputs:
+            shared.close()
+
+
+def _scatter_tile(target_spec, index_spec, weight_spec, start: int, stop: int, lo: int, hi: int):
+    """
+    Worker: bincount the updates [lo, hi), which all fall into target rows [start, stop).
+    Each target element only receives updates from this tile, in their original
+    order, so it holds exactly the value a single bincount would give.
+    """
+    target, index, weight = (SharedArray.attach(spec) for spec in (target_spec, index_spec, weight_spec))
+    try:
+        row_len = target.shape[1]
+        local = np.bincount(index.array[lo:hi] - start * row_len, weights=weight.array[lo:hi],
+                            minlength=(stop - start) * row_len)
+        target.array[start:stop] = local.reshape(stop - start, row_len).astype(target.dtype, copy=False)
+    finally:
+        for shared in (target, index, weight):
+            shared.close()
+
+
+def _cumsum_tile(target_spec, axis: int, start: int, stop: int):
+    """
+    Worker: in-place cumulative sum along an axis, over the slice [start, stop) of the other axis.
+    """
+    target = SharedArray.attach(target_spec)
+    try:
+        view = target.array[:, start:stop] if axis == 0 else target.array[start:stop, :]
+        np.cumsum(view, axis=axis, out=view)
+    finally:
+        target.close()
+
+
+def _scatter(executor, workers: int, target: SharedArray, kind: str, sources):
+    """
+    Tile-parallel bincount into a shared 2D target, split by target rows. The items are
+    sharded across the workers, which build their own updates (see _shard_blocks) and
+    bucket them by row tile with a parallel counting sort: each tile then bincounts only
+    its own run, with the updates in the same order as one serial pass.
+    """
+    n = len(sources[0])
+    rows, row_len = target.shape
+    tiles = split_range(rows, workers)
+    tile_starts = np.array([tile[0] for tile in tiles], dtype=np.int64)
+    shards = split_range(n, workers)
+    sources = [SharedArray.from_array(np.ascontiguousarray(source)) for source in sources]
+    index = weights = None
+    try:
+        specs = [source.spec for source in sources]
+        futures = [executor.submit(_bucket_shard, kind, specs, target.shape, tile_starts, start, stop)
+                   for start, stop in shards]
+        counts = np.array([future.result() for future in futures]).reshape(len(shards), -1, len(tiles))
+
+        # Output order: tile, then block, then shard, so each tile keeps the serial order
+        ordered = counts.transpose(2, 1, 0).ravel()
+        offsets = np.zeros(len(ordered) + 1, dtype=np.int64)
+        np.cumsum(ordered, out=offsets[1:])
+        shard_offsets = offsets[:-1].reshape(counts.transpose(2, 1, 0).shape).transpose(2, 1, 0)
+        bounds = offsets[::counts.shape[1] * counts.shape[0]]
+
+        dtype = sources[-1].dtype
+        index = SharedArray((max(int(offsets[-1]), 1),), np.int64)
+        weights = SharedArray((max(int(offsets[-1]), 1),), dtype)
+        futures = [executor.submit(_bucket_shard, kind, specs, target.shape, tile_starts, start, stop,
+                                   shard_offsets[s], (index.spec, weights.spec))
+                   for s, (start, stop) in enumerate(shards)]
+        for future in futures:
+            future.result()
+
+        futures = [executor.submit(_scatter_tile, target.spec, index.spec, weights.spec, start, stop,
+                                   int(bounds[t]), int(bounds[t + 1]))
+                   for t, (start, stop) in enumerate(tiles)]
+        for future in futures:
+            future.result()
+    finally:
+        for shared in sources + [index, weights]:
+            if shared is not None:
+                shared.close()
+
+
+def parallel_box_sum(executor, workers: int, boxes, out):
+    """
+    Tile-parallel version of RoutingGrid.box_sum on a shared difference array, added into out.
+    Workers build and bucket the corner updates of their own shards of boxes, scatter
+    the updates of their own column tiles, then integrate the array along x over row
+    tiles and along y over column tiles. Every element sees the same additions in the
+    same order as the serial path, so results are bit-for-bit equal.
+    Args:
+        executor (Executor): Process pool.
+        workers (int): Number of shards and tiles per phase.
+        boxes (tuple): (min_col, max_col, min_row, max_row, weights) bin ranges, as for
+            RoutingGrid.box_corners.
+        out (np.ndarray): (x_bins, y_bins) channel to add the box sums to.
+    """
+    x_bins, y_bins = out.shape
+    *box, weights = boxes
+    box = [np.asarray(values, dtype=np.int64) for values in box]
+    weights = np.broadcast_to(np.asarray(weights, dtype=out.dtype), box[0].shape)
+    diff = SharedArray((x_bins + 1, y_bins + 1), out.dtype)
+    try:
+        if len(weights):
+            _scatter(executor, workers, diff, 'boxes', box + [weights])
+        else:
+            diff.array[...] = 0
+        for axis, length in ((0, y_bins + 1), (1, x_bins + 1)):
+            futures = [executor.submit(_cumsum_tile, diff.spec, axis, start, stop)
+                       for start, stop in split_range(length, workers)]
+            for future in futures:
+                future.result()
+        out += diff.array[:-1, :-1]
+    finally:
+        diff.close()
+
+
+def parallel_point_sum(executor, workers: int, bins, weights, out):
+    """
+    Tile-parallel version of the point bincount in RoutingGrid.accumulate_points, added into out.
+    Args:
+        executor (Executor): Process pool.
+        workers (int): Number of shards and tiles.
+        bins (np.ndarray): Flat bin index of each point.
+        weights (np.ndarray): Weight of each point.
+        out (np.ndarray): (x_bins, y_bins) channel to add the point sums to.
+    """
+    sums = SharedArray(out.shape, np.float64)
+    try:
+        if len(bins):
+            _scatter(executor, workers, sums, 'points', [np.asarray(bins, dtype=np.int64),
+                                                         np.asarray(weights, dtype=np.float64)])
+        else:
+            sums.array[...] = 0
+        out += sums.array
+    finally:
+        sums.close()
@@ -0,0 +1,237 @@
+# Packages
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Project imports
+import log_funcs
+from c_benchmark import Benchmark
+from c_file_parser import FParser
+from c_plotter import Plotter
+from congestion_funcs import CongestionEstimator, CongestionAnalyzer, CongestionVisualizer
+from synthetic_funcs import generate_design
+
+
+def time_stage(samples: dict, stage: str, func, *args, quiet=True, **kwargs):
+    """
+    Run one pipeline stage, appending its wall-clock time to samples[stage].
+    Args:
+        samples (dict): Stage name -> list of seconds.
+        stage (str): Stage name.
+        func (callable): Stage to run.
+        quiet (bool): Discard what the stage prints or logs.
+    Returns:
+        The stage's return value.
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout), \
+            (log_funcs.silenced() if quiet else contextlib.nullcontext()):
+        start_time = time.perf_counter()
+        result = func(*args, **kwargs)
+        samples.setdefault(stage, []).append(time.perf_counter() - start_time)
+    return result
+
+
+def profile_design(path: str, grid_sizes, repeat=1, render=True, quiet=True):
+    """
+    Time every pipeline stage of one design: parsing, benchmark generation, each estimator
+    method, normalization, the full estimator, analysis and rendering, per grid size.
+    Every repetition starts from fresh objects, so stages that accumulate state are timed cold.
+    Args:
+        path (str): Benchmark folder.
+        grid_sizes (list): Grid cell sizes in microns.
+        repeat (int): Repetitions of each stage; the fastest is reported.
+        render (bool): Also time the headless heatmap and layout renderers.
+        quiet (bool): Discard what the stages print.
+    Returns:
+        list: One record per (grid size, stage), grid size None for grid-independent stages.
+    """
+    design_samples = {}
+    grid_samples = {grid_size: {} for grid_size in grid_sizes}
+    design = None
+    with tempfile.TemporaryDirectory() as render_dir:
+        for _ in range(repeat):
+            parser = FParser(path)
+            time_stage(design_samples, 'FParser.read_cells', parser.read_cells, quiet=quiet)
+            time_stage(design_samples, 'FParser.read_nets', parser.read_nets, quiet=quiet)
+            time_stage(design_samples, 'FParser.read_rows', parser.read_rows, quiet=quiet)
+            time_stage(design_samples, 'FParser.read_arrays', parser.read_arrays, quiet=quiet)
+
+            time_stage(design_samples, 'Benchmark.generate_benchmark', Benchmark(path).generate_benchmark, quiet=quiet)
+            design = Benchmark(path)
+            time_stage(design_samples, 'Benchmark.generate_benchmark(columnar)', design.generate_benchmark,
+                       columnar=True, quiet=quiet)
+            if render:
+                time_stage(design_samples, 'Plotter.plot_design', Plotter.plot_design, design,
+                           f"{render_dir}/{design.name}_layout.png", quiet=quiet)
+
+            for grid_size, samples in grid_samples.items():
+                estimator = CongestionEstimator(design, grid_size=grid_size)
+                time_stage(samples, 'CongestionEstimator.build_routing_grid', estimator.build_routing_grid, quiet=quiet)
+                time_stage(samples, 'CongestionEstimator.calculate_pin_density', estimator.calculate_pin_density,
+                           quiet=quiet)
+                time_stage(samples, 'CongestionEstimator.estimate_net_demand_standard',
+                           estimator.estimate_net_demand_standard, quiet=quiet)
+                time_stage(samples, 'CongestionEstimator.estimate_net_demand_weighted',
+                           estimator.estimate_net_demand_weighted, quiet=quiet)
+                time_stage(samples, 'CongestionEstimator.estimate_rents_rule', estimator.estimate_rents_rule,
+                           quiet=quiet)
+                time_stage(samples, 'CongestionEstimator.estimate_net_span', estimator.estimate_net_span, quiet=quiet)
+                time_stage(samples, 'CongestionEstimator.normalize', CongestionEstimator.normalize,
+                           estimator.routing_grid, quiet=quiet)
+
+                estimator = CongestionEstimator(design, grid_size=grid_size)
+                maps = time_stage(samples, 'CongestionEstimator.generate_all_congestion_maps',
+                                  estimator.generate_all_congestion_maps, quiet=quiet)
+                analyzer = CongestionAnalyzer(maps, estimator.runtimes)
+                time_stage(samples, 'CongestionAnalyzer.generate_comparison_report',
+                           analyzer.generate_comparison_report, quiet=quiet)
+                if render:
+                    visualizer = CongestionVisualizer(design, output_dir=render_dir)
+                    time_stage(samples, 'CongestionVisualizer.plot_4way_comparison', visualizer.plot_4way_comparison,
+                               maps, f"{design.name}_{grid_size}", quiet=quiet)
+
+    arrays = design.get_arrays()
+    info = {'design': design.name, 'cells': len(arrays.lx), 'nets': len(arrays.net_ptr) - 1,
+            'pins': len(arrays.net_cells)}
+    records = []
+    for grid_size, samples in [(None, design_samples)] + list(grid_samples.items()):
+        for stage, seconds in samples.items():
+            records.append({**info, 'grid_size': grid_size, 'stage': stage, 'seconds': min(seconds),
+                            'samples': seconds})
+    return records
+
+
+def environment():
+    """
+    Describe the machine and source revision the results were measured on.
+    Returns:
+        dict: Timestamp, git commit, Python/NumPy versions, platform and CPU count.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def run_suite(sizes, grid_sizes, work_dir="logs/perf", output=None, repeat=1, render=True, seed=0, **design_kwargs):
+    """
+    Generate (or reuse) one synthetic design per size and profile every stage on it.
+    Args:
+        sizes (list): Standard cell counts of the synthetic designs.
+        grid_sizes (list): Grid cell sizes in microns.
+        work_dir (str): Folder of the generated designs.
+        output (str): Write the results to this JSON file.
+        repeat (int): Repetitions of each stage.
+        render (bool): Also time rendering.
+        seed (int): Random seed of the generator.
+        **design_kwargs: Further generate_design arguments (net degrees, macros, die size...).
+    Returns:
+        dict: {'environment': ..., 'records': [...]}.
+    """
+    records = []
+    for size in sizes:
+        # Folders are keyed by every generator argument, so a design is only reused if identical
+        key = hashlib.md5(json.dumps({'seed': seed, **design_kwargs}, sort_keys=True).encode()).hexdigest()[:8]
+        path = f"{work_dir}/syn{size}_{key}"
+        if not os.path.exists(f"{path}/syn{size}.nets"):
+            print(f"Generating {path}...")
+            generate_design(path, size, seed=seed, **design_kwargs)
+        print(f"Profiling {path} (grid sizes {list(grid_sizes)}, {repeat} repeats)...")
+        records.extend(profile_design(path, grid_sizes, repeat, render))
+
+    results = {'environment': environment(), 'records': records}
+    if output is not None:
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as file:
+            json.dump(results, file, indent=1)
+        print(f"Results saved to: {output}")
+    return results
+
+
+def compare_results(baseline: str, current: str, threshold=0.1, min_delta=0.005):
+    """
+    Compare two result files stage by stage.
+    Args:
+        baseline, current (str): JSON files written by run_suite.
+        threshold (float): Relative slowdown reported as a regression.
+        min_delta (float): Smallest slowdown in seconds reported as a regression, so
+            timer noise on sub-millisecond stages is not flagged.
+    Returns:
+        pd.DataFrame: Per (design, grid size, stage) times, their ratio and a regression flag.
+    """
+    keys = ['design', 'grid_size', 'stage']
+    frames = []
+    for path in (baseline, current):
+        with open(path) as file:
+            frames.append(pd.DataFrame(json.load(file)['records'])[keys + ['seconds']])
+    df = frames[0].merge(frames[1], on=keys, suffixes=(' baseline', ' current'))
+    df['ratio'] = df['seconds current'] / df['seconds baseline']
+    df['regression'] = (df['ratio'] > 1 + threshold) & (df['seconds current'] - df['seconds baseline'] > min_delta)
+    return df
+
+
+def parse_args(argv=None):
+    """
+    Parse the command-line arguments.
+    Args:
+        argv (list): Arguments to parse, defaults to sys.argv.
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Scaling benchmark of every pipeline stage on synthetic designs.")
+    parser.add_argument('-n', '--sizes', nargs='+', type=int, default=[10000, 100000],
+                        help="Standard cell counts of the synthetic designs (default: 10000 100000).")
+    parser.add_argument('-g', '--grid-sizes', nargs='+', type=float, default=[10, 50],
+                        help="Grid cell sizes in microns (default: 10 50).")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help="Repetitions of each stage (default: 3).")
+    parser.add_argument('--macros', type=int, default=10, help="Macros per design (default: 10).")
+    parser.add_argument('--mean-degree', type=float, default=3.5, help="Mean net degree (default: 3.5).")
+    parser.add_argument('--seed', type=int, default=0, help="Generator seed (default: 0).")
+    parser.add_argument('--work-dir', default="logs/perf", help="Folder of the generated designs.")
+    parser.add_argument('-o', '--output', default=None,
+                        help="Results JSON (default: <work-dir>/perf_<timestamp>.json).")
+    parser.add_argument('--baseline', default=None, help="Compare against this earlier results JSON.")
+    parser.add_argument('--no-render', action='store_true', help="Skip the rendering stages.")
+    args = parser.parse_args(argv)
+    args.grid_sizes = [int(g) if float(g).is_integer() else g for g in args.grid_sizes]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = args.output or f"{args.work_dir}/perf_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    results = run_suite(args.sizes, args.grid_sizes, args.work_dir, output, args.repeat, not args.no_render,
+                        args.seed, num_macros=args.macros, mean_degree=args.mean_degree)
+
+    df = pd.DataFrame(results['records']).drop(columns='samples')
+    print(df.to_string(index=False))
+
+    if args.baseline:
+        comparison = compare_results(args.baseline, output)
+        print("\n=== Comparison with baseline ===")
+        print(comparison.to_string(index=False))
+        return 1 if comparison['regression'].any() else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# Packages
+import os
+
+import numpy as np
+
+
+def net_degrees(num_nets: int, mean_degree=3.5, max_degree=64, degree_weights=None, rng=None):
+    """
+    Draw net degrees (pins per net).
+    Args:
+        num_nets (int): Number of nets.
+        mean_degree (float): Mean degree of the default distribution, 2 plus a geometric
+            tail, which gives the many 2- and 3-pin nets and few high-fanout nets of real designs.
+        max_degree (int): Largest degree.
+        degree_weights (dict): Explicit {degree: relative frequency} distribution instead.
+        rng (np.random.Generator): Random generator.
+    Returns:
+        np.ndarray: Degree of each net.
+    """
+    rng = rng or np.random.default_rng()
+    if degree_weights:
+        values = np.array(list(degree_weights.keys()), dtype=np.int64)
+        weights = np.array(list(degree_weights.values()), dtype=np.float64)
+        return rng.choice(values, size=num_nets, p=weights / weights.sum())
+    if mean_degree <= 2:
+        return np.full(num_nets, 2, dtype=np.int64)
+    return np.minimum(1 + rng.geometric(1 / (mean_degree - 1), size=num_nets), max_degree)
+
+
+def generate_design(folder_path: str, num_cells: int, num_nets=None, num_macros=0, num_terminals=None,
+                    mean_degree=3.5, max_degree=64, degree_weights=None, utilization=0.6, aspect_ratio=1.0,
+                    die_width=None, die_height=None, row_height=12, site_width=1, locality=16, seed=0):
+    """
+    Write a synthetic placed design in Bookshelf format (.aux, .nodes, .pl, .nets, .scl).
+    Standard cells are placed on random rows, macros span several rows inside the die,
+    and terminals sit just outside the die edges, so Benchmark classifies them as pins.
+    Nets connect cells that are close in placement order (locality), so bounding boxes
+    stay short as in a placed design.
+    Args:
+        folder_path (str): Output folder; its name (before any '_') is the design name.
+        num_cells (int): Number of movable standard cells.
+        num_nets (int): Number of nets (default: num_cells).
+        num_macros (int): Number of fixed macros.
+        num_terminals (int): Number of I/O terminals (default: about 4 * sqrt(num_cells)).
+        mean_degree, max_degree, degree_weights: Net degree distribution, see net_degrees.
+        utilization (float): Cell area over die area, used when the die size is not given.
+        aspect_ratio (float): Die height over width, used when the die size is not given.
+        die_width, die_height (float): Explicit die size in microns.
+        row_height (int): Row height in microns.
+        site_width (int): Site width in microns.
+        locality (int): Average placement-order distance between consecutive pins of a net.
+        seed (int): Random seed; the same arguments always produce the same files.
+    Returns:
+        str: The folder path.
+    """
+    rng = np.random.default_rng(seed)
+    num_nets = num_cells if num_nets is None else num_nets
+    num_terminals = int(4 * np.sqrt(num_cells)) if num_terminals is None else num_terminals
+
+    # Standard cells: one row tall, a few sites wide
+    cell_w = rng.choice(np.array([2, 3, 4, 6, 8, 12]) * site_width, size=num_cells).astype(np.float64)
+    cell_h = np.full(num_cells, float(row_height))
+
+    if die_width is None or die_height is None:
+        area = cell_w.sum() * row_height / utilization
+        die_width = np.sqrt(area / aspect_ratio)
+        die_height = die_width * aspect_ratio
+    num_rows = max(int(die_height // row_height), 1)
+    num_sites = max(int(die_width // site_width), 1)
+    die_width, die_height = num_sites * site_width, num_rows * row_height
+
+    cell_x = np.floor(rng.random(num_cells) * np.maximum(die_width - cell_w, 0) / site_width) * site_width
+    cell_y = rng.integers(0, num_rows, size=num_cells) * float(row_height)
+
+    # Macros: 4-8 rows tall, placed on row boundaries inside the die
+    macro_rows = rng.integers(4, 9, size=num_macros)
+    macro_h = np.minimum(macro_rows, num_rows) * float(row_height)
+    macro_w = np.minimum(macro_h * rng.uniform(0.5, 2.0, size=num_macros), die_width)
+    macro_x = np.floor(rng.random(num_macros) * (die_width - macro_w))
+    macro_y = rng.integers(0, num_rows - np.minimum(macro_rows, num_rows) + 1, size=num_macros) * float(row_height)
+
+    # Terminals: 1x1, just outside a random die edge
+    edge = rng.integers(0, 4, size=num_terminals)
+    along = rng.random(num_terminals)
+    term_x = np.select([edge == 0, edge == 1], [-1.0, die_width + 1.0], np.floor(along * die_width))
+    term_y = np.select([edge == 2, edge == 3], [-1.0, die_height + 1.0], np.floor(along * die_height))
+
+    names = np.concatenate([np.char.add('o', np.arange(num_cells).astype(str)),
+                            np.char.add('m', np.arange(num_macros).astype(str)),
+                            np.char.add('p', np.arange(num_terminals).astype(str))])
+    w = np.concatenate([cell_w, macro_w, np.ones(num_terminals)])
+    h = np.concatenate([cell_h, macro_h, np.ones(num_terminals)])
+    x = np.concatenate([cell_x, macro_x, term_x])
+    y = np.concatenate([cell_y, macro_y, term_y])
+    num_nodes = len(names)
+    num_fixed = num_macros + num_terminals
+
+    # Nets: walk the placement order from a random anchor with strictly increasing
+    # steps, so each net has distinct, nearby nodes
+    order = np.lexsort((x, y // (4 * row_height)))
+    max_degree = max(min(max_degree, num_nodes // max(2 * locality, 1)), 2)
+    degrees = np.minimum(net_degrees(num_nets, mean_degree, max_degree, degree_weights, rng), num_nodes)
+    starts = np.concatenate(([0], np.cumsum(degrees)[:-1]))
+    steps = rng.integers(1, 2 * locality + 1, size=int(degrees.sum()))
+    steps[starts] = rng.integers(0, num_nodes, size=num_nets)
+    position = np.cumsum(steps) - np.repeat(np.cumsum(steps)[starts] - steps[starts], degrees)
+    pins = order[position % num_nodes]
+    directions = np.full(len(pins), 'I')
+    directions[starts] = 'O'
+
+    os.makedirs(folder_path, exist_ok=True)
+    name = os.path.basename(folder_path.rstrip('/')).split('_')[0]
+    prefix = f"{folder_path}/{name}"
+
+    with open(f"{prefix}.aux", 'w') as file:
+        file.write(f"RowBasedPlacement : {name}.nodes {name}.nets {name}.pl {name}.scl\n")
+
+    terminal = np.arange(num_nodes) >= num_cells
+    with open(f"{prefix}.nodes", 'w') as file:
+        file.write(f"UCLA nodes 1.0\n\nNumNodes : {num_nodes}\nNumTerminals : {num_fixed}\n")
+        file.writelines(f"\t{n}\t{wi:g}\t{hi:g}{' terminal' if t else ''}\n"
+                        for n, wi, hi, t in zip(names.tolist(), w.tolist(), h.tolist(), terminal.tolist()))
+
+    with open(f"{prefix}.pl", 'w') as file:
+        file.write("UCLA pl 1.0\n\n")
+        file.writelines(f"{n}\t{xi:g}\t{yi:g}\t: N{' /FIXED' if t else ''}\n"
+                        for n, xi, yi, t in zip(names.tolist(), x.tolist(), y.tolist(), terminal.tolist()))
+
+    with open(f"{prefix}.nets", 'w') as file:
+        file.write(f"UCLA nets 1.0\n\nNumNets : {num_nets}\nNumPins : {len(pins)}\n\n")
+        pin_names = names[pins].tolist()
+        pin_directions = directions.tolist()
+        for net, (start, degree) in enumerate(zip(starts.tolist(), degrees.tolist())):
+            file.write(f"NetDegree : {degree}   n{net}\n")
+            file.writelines(f"\t{pin_names[i]}\t{pin_directions[i]}\n" for i in range(start, start + degree))
+
+    with open(f"{prefix}.scl", 'w') as file:
+        file.write(f"UCLA scl 1.0\n\nNumRows : {num_rows}\n\n")
+        file.writelines(f"CoreRow Horizontal\n  Coordinate    :   {row * row_height}\n  Height        :   {row_height}\n"
+                        f"  Sitewidth     :    {site_width}\n  Sitespacing   :    {site_width}\n"
+                        f"  Siteorient    :    1\n  Sitesymmetry  :    1\n"
+                        f"  SubrowOrigin  :    0\tNumSites  :  {num_sites}\nEnd\n"
+                        for row in range(num_rows))
+    return folder_path
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from c_benchmark import Benchmark
+from congestion_funcs import CongestionEstimator
+from hotspot_funcs import top_indices
+from synthetic_funcs import generate_design
+
+GRID_SIZE = 10
+
+
+@pytest.fixture(scope='module')
+def design(tmp_path_factory):
+    """
+    Folder of a small synthetic design with macros, shared by every test of the module.
+    """
+    return generate_design(str(tmp_path_factory.mktemp('designs') / 'syn'), 2000, num_macros=4, seed=1)
+
+
+def load(design, **kwargs):
+    benchmark = Benchmark(design)
+    benchmark.generate_benchmark(**kwargs)
+    return benchmark
+
+
+def estimate(benchmark, **kwargs):
+    """
+    Run every congestion method and return copies of the demand channels and congestion maps.
+    """
+    estimator = CongestionEstimator(benchmark, GRID_SIZE, **kwargs)
+    maps = estimator.generate_all_congestion_maps()
+    result = {name: np.array(channel) for name, channel in estimator.routing_grid.channels.items()}
+    result.update({method: np.array(congestion_map['congestion']) for method, congestion_map in maps.items()})
+    estimator.close()
+    return result
+
+
+def assert_maps_close(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-12, atol=1e-12, err_msg=name)
+
+
+def test_difference_matches_loop(design):
+    assert_maps_close(estimate(load(design, columnar=True)), estimate(load(design), accumulation='loop'))
+
+
+@pytest.mark.parametrize('demand', CongestionEstimator.DEMAND_MODES)
+def test_tile_parallel_is_bit_for_bit(design, demand):
+    benchmark = load(design, columnar=True)
+    serial = estimate(benchmark, demand=demand)
+    parallel = estimate(benchmark, demand=demand, workers=2)
+    for name in serial:
+        assert np.array_equal(serial[name], parallel[name]), name
+
+
+@pytest.mark.parametrize('demand', CongestionEstimator.DEMAND_MODES)
+def test_stream_matches_difference(design, demand):
+    assert_maps_close(estimate(load(design, nets=False), accumulation='stream', demand=demand),
+                      estimate(load(design, columnar=True), demand=demand))
+
+
+@pytest.mark.parametrize('demand', CongestionEstimator.DEMAND_MODES)
+def test_eco_update_matches_fresh_estimation(design, demand):
+    benchmark = load(design, columnar=True)
+    estimator = CongestionEstimator(benchmark, GRID_SIZE, demand=demand)
+    estimator.generate_all_congestion_maps()
+
+    arrays = benchmark.get_arrays()
+    rng = np.random.default_rng(0)
+    movable = rng.choice(np.flatnonzero(arrays.flags == 0), 20, replace=False)
+    moves = {arrays.cell_name(i): (float(arrays.lx[i] + rng.integers(-50, 50)), float(arrays.ly[i] + 12))
+             for i in movable}
+    maps = estimator.update_cell_positions(moves)
+    updated = {name: np.array(channel) for name, channel in estimator.routing_grid.channels.items()}
+    updated.update({method: np.array(congestion_map['congestion']) for method, congestion_map in maps.items()})
+
+    fresh = estimate(benchmark, demand=demand)
+    assert updated.keys() == fresh.keys()
+    for name in fresh:
+        np.testing.assert_allclose(updated[name], fresh[name], atol=1e-9, err_msg=name)
+
+
+def test_top_indices_edge_cases():
+    values = np.array([0.3, 0.9, 0.1, 0.9, 0.5])
+    assert top_indices(values, 0).size == 0
+    assert list(top_indices(values, 2)) == [1, 3]
+    assert list(top_indices(values, 10)) == [1, 3, 4, 0, 2]
+    with pytest.raises(ValueError):
+        top_indices(values, -1)